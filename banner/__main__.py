@@ -1,10 +1,8 @@
 """The package entry point into the application."""
 
-import asyncio
-from .app import run
-
-def main() -> None:
-    asyncio.run(run())
+# First, so that a trace can tell how long the imports below took.
+from . import trace  # noqa: F401
+from .app.cli import main
 
 if __name__ == "__main__":
     main()
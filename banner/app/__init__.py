@@ -1,5 +1,5 @@
 """The main application code."""
 
-from .app import run
+from .cli import run
 
-__all__ = ["run"]
\ No newline at end of file
+__all__ = ["run"]
@@ -1,23 +1,33 @@
-from os import path
 import argparse
+import asyncio
 import os
-import aiohttp
-from typing import List
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import chain
+from typing import Iterable, Iterator, List
 import validators
-import tempfile
-from peewee import *
 
 from rich import print
-from rich.progress import track
-from rich.prompt import Confirm
-
-from art import text2art, ASCII_FONTS
+from rich.progress import (
+    BarColumn,
+    Progress,
+    TaskProgressColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
 
 from textual.app import App
 from textual import on, work
 
+from .. import trace
 from ..ui.screens import Main, AddBanner, EditBanner, GenAsciiText
-from ..models import app_db, Banner
+from ..models import Banner
+from ..storage import get_store, SqliteStore
+from .ascii import art_cache, resolve_font, timed_gen_ascii_text, worker_context
+from .fetch import UrlFetcher, ordered_map
+from .sources import BannerEntry, iter_archive, iter_directory, iter_jsonl
 
 
 class BannerApp(App):
@@ -104,138 +114,10 @@ class BannerApp(App):
             )
 
 
-def create_tables() -> None:
-    all_models = [Banner,]
-    with app_db:
-        app_db.create_tables(
-            all_models
-        )
-
-
-def get_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(
-        prog="banner",
-        description="Banner management application.",
-    )
-
-    subparsers = parser.add_subparsers(dest="command")
-
-    """Add subcommand"""
-    add_parser = subparsers.add_parser(
-        "add", help="Add a new banner",)
-    add_parser.add_argument(
-        "source", nargs="+",
-        help="Content, file path(s), or URL(s) to add as banner(s)"
-    )
-    add_parser.add_argument(
-        "--ascii",
-        action="store_true",
-        help="Generate ASCII art from the input text"
-    )
-    add_parser.add_argument(
-        "--font",
-        default="random",
-        choices=ASCII_FONTS,
-        help="Font to use for ASCII art. Use 'random' to choose a random font."
-    )
-    add_parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Print the generated ASCII text to the console instead of adding it as a banner"
-    )
-
-    """Delete subcommand"""
-    delete_parser = subparsers.add_parser(
-        "delete",
-        help="Delete a banner by ID"
-    )
-    delete_parser.add_argument(
-        "id",
-        type=int,
-        help="Banner ID"
-    )
-
-    """Edit subcommand"""
-    edit_parser = subparsers.add_parser(
-        "edit",
-        help="Edit a banner by ID"
-    )
-    edit_parser.add_argument(
-        "id",
-        type=int,
-        help="Banner ID"
-    )
-
-    """Reset subcommand"""
-    reset_parser = subparsers.add_parser(
-        "reset",
-        help="Reset the markup of a banner to its original content"
-    )
-    reset_parser.add_argument(
-        "id",
-        type=int,
-        help="Banner ID"
-    )
-
-    """Show subcommand"""
-    show_parser = subparsers.add_parser(
-        "show",
-        help="Show a banner by ID or a random banner"
-    )
-    show_parser.add_argument(
-        "id_or_random",
-        help="Banner ID or 'random' to show a random banner"
-    )
-    show_parser.add_argument(
-        "--content-only",
-        action="store_true",
-        help="Print the content of the banner rather than the markup"
-    )
-
-    """Export subcommand"""
-    export_parser = subparsers.add_parser(
-        "export",
-        help="Export banners to a file or multiple files"
-    )
-    export_parser.add_argument(
-        "--single-file",
-        action="store_true",
-        help="Export all banners to a single file"
-    )
-    export_parser.add_argument(
-        "--separator",
-        default=None,
-        help="Separator between banners in a single file (default: '\\n---\\n')"
-    )
-    export_parser.add_argument(
-        "--base-name",
-        default=None,
-        help="Base name for multiple files (default: 'banner')"
-    )
-    export_parser.add_argument(
-        "--extension",
-        default=None,
-        help="Extension for multiple files (default: 'txt')"
-    )
-    export_parser.add_argument(
-        "file_path",
-        nargs="?",
-        help="Path to the file where you want to export the banners"
-    )
-
-    # Finally, parse the command line.
-    return parser.parse_args()
-
-
 def is_url(string):
     return validators.url(string)
 
 
-def gen_ascii_text(text: str, font: str = "random"):
-    art_text = text2art(text, font=font)
-    return art_text
-
-
 def import_banner_from_file(file_path: str) -> str | None:
     if not os.path.isfile(file_path):
         print(
@@ -248,156 +130,307 @@ def import_banner_from_file(file_path: str) -> str | None:
         return content
 
 
-async def import_banner_from_url(url: str) -> str | None:
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                content = await response.text()
-                return content
-    except aiohttp.ClientError as e:
-        print(
-            f"Error importing banner from URL '{url}': {e}"
-        )
-        return None
+async def import_banner_from_url(
+    url: str,
+    fetcher: UrlFetcher | None = None,
+) -> str | None:
+    if fetcher is not None:
+        return await fetcher.fetch(url)
+
+    async with UrlFetcher() as fetcher:
+        return await fetcher.fetch(url)
 
 
-async def get_source_content(source: str) -> str | None:
+async def get_source_content(
+    source: str,
+    fetcher: UrlFetcher | None = None,
+) -> str | None:
     if os.path.isfile(source):
         content = import_banner_from_file(source)
     elif is_url(source):
-        content = await import_banner_from_url(source)
+        content = await import_banner_from_url(source, fetcher)
     else:
         content = source
     return content
 
 
-def export_banners(args: argparse.Namespace) -> None:
-    banners = Banner.select()
-    num_banners = len(banners)
+class BannerWriter:
+    """Buffers new banners and writes them in batched transactions."""
 
-    if args.single_file:
-        file_path = args.file_path or f"banners.{'txt' if not args.extension else args.extension}"
-        with open(file_path, "w") as f:
-            for banner in banners:
-                f.write(banner.content)
-                f.write(args.separator or "\n---\n")
+    def __init__(
+        self,
+        batch_size: int = 500,
+        skip_duplicates: bool = True,
+    ) -> None:
+        """Initialise the writer.
 
-        print(f"Exported {num_banners} banners to {path.abspath(file_path)}")
-    else:
-        base_name = args.base_name or "banner"
-        extension = args.extension or "txt"
-        for i, banner in enumerate(banners, start=1):
-            file_path = f"{base_name}_{i}.{extension}"
-            with open(file_path, "w") as f:
-                f.write(banner.content)
+        Args:
+            batch_size: How many banners to write per transaction.
+            skip_duplicates: Skip banners whose content is already in the
+                library or earlier in the same batch.
+        """
+        self._batch_size = max(1, batch_size)
+        self._skip_duplicates = skip_duplicates
+        self._rows: List[dict] = []
+        self.num_succeeded = 0
+        self.num_failed = 0
+        self.num_duplicates = 0
+
+    def add(self, content: str, marked_up: str | None = None) -> None:
+        self._rows.append({
+            "content": content,
+            "markedUp": marked_up,
+            "digest": Banner.content_digest(content),
+        })
+        if len(self._rows) >= self._batch_size:
+            self.flush()
+
+    def _drop_duplicates(self, rows: List[dict]) -> List[dict]:
+        """Drop rows that are already stored, with one lookup per batch."""
+        seen = get_store().existing_digests([row["digest"] for row in rows])
+        unique_rows = []
+        for row in rows:
+            if row["digest"] in seen:
+                self.num_duplicates += 1
+            else:
+                seen.add(row["digest"])
+                unique_rows.append(row)
+        return unique_rows
+
+    def flush(self) -> None:
+        rows, self._rows = self._rows, []
+        if self._skip_duplicates:
+            rows = self._drop_duplicates(rows)
+        with trace.span("write batch", rows=len(rows)):
+            num_inserted, errors = get_store().add_many(rows)
+        self.num_succeeded += num_inserted
+        self.num_failed += len(errors)
+        for e in errors:
+            print(f"Failed to add banner: {e}")
+
+    def __enter__(self) -> "BannerWriter":
+        return self
 
-            print(f"Exported banner {i} to {path.abspath(file_path)}")
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
 
 
 async def add_banners(
     sources: List[str],
     ascii: bool,
     dry_run: bool,
-    font: str
-) -> tuple[int, int, List[str]]:
-    num_succeeded = 0
+    font: str,
+    concurrency: int = 16,
+    per_host: int = 4,
+    timeout: float = 30.0,
+    retries: int = 3,
+    batch_size: int = 500,
+    skip_duplicates: bool = True,
+    entries: Iterable[BannerEntry] | None = None,
+    jobs: int = 1,
+    timings: List[tuple[int, str, float]] | None = None,
+) -> tuple[int, int, int, List[str]]:
+    """Add banners from sources and from already read bulk entries.
+
+    Args:
+        sources: Content, file paths or URLs, as given on the command line.
+        entries: Banners read lazily from a bulk source (see
+            `banner.app.sources`). These are added after `sources`.
+        jobs: How many processes to generate ASCII art in. With 1 it is
+            generated in this process.
+        timings: If given, ``(item, font, seconds)`` is appended for every
+            piece of ASCII art generated, in completion order.
+    """
     num_failed = 0
     dry_run_content: List[str] = []
+    writer = BannerWriter(batch_size, skip_duplicates)
+
+    items = enumerate(chain(
+        ((source, None) for source in sources),
+        ((None, entry) for entry in entries or ()),
+    ), start=1)
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(show_speed=True),
+        TimeElapsedColumn(),
+    ) as progress, writer, (
+        ProcessPoolExecutor(max_workers=jobs, mp_context=worker_context())
+        if jobs > 1 else nullcontext()
+    ) as pool:
+        task = progress.add_task(
+            "Adding banners",
+            total=len(sources) if entries is None else None,
+        )
+        async with UrlFetcher(
+            limit=concurrency,
+            limit_per_host=per_host,
+            timeout=timeout,
+            retries=retries,
+        ) as fetcher:
+
+            async def resolve(item) -> BannerEntry:
+                index, (source, entry) = item
+                if source is not None:
+                    content, marked_up = (
+                        await get_source_content(source, fetcher), None
+                    )
+                else:
+                    content, marked_up = entry
+
+                if ascii and content is not None:
+                    # TODO: Add to generated ascii text markup field
+                    # and the raw content to the content field then
+                    # in the edit screen users could generate ascii text if they're
+                    # not happy with the initial result
+                    # or let the user pick a font in the arguments
+                    start = time.perf_counter()
+                    used_font = resolve_font(font, content)
+                    art_text = art_cache.get(content, used_font)
+                    if art_text is not None:
+                        seconds = time.perf_counter() - start
+                    else:
+                        if pool is not None:
+                            art_text, used_font, seconds = (
+                                await asyncio.get_running_loop().run_in_executor(
+                                    pool, timed_gen_ascii_text, content, used_font
+                                )
+                            )
+                        else:
+                            art_text, used_font, seconds = timed_gen_ascii_text(
+                                content, used_font
+                            )
+                        art_cache.put(content, used_font, art_text)
+                    if timings is not None:
+                        timings.append((index, used_font, seconds))
+                    content, marked_up = art_text, None
+                return content, marked_up
+
+            results = ordered_map(
+                resolve,
+                items,
+                window=max(concurrency, jobs) * 2,
+                on_done=lambda: progress.advance(task),
+            )
+            async for content, marked_up in results:
+                if content is None:
+                    num_failed += 1
+                    continue
+                if dry_run:
+                    dry_run_content.append(content)
+                else:
+                    writer.add(content, marked_up)
+
+    return (
+        writer.num_succeeded,
+        num_failed + writer.num_failed,
+        writer.num_duplicates,
+        dry_run_content,
+    )
 
-    for source in track(sources, description="Adding banners"):
-        content = await get_source_content(source)
-        if content is None:
-            num_failed += 1
-            continue
-        if ascii:
-            # TODO: Add to generated ascii text markup field
-            # and the raw content to the content field then
-            # in the edit screen users could generate ascii text if they're
-            # not happy with the initial result
-            # or let the user pick a font in the arguments
-            content = gen_ascii_text(content, font=font)
-        if dry_run:
-            dry_run_content.append(content)
-        else:
-            try:
-                banner = Banner.create(content=content)
-                num_succeeded += 1
-            except Exception as e:
-                print(f"Failed to add banner: {e}")
-                num_failed += 1
-
-    return num_succeeded, num_failed, dry_run_content
-
-
-def delete_banner(banner_id: int) -> None:
-    """Delete a banner by ID."""
-    if Confirm.ask(f"Are you sure you want to delete banner #{banner_id}?"):
-        result = Banner.delete().where(Banner.id == banner_id).execute()
-        if result:
-            print(f"Banner #{banner_id} has been deleted")
-        else:
-            print("Failed to delete banner")
-
-
-def show_banner(id_or_random: str, content_only: bool = False) -> None:
-    """Show a single banner based on its ID or a random banner."""
-    if id_or_random == "random":
-        banner = Banner.select().order_by(fn.Random()).limit(1).get()
-    else:
-        banner = Banner.get_by_id(int(id_or_random))
 
-    if banner:
-        if content_only:
-            print(banner.content)
-        else:
-            if banner.markedUp is None or banner.markedUp == "":
-                print(banner.content)
-            else:
-                print(banner.markedUp)
-    else:
-        print("Banner not found")
+def print_ascii_timings(
+    timings: List[tuple[int, str, float]],
+    slowest: int = 10,
+) -> None:
+    """Print how long ASCII art generation took, per item and per font."""
+    from rich.console import Console
+    from rich.table import Table
+
+    items = Table(title="Slowest ASCII art items")
+    items.add_column("Item", justify="right")
+    items.add_column("Font")
+    items.add_column("Time (ms)", justify="right")
+    for index, font, seconds in sorted(timings, key=lambda t: -t[2])[:slowest]:
+        items.add_row(str(index), font, f"{seconds * 1000:.1f}")
+
+    per_font: dict[str, List[float]] = {}
+    for _, font, seconds in timings:
+        per_font.setdefault(font, []).append(seconds)
+    fonts = Table(title="ASCII art time per font")
+    fonts.add_column("Font")
+    fonts.add_column("Items", justify="right")
+    fonts.add_column("Mean (ms)", justify="right")
+    fonts.add_column("Total (ms)", justify="right")
+    for font, times in sorted(per_font.items(), key=lambda f: -sum(f[1])):
+        fonts.add_row(
+            font,
+            str(len(times)),
+            f"{sum(times) / len(times) * 1000:.1f}",
+            f"{sum(times) * 1000:.1f}",
+        )
 
+    # Keep stdout for the art itself, which matters with --dry-run.
+    console = Console(stderr=True)
+    console.print(items)
+    console.print(fonts)
 
-def reset_banner(banner_id: int) -> None:
-    banner = Banner.get_by_id(banner_id)
-    if banner:
-        banner.markup = banner.content
-        banner.save()
-        print(f"Banner #{banner_id} has been reset")
-    else:
-        print("Banner not found")
 
+def bulk_entries(cli_args: argparse.Namespace) -> Iterator[BannerEntry]:
+    """Chain the bulk sources given to `banner add`."""
+    for directory in cli_args.from_dir or ():
+        yield from iter_directory(directory, cli_args.pattern)
+    for archive_path in cli_args.from_archive or ():
+        yield from iter_archive(archive_path, cli_args.pattern)
+    for jsonl_path in cli_args.from_jsonl or ():
+        yield from iter_jsonl(jsonl_path)
 
-async def run() -> None:
-    """Run the application."""
-    app_db.connect(reuse_if_open=True)
-    create_tables()
-    cli_args = get_args()
 
+async def run_app(cli_args: argparse.Namespace) -> None:
+    """Run the commands that need the TUI, HTTP or ASCII-art stacks."""
+    # The ASCII art cache is a table in the SQLite database; with other
+    # stores it is kept in memory only.
+    art_cache.persistent = isinstance(get_store(), SqliteStore)
     if cli_args.command == "add":
-        sources = cli_args.source
-        num_succeeded, num_failed, dry_run_content = await add_banners(
-            sources,
-            cli_args.ascii,
-            cli_args.dry_run,
-            cli_args.font
+        art_cache.persistent &= not cli_args.no_art_cache
+        has_bulk = (
+            cli_args.from_dir or cli_args.from_archive or cli_args.from_jsonl
         )
+        timings: List[tuple[int, str, float]] = []
+        start = time.perf_counter()
+        with trace.span("add banners"):
+            num_succeeded, num_failed, num_duplicates, dry_run_content = await add_banners(
+                cli_args.source,
+                cli_args.ascii,
+                cli_args.dry_run,
+                cli_args.font,
+                concurrency=cli_args.concurrency,
+                per_host=cli_args.per_host,
+                timeout=cli_args.timeout,
+                retries=cli_args.retries,
+                batch_size=cli_args.batch_size,
+                skip_duplicates=not cli_args.allow_duplicates,
+                entries=bulk_entries(cli_args) if has_bulk else None,
+                jobs=cli_args.jobs,
+                timings=timings if cli_args.timings else None,
+            )
+        elapsed = time.perf_counter() - start
         if not cli_args.dry_run:
             print(
                 f"Added {num_succeeded} banners. {num_failed} failed."
+                + (
+                    f" Skipped {num_duplicates} duplicates."
+                    if num_duplicates else ""
+                )
             )
+            if has_bulk and elapsed > 0:
+                num_processed = num_succeeded + num_failed + num_duplicates
+                print(
+                    f"Processed {num_processed} banners in {elapsed:.1f}s "
+                    f"({num_processed / elapsed:.0f} banners/s)."
+                )
         else:
             for content in dry_run_content:
                 print(content)
-    elif cli_args.command == "delete":
-        delete_banner(cli_args.id)
-    elif cli_args.command == "show":
-        show_banner(cli_args.id_or_random, cli_args.content_only)
-    elif cli_args.command == "reset":
-        reset_banner(cli_args.id)
-    elif cli_args.command == "export":
-        export_banners(cli_args)
+        if cli_args.timings and timings:
+            print_ascii_timings(timings)
+            stats = art_cache.stats()
+            print(
+                f"ASCII art cache: {stats['hits']} memory hits, "
+                f"{stats['disk_hits']} disk hits, {stats['misses']} misses.",
+                file=sys.stderr,
+            )
     else:
-        await BannerApp(cli_args).run_async()
-
-    app_db.close()
+        with trace.span("run TUI"):
+            await BannerApp(cli_args).run_async()
@@ -0,0 +1,174 @@
+"""ASCII art generation.
+
+This module only imports `art` and the models, so it is cheap to load in
+worker processes.
+"""
+
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+
+import art
+from art import text2art
+from art.functions import indirect_font
+
+from ..models import AsciiArt
+
+NON_DETERMINISTIC_FONTS = frozenset({"mix"})
+"""Fonts that draw the same text differently every time."""
+
+
+def resolve_font(font: str, text: str) -> str:
+    """Resolve a font alias such as ``random`` to the font that will be used."""
+    return indirect_font(font.lower(), text)
+
+
+class AsciiArtCache:
+    """Memoizes `text2art` by text and font.
+
+    Results are kept in a bounded in-memory LRU and, if `persistent` is set,
+    in the `AsciiArt` table so they survive between runs. Font aliases are
+    resolved before the lookup, so ``random`` still picks a new font every
+    time but a font that was drawn before is not drawn again. It may be
+    used from worker threads.
+    """
+
+    def __init__(self, maxsize: int = 512, persistent: bool = True) -> None:
+        """Initialise the cache.
+
+        Args:
+            maxsize: How many results to keep in memory.
+            persistent: Also keep results in the database.
+        """
+        self.maxsize = maxsize
+        self.persistent = persistent
+        self._memory: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        """Lookups answered from memory."""
+        self.disk_hits = 0
+        """Lookups answered from the database."""
+        self.misses = 0
+        """Lookups that had to draw the art."""
+
+    @staticmethod
+    def _disk_key(text: str, font: str) -> str:
+        # The art version is part of the key in case a font changes.
+        return hashlib.sha256(
+            f"{art.__version__}\0{font}\0{text}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, text: str, font: str) -> str | None:
+        """Return cached art for a resolved font, or None on a miss."""
+        if font in NON_DETERMINISTIC_FONTS:
+            self.misses += 1
+            return None
+
+        key = (text, font)
+        with self._lock:
+            art_text = self._memory.get(key)
+            if art_text is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return art_text
+
+        if self.persistent:
+            row = AsciiArt.select(AsciiArt.art).where(
+                AsciiArt.key == self._disk_key(text, font)
+            ).tuples().first()
+            if row is not None:
+                self.disk_hits += 1
+                self._remember(key, row[0])
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, text: str, font: str, art_text: str) -> None:
+        """Store art drawn for a resolved font."""
+        if font in NON_DETERMINISTIC_FONTS:
+            return
+        self._remember((text, font), art_text)
+        if self.persistent:
+            AsciiArt.insert(
+                key=self._disk_key(text, font), art=art_text
+            ).on_conflict_ignore().execute()
+
+    def put_many(self, results: list[tuple[str, str, str]]) -> None:
+        """Store many ``(text, font, art)`` results with one database write."""
+        results = [r for r in results if r[1] not in NON_DETERMINISTIC_FONTS]
+        for text, font, art_text in results:
+            self._remember((text, font), art_text)
+        if self.persistent and results:
+            rows = [
+                {"key": self._disk_key(text, font), "art": art_text}
+                for text, font, art_text in results
+            ]
+            with AsciiArt._meta.database.atomic():
+                for start in range(0, len(rows), 400):
+                    AsciiArt.insert_many(
+                        rows[start:start + 400]
+                    ).on_conflict_ignore().execute()
+
+    def _remember(self, key: tuple[str, str], art_text: str) -> None:
+        with self._lock:
+            self._memory[key] = art_text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def render(self, text: str, font: str = "random") -> str:
+        """Draw text in a font, going through the cache."""
+        font = resolve_font(font, text)
+        art_text = self.get(text, font)
+        if art_text is None:
+            art_text = text2art(text, font=font)
+            self.put(text, font, art_text)
+        return art_text
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._memory),
+        }
+
+
+art_cache = AsciiArtCache()
+"""The cache shared by the command line and the TUI."""
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """The multiprocessing context for pools that draw ASCII art.
+
+    Forking a process that runs threads, as Textual and aiohttp's DNS
+    resolver do, can deadlock, so the workers come from a fork server, or
+    are spawned where there is none; neither starts with our threads.
+    """
+    start_methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in start_methods else "spawn"
+    )
+
+
+def gen_ascii_text(text: str, font: str = "random"):
+    art_text = art_cache.render(text, font=font)
+    return art_text
+
+
+def timed_gen_ascii_text(text: str, font: str = "random") -> tuple[str, str, float]:
+    """Generate ASCII art and time it, bypassing the cache.
+
+    Font aliases such as ``random`` are resolved first, so the font that
+    was actually used can be reported.
+
+    Returns:
+        The art, the font it was drawn in and the seconds it took.
+    """
+    start = time.perf_counter()
+    font = resolve_font(font, text)
+    art_text = text2art(text, font=font)
+    return art_text, font, time.perf_counter() - start
@@ -0,0 +1,519 @@
+"""Command line parsing and dispatch.
+
+Only the standard library is imported here, and the models and the stores
+once a command needs the library, so that ``show --pack`` never imports
+them and the read-mostly commands (``show``, ``delete``, ``reset``, ``export``
+and ``search``) never pull in the TUI, HTTP or ASCII-art stacks. Those are
+imported on demand by the commands that need them.
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+from typing import ContextManager, Iterator, List, Optional
+
+from .. import trace
+from ..settings import STORE_ENV, banner_data_dir
+
+FAST_COMMANDS = frozenset(
+    {"show", "delete", "reset", "export", "search", "compress"}
+)
+"""Commands that run without importing textual, aiohttp, validators or art."""
+
+READ_ONLY_COMMANDS = frozenset({"show", "export", "search"})
+"""Commands that open the library for reading (see `SqliteStore`)."""
+
+
+def get_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="banner",
+        description="Banner management application.",
+    )
+    parser.add_argument(
+        "--store",
+        default=None,
+        metavar="STORE",
+        help=(
+            "Where the banners are kept: sqlite:PATH, dir:PATH or memory: "
+            f"(default: ${STORE_ENV}, or the database in ~/.banner)"
+        )
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Time the phases of the command, print them and write them to "
+            f"a Chrome trace file (also ${trace.TRACE_ENV}=FILE)"
+        )
+    )
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        metavar="FILE",
+        help=(
+            "The trace file written by --profile, which it implies "
+            f"(default: {trace.DEFAULT_PATH})"
+        )
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help=(
+            "Trace as --profile does and also profile with cProfile, "
+            f"into the trace file with a .prof suffix (also ${trace.CPROFILE_ENV}=1)"
+        )
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+
+    """Add subcommand"""
+    add_parser = subparsers.add_parser(
+        "add", help="Add a new banner",)
+    add_parser.add_argument(
+        "source", nargs="*",
+        help="Content, file path(s), or URL(s) to add as banner(s)"
+    )
+    add_parser.add_argument(
+        "--from-dir",
+        action="append",
+        metavar="DIR",
+        help="Add every file below a directory, one banner per file"
+    )
+    add_parser.add_argument(
+        "--from-archive",
+        action="append",
+        metavar="ARCHIVE",
+        help="Add every file in a tar, tar.gz or zip archive, one banner per file"
+    )
+    add_parser.add_argument(
+        "--from-jsonl",
+        action="append",
+        metavar="FILE",
+        help=(
+            "Add banners from a JSON Lines file of strings or "
+            "{\"content\": ..., \"markedUp\": ...} objects"
+        )
+    )
+    add_parser.add_argument(
+        "--pattern",
+        default="*",
+        help="Only add files whose name matches this glob with --from-dir/--from-archive (default: '*')"
+    )
+    add_parser.add_argument(
+        "--ascii",
+        action="store_true",
+        help="Generate ASCII art from the input text"
+    )
+    add_parser.add_argument(
+        "--font",
+        default="random",
+        help="Font to use for ASCII art. Use 'random' to choose a random font."
+    )
+    add_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Generate ASCII art in a pool of N processes (default: 1, no pool)"
+    )
+    add_parser.add_argument(
+        "--no-art-cache",
+        action="store_true",
+        help="Do not read or write the ASCII art cache in ~/.banner"
+    )
+    add_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Report how long ASCII art took to generate per item and per font"
+    )
+    add_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the generated ASCII text to the console instead of adding it as a banner"
+    )
+    add_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of URLs to fetch at once (default: 16)"
+    )
+    add_parser.add_argument(
+        "--per-host",
+        type=int,
+        default=4,
+        help="Maximum number of URLs to fetch at once from one host (default: 4)"
+    )
+    add_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Timeout in seconds for fetching one URL (default: 30)"
+    )
+    add_parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="How many times to retry a failed URL fetch (default: 3)"
+    )
+    add_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="How many banners to write per transaction (default: 500)"
+    )
+    add_parser.add_argument(
+        "--allow-duplicates",
+        action="store_true",
+        help="Add banners even if a banner with the same content already exists"
+    )
+
+    """Delete subcommand"""
+    delete_parser = subparsers.add_parser(
+        "delete",
+        help="Delete a banner by ID"
+    )
+    delete_parser.add_argument(
+        "id",
+        type=int,
+        help="Banner ID"
+    )
+
+    """Edit subcommand"""
+    edit_parser = subparsers.add_parser(
+        "edit",
+        help="Edit a banner by ID"
+    )
+    edit_parser.add_argument(
+        "id",
+        type=int,
+        help="Banner ID"
+    )
+
+    """Reset subcommand"""
+    reset_parser = subparsers.add_parser(
+        "reset",
+        help="Reset the markup of a banner to its original content"
+    )
+    reset_parser.add_argument(
+        "id",
+        type=int,
+        help="Banner ID"
+    )
+
+    """Show subcommand"""
+    show_parser = subparsers.add_parser(
+        "show",
+        help="Show a banner by ID or a random banner"
+    )
+    show_parser.add_argument(
+        "id_or_random",
+        help="Banner ID or 'random' to show a random banner"
+    )
+    show_parser.add_argument(
+        "--content-only",
+        action="store_true",
+        help="Print the content of the banner rather than the markup"
+    )
+    show_parser.add_argument(
+        "--fit",
+        action="store_true",
+        help="Only pick from banners that fit in the terminal (with 'random')"
+    )
+    show_parser.add_argument(
+        "--pack",
+        default=None,
+        metavar="FILE",
+        help="Show a banner from a pack made by 'export --pack' instead of the library"
+    )
+    show_parser.add_argument(
+        "--prefetch",
+        nargs="?",
+        const=str(banner_data_dir / "next_banner.ans"),
+        default=None,
+        metavar="PATH",
+        help=(
+            "Print the banner pre-rendered into PATH, then render the next "
+            "random banner into it (default: ~/.banner/next_banner.ans)"
+        )
+    )
+
+    """Search subcommand"""
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search the content and markup of the banners"
+    )
+    search_parser.add_argument(
+        "query",
+        nargs="+",
+        help="Words to search for; banners must contain all of them"
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of banners to list (default: 20)"
+    )
+    search_parser.add_argument(
+        "--prefix",
+        action="store_true",
+        help="Also match words that start with the last word of the query"
+    )
+
+    """Compress subcommand"""
+    compress_parser = subparsers.add_parser(
+        "compress",
+        help="Compress the stored banners, or store them uncompressed again"
+    )
+    compress_parser.add_argument(
+        "--off",
+        action="store_true",
+        help="Decompress every banner and stop compressing new ones"
+    )
+    compress_parser.add_argument(
+        "--level",
+        type=int,
+        choices=range(1, 10),
+        default=6,
+        metavar="1-9",
+        help="zlib compression level (default: 6)"
+    )
+    compress_parser.add_argument(
+        "--no-dictionary",
+        action="store_true",
+        help="Do not train a shared dictionary on the library"
+    )
+    compress_parser.add_argument(
+        "--dictionary-size",
+        type=int,
+        default=32 * 1024,
+        help="Size of the shared dictionary in bytes (default: 32768)"
+    )
+    compress_parser.add_argument(
+        "--sample",
+        type=int,
+        default=2000,
+        help="How many banners to train the dictionary on (default: 2000)"
+    )
+
+    """Export subcommand"""
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export banners to a file or multiple files"
+    )
+    export_parser.add_argument(
+        "--single-file",
+        action="store_true",
+        help="Export all banners to a single file"
+    )
+    export_parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Compress the single export file with gzip"
+    )
+    export_parser.add_argument(
+        "--archive",
+        choices=["tar", "tar.gz", "zip"],
+        default=None,
+        help="Export to an archive holding one file per banner"
+    )
+    export_parser.add_argument(
+        "--pack",
+        default=None,
+        metavar="FILE",
+        help="Export to a single read-only pack file for 'show --pack'"
+    )
+    export_parser.add_argument(
+        "--ansi",
+        action="store_true",
+        help="Also store every banner rendered for a terminal in the pack (with --pack)"
+    )
+    export_parser.add_argument(
+        "--color-system",
+        choices=["standard", "256", "truecolor"],
+        default="truecolor",
+        help="The colours to render for with --ansi (default: truecolor)"
+    )
+    export_parser.add_argument(
+        "--separator",
+        default=None,
+        help="Separator between banners in a single file (default: '\\n---\\n')"
+    )
+    export_parser.add_argument(
+        "--base-name",
+        default=None,
+        help="Base name for multiple files (default: 'banner')"
+    )
+    export_parser.add_argument(
+        "--extension",
+        default=None,
+        help="Extension for multiple files (default: 'txt')"
+    )
+    export_parser.add_argument(
+        "file_path",
+        nargs="?",
+        help="Path to the file where you want to export the banners ('-' for stdout)"
+    )
+
+    # Finally, parse the command line.
+    args = parser.parse_args(argv)
+
+    if uses_store(args):
+        from ..storage import make_store
+        try:
+            make_store(args.store)
+        except ValueError as e:
+            parser.error(f"argument --store: {e}")
+
+    if args.command == "add":
+        if not (
+            args.source or args.from_dir or args.from_archive or args.from_jsonl
+        ):
+            add_parser.error(
+                "a source or one of --from-dir, --from-archive, --from-jsonl is required"
+            )
+        # Refuse an unreadable bulk source before anything is added.
+        from .sources import bulk_source_error
+        for option, paths in (
+            ("--from-dir", args.from_dir),
+            ("--from-archive", args.from_archive),
+            ("--from-jsonl", args.from_jsonl),
+        ):
+            for source_path in paths or ():
+                error = bulk_source_error(option, source_path)
+                if error is not None:
+                    add_parser.error(f"argument {option}: {error}")
+        # The font list lives in `art`, which is only worth importing
+        # when we are actually adding banners.
+        from art import ASCII_FONTS
+        if args.font != "random" and args.font not in ASCII_FONTS:
+            add_parser.error(
+                f"argument --font: invalid choice: '{args.font}'"
+            )
+    elif args.command == "show":
+        if args.prefetch is not None and args.id_or_random != "random":
+            show_parser.error("--prefetch can only be used with 'random'")
+        if args.fit and args.id_or_random != "random":
+            show_parser.error("--fit can only be used with 'random'")
+        if args.pack is not None and args.prefetch is not None:
+            show_parser.error("--prefetch cannot be used with --pack")
+    elif args.command == "export":
+        if args.pack is not None and (
+            args.archive or args.single_file or args.gzip or args.file_path
+        ):
+            export_parser.error(
+                "--pack cannot be used with --archive, --single-file, --gzip or a file path"
+            )
+        if args.ansi and args.pack is None:
+            export_parser.error("--ansi can only be used with --pack")
+
+    return args
+
+
+def run_fast_command(cli_args: argparse.Namespace) -> None:
+    """Run one of the `FAST_COMMANDS`."""
+    if not uses_store(cli_args):
+        with trace.span("import pack"):
+            from .pack import show_pack_banner
+        show_pack_banner(
+            cli_args.pack, cli_args.id_or_random,
+            cli_args.content_only, cli_args.fit,
+        )
+        return
+
+    with trace.span("import commands"):
+        from . import commands
+
+    if cli_args.command == "delete":
+        commands.delete_banner(cli_args.id)
+    elif cli_args.command == "show":
+        if cli_args.prefetch is not None:
+            commands.show_prefetched_banner(
+                cli_args.prefetch, cli_args.content_only, cli_args.fit
+            )
+        else:
+            commands.show_banner(
+                cli_args.id_or_random, cli_args.content_only, cli_args.fit
+            )
+    elif cli_args.command == "reset":
+        commands.reset_banner(cli_args.id)
+    elif cli_args.command == "export":
+        commands.export_banners(cli_args)
+    elif cli_args.command == "compress":
+        commands.compress_banners(cli_args)
+    elif cli_args.command == "search":
+        commands.search_banners(
+            " ".join(cli_args.query), cli_args.limit, cli_args.prefix
+        )
+
+
+def uses_store(cli_args: argparse.Namespace) -> bool:
+    """Whether a command needs the library, rather than only a pack."""
+    return not (cli_args.command == "show" and cli_args.pack is not None)
+
+
+@contextmanager
+def opened_store(cli_args: argparse.Namespace) -> Iterator[None]:
+    """Make the store a command asks for current, open while it runs."""
+    if not uses_store(cli_args):
+        yield
+        return
+    with trace.span("import stores"):
+        from ..storage import make_store, use_store
+    store = make_store(
+        cli_args.store, read_only=cli_args.command in READ_ONLY_COMMANDS
+    )
+    use_store(store)
+    with trace.span("open store", store=store.scheme):
+        store.open()
+    try:
+        yield
+    finally:
+        with trace.span("close store"):
+            store.close()
+
+
+def tracing(cli_args: argparse.Namespace) -> ContextManager:
+    """Trace a command if ``--profile`` or the environment asks for it."""
+    profile = cli_args.profile or cli_args.profile_out is not None
+    return trace.tracing(
+        cli_args.profile_out or (trace.DEFAULT_PATH if profile else None),
+        cli_args.cprofile,
+        summary=profile or cli_args.cprofile,
+    )
+
+
+async def run(cli_args: Optional[argparse.Namespace] = None) -> None:
+    """Run the application."""
+    if cli_args is None:
+        cli_args = get_args()
+
+    with tracing(cli_args), opened_store(cli_args):
+        with trace.span("run command", command=cli_args.command):
+            if cli_args.command in FAST_COMMANDS:
+                run_fast_command(cli_args)
+            else:
+                with trace.span("import app"):
+                    from .app import run_app
+                await run_app(cli_args)
+
+
+def main() -> None:
+    """Parse the command line and run it.
+
+    The fast commands are run synchronously so that they do not even pay
+    for importing `asyncio`.
+    """
+    started = time.perf_counter()
+    cli_args = get_args()
+    parsed = time.perf_counter()
+
+    with tracing(cli_args):
+        trace.record("imports", trace.LOADED_AT, started)
+        trace.record("parse arguments", started, parsed)
+        if cli_args.command in FAST_COMMANDS:
+            with opened_store(cli_args):
+                with trace.span("run command", command=cli_args.command):
+                    run_fast_command(cli_args)
+        else:
+            import asyncio
+            asyncio.run(run(cli_args))
@@ -0,0 +1,375 @@
+"""The lightweight command line commands.
+
+These commands only need the models and the stores, so this module must not
+import textual, aiohttp, validators or art (see `banner.app.cli.FAST_COMMANDS`).
+"""
+
+from contextlib import contextmanager, nullcontext
+from os import path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterator
+import argparse
+import gzip
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+from rich import print
+
+from .. import trace
+from ..models import Banner
+from ..storage import get_store, SqliteStore
+from .render import print_banner, render_banner, terminal_size, write_bytes
+
+if TYPE_CHECKING:
+    from rich.text import Text
+
+
+EXPORT_BUFFER_SIZE = 1024 * 1024
+"""The write buffer size used when exporting banners."""
+
+
+def iter_banner_contents() -> Iterator[str]:
+    """Stream the content of every banner in id order."""
+    yield from get_store().iter_contents()
+
+
+def iter_banners(batch_size: int = 500) -> Iterator[Banner]:
+    """Stream every banner in id order, a batch at a time."""
+    store = get_store()
+    after = None
+    while True:
+        banners = store.list_banners(after=after, limit=batch_size)
+        if not banners:
+            return
+        yield from banners
+        after = banners[-1].id
+
+
+@contextmanager
+def open_export_target(file_path: str) -> Iterator[BinaryIO]:
+    """Open a buffered binary stream to export to; ``-`` means stdout."""
+    if file_path == "-":
+        sys.stdout.flush()
+        try:
+            yield sys.stdout.buffer
+            sys.stdout.buffer.flush()
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`), which is not an error.
+            # Point stdout at devnull so the flush at exit does not fail.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    else:
+        with open(file_path, "wb", buffering=EXPORT_BUFFER_SIZE) as f:
+            yield f
+
+
+def _export_status(message: str, file_path: str) -> None:
+    # Keep stdout clean for the exported data when it is the target.
+    print(message, file=sys.stderr if file_path == "-" else sys.stdout)
+
+
+def _target_name(file_path: str) -> str:
+    return "stdout" if file_path == "-" else path.abspath(file_path)
+
+
+def export_single_file(args: argparse.Namespace) -> None:
+    extension = args.extension or "txt"
+    if args.gzip:
+        extension += ".gz"
+    file_path = args.file_path or f"banners.{extension}"
+    separator = (args.separator or "\n---\n").encode("utf-8")
+
+    num_banners = 0
+    with open_export_target(file_path) as target:
+        out = (
+            gzip.GzipFile(fileobj=target, mode="wb")
+            if args.gzip else nullcontext(target)
+        )
+        with out as f:
+            for content in iter_banner_contents():
+                f.write(content.encode("utf-8"))
+                f.write(separator)
+                num_banners += 1
+
+    _export_status(
+        f"Exported {num_banners} banners to {_target_name(file_path)}",
+        file_path,
+    )
+
+
+def export_archive(args: argparse.Namespace) -> None:
+    """Export every banner as its own member of a tar or zip archive."""
+    base_name = args.base_name or "banner"
+    extension = args.extension or "txt"
+    file_path = args.file_path or f"banners.{args.archive}"
+
+    num_banners = 0
+    with open_export_target(file_path) as target:
+        if args.archive == "zip":
+            with zipfile.ZipFile(
+                target, "w", compression=zipfile.ZIP_DEFLATED
+            ) as archive:
+                for i, content in enumerate(iter_banner_contents(), start=1):
+                    archive.writestr(
+                        f"{base_name}_{i}.{extension}",
+                        content.encode("utf-8"),
+                    )
+                    num_banners = i
+        else:
+            out = (
+                gzip.GzipFile(fileobj=target, mode="wb", compresslevel=6)
+                if args.archive == "tar.gz" else nullcontext(target)
+            )
+            mtime = int(time.time())
+            with out as f, tarfile.open(fileobj=f, mode="w|") as archive:
+                for i, content in enumerate(iter_banner_contents(), start=1):
+                    data = content.encode("utf-8")
+                    info = tarfile.TarInfo(f"{base_name}_{i}.{extension}")
+                    info.size = len(data)
+                    info.mtime = mtime
+                    archive.addfile(info, io.BytesIO(data))
+                    # TarFile remembers every member it writes; nothing
+                    # reads them back while streaming, so don't let the
+                    # list grow with the library.
+                    archive.members.clear()
+                    num_banners = i
+
+    _export_status(
+        f"Exported {num_banners} banners to {_target_name(file_path)}",
+        file_path,
+    )
+
+
+def _ansi_renderer(color_system: str) -> Callable[[str], bytes]:
+    """Return a function rendering markup to ANSI bytes for a pack."""
+    from rich.console import Console
+
+    console = Console(force_terminal=True, color_system=color_system, width=80)
+
+    def render(text: str) -> bytes:
+        # Soft wrapping leaves the wrapping to the terminal the pack is
+        # shown in, whatever its width.
+        with console.capture() as capture:
+            console.print(text, soft_wrap=True)
+        return capture.get().encode("utf-8", errors="replace")
+
+    return render
+
+
+def export_pack(args: argparse.Namespace) -> None:
+    """Export every banner to a pack that ``banner show --pack`` reads.
+
+    The pack is written next to its final path and moved into place, so a
+    shell showing banners from it never sees half a pack.
+    """
+    from .pack import write_pack
+
+    render = _ansi_renderer(args.color_system) if args.ansi else None
+    file_path = args.pack
+    directory = path.dirname(path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pack-")
+    try:
+        with os.fdopen(fd, "wb", buffering=EXPORT_BUFFER_SIZE) as f:
+            num_banners = write_pack(
+                f, iter_banners(), render, args.color_system if args.ansi else None
+            )
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    print(f"Exported {num_banners} banners to {path.abspath(file_path)}")
+
+
+@trace.traced("export")
+def export_banners(args: argparse.Namespace) -> None:
+    if args.pack:
+        export_pack(args)
+    elif args.archive:
+        export_archive(args)
+    elif args.single_file or args.gzip or args.file_path == "-":
+        export_single_file(args)
+    else:
+        base_name = args.base_name or "banner"
+        extension = args.extension or "txt"
+        for i, content in enumerate(iter_banner_contents(), start=1):
+            file_path = f"{base_name}_{i}.{extension}"
+            with open(file_path, "wb", buffering=EXPORT_BUFFER_SIZE) as f:
+                f.write(content.encode("utf-8"))
+
+            print(f"Exported banner {i} to {path.abspath(file_path)}")
+
+
+@trace.traced("delete")
+def delete_banner(banner_id: int) -> None:
+    """Delete a banner by ID."""
+    from rich.prompt import Confirm
+
+    if Confirm.ask(f"Are you sure you want to delete banner #{banner_id}?"):
+        if get_store().delete(banner_id):
+            print(f"Banner #{banner_id} has been deleted")
+        else:
+            print("Failed to delete banner")
+
+
+def random_banner(fit: bool = False) -> "Banner | None":
+    """Pick a random banner, optionally one that fits in the terminal."""
+    if not fit:
+        return get_store().random()
+    columns, lines = terminal_size()
+    # Leave a line for the prompt below the banner.
+    return get_store().random(max_width=columns, max_height=lines - 1)
+
+
+@trace.traced("show")
+def show_banner(
+    id_or_random: str,
+    content_only: bool = False,
+    fit: bool = False,
+) -> None:
+    """Show a single banner based on its ID or a random banner."""
+    with trace.span("pick banner"):
+        if id_or_random == "random":
+            banner = random_banner(fit)
+        else:
+            banner = get_store().get(int(id_or_random))
+
+    if banner:
+        print_banner(banner, content_only)
+    else:
+        print("Banner not found")
+
+
+def search_snippet(snippet: str) -> "Text":
+    """Turn a `BannerStore.search` snippet into text with the matches styled."""
+    from rich.text import Text
+
+    # Banners span many lines; the snippet should take one.
+    snippet = snippet.replace("\n", " ")
+    text = Text(no_wrap=True, overflow="ellipsis")
+    # The snippet marks each match with \x02 ... \x03.
+    for index, part in enumerate(snippet.replace("\x03", "\x02").split("\x02")):
+        text.append(part, style="bold reverse" if index % 2 else "")
+    return text
+
+
+@trace.traced("search")
+def search_banners(query: str, limit: int = 20, prefix: bool = False) -> None:
+    """List the banners matching a query, best match first."""
+    with trace.span("query", limit=limit) as span:
+        matches = get_store().search(query, limit, prefix)
+        span.set(matches=len(matches))
+    if not matches:
+        print("No banners found")
+        return
+    with trace.span("print results"):
+        for banner_id, snippet, _rank in matches:
+            print(f"[bold]#{banner_id}[/bold]", search_snippet(snippet))
+
+
+@trace.traced("prefetch")
+def prefetch_banner(
+    file_path: str,
+    content_only: bool = False,
+    fit: bool = False,
+) -> bool:
+    """Render a random banner into a file for the next show.
+
+    The file is replaced atomically so a shell reading it concurrently
+    sees either the old banner or the new one. It is rendered for a
+    terminal even when stdout is not one, since it is meant to be
+    ``cat``-ed into a terminal later.
+
+    Returns:
+        False if there are no banners to prefetch.
+    """
+    from rich.console import Console
+
+    banner = random_banner(fit)
+    if banner is None:
+        return False
+    data = render_banner(banner, content_only, Console(force_terminal=True))
+
+    directory = path.dirname(path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".prefetch-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+@trace.traced("show prefetched")
+def show_prefetched_banner(
+    file_path: str,
+    content_only: bool = False,
+    fit: bool = False,
+) -> None:
+    """Show the banner prefetched into a file, then prefetch the next one.
+
+    If nothing has been prefetched yet a random banner is shown instead.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        data = b""
+
+    if data:
+        write_bytes(data)
+    else:
+        show_banner("random", content_only, fit)
+
+    prefetch_banner(file_path, content_only, fit)
+
+
+def _format_size(num_bytes: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{num_bytes} B"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GiB"
+
+
+@trace.traced("compress")
+def compress_banners(args: argparse.Namespace) -> None:
+    """Compress every banner, or decompress them with ``--off``."""
+    from ..models.migrations import compress_library, decompress_library
+
+    if not isinstance(get_store(), SqliteStore):
+        print("Only the SQLite store can be compressed")
+        return
+    if args.off:
+        num_banners, before, after = decompress_library()
+        action = "Decompressed"
+    else:
+        num_banners, before, after = compress_library(
+            level=args.level,
+            dictionary=not args.no_dictionary,
+            dictionary_size=args.dictionary_size,
+            sample_size=args.sample,
+        )
+        action = "Compressed"
+    print(
+        f"{action} {num_banners} banners: "
+        f"{_format_size(before)} -> {_format_size(after)}"
+    )
+
+
+@trace.traced("reset")
+def reset_banner(banner_id: int) -> None:
+    banner = get_store().get(banner_id)
+    if banner:
+        banner.markedUp = None
+        get_store().save(banner)
+        print(f"Banner #{banner_id} has been reset")
+    else:
+        print("Banner not found")
@@ -0,0 +1,131 @@
+"""Fetching banners from URLs over one pooled HTTP session."""
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+import aiohttp
+from rich import print
+
+T = TypeVar("T")
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+"""HTTP statuses that are worth retrying."""
+
+
+class UrlFetcher:
+    """Fetches URLs through one shared, pooled `aiohttp.ClientSession`.
+
+    The connector caps the number of open connections overall and per host,
+    so callers can start as many fetches as they like and the pool decides
+    how many actually run at once.
+    """
+
+    def __init__(
+        self,
+        limit: int = 16,
+        limit_per_host: int = 4,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ) -> None:
+        """Initialise the fetcher.
+
+        Args:
+            limit: The maximum number of concurrent connections.
+            limit_per_host: The maximum number of concurrent connections
+                to the same host.
+            timeout: The total timeout for one request, in seconds.
+            retries: How many times to retry a failed request.
+            backoff: The delay before the first retry, in seconds. It
+                doubles with every further retry.
+        """
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._retries = retries
+        self._backoff = backoff
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "UrlFetcher":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+            ),
+            timeout=self._timeout,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url: str) -> str | None:
+        """Fetch the text at a URL, retrying transient failures.
+
+        Returns:
+            The text, or None if the URL could not be fetched.
+        """
+        if self._session is None:
+            raise RuntimeError("UrlFetcher must be used as an async context manager")
+
+        for attempt in range(self._retries + 1):
+            try:
+                async with self._session.get(url) as response:
+                    if (
+                        response.status in RETRY_STATUSES
+                        and attempt < self._retries
+                    ):
+                        await asyncio.sleep(self._backoff * 2 ** attempt)
+                        continue
+                    response.raise_for_status()
+                    return await response.text()
+            except aiohttp.ClientResponseError as e:
+                print(
+                    f"Error importing banner from URL '{url}': {e}"
+                )
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < self._retries:
+                    await asyncio.sleep(self._backoff * 2 ** attempt)
+                    continue
+                print(
+                    f"Error importing banner from URL '{url}': "
+                    f"{e or type(e).__name__}"
+                )
+                return None
+        return None
+
+
+async def ordered_map(
+    func: Callable[[str], Awaitable[T]],
+    items: Iterable[str],
+    window: int,
+    on_done: Callable[[], None] | None = None,
+) -> AsyncIterator[T]:
+    """Run `func` over `items` concurrently, yielding results in input order.
+
+    At most `window` calls are in flight at once, so memory stays bounded
+    however many items there are. `on_done` is called as each call
+    finishes, in completion order, which is what progress reporting wants.
+    """
+    in_flight: "deque[asyncio.Future[T]]" = deque()
+
+    def start(item: str) -> None:
+        task = asyncio.ensure_future(func(item))
+        if on_done is not None:
+            task.add_done_callback(lambda _: on_done())
+        in_flight.append(task)
+
+    try:
+        for item in items:
+            start(item)
+            if len(in_flight) >= window:
+                yield await in_flight.popleft()
+        while in_flight:
+            yield await in_flight.popleft()
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,290 @@
+"""Banner packs: a whole library frozen into one read-only file.
+
+A pack is written by ``banner export --pack FILE`` and read by ``banner
+show --pack FILE``, which maps the file into memory and reads the one
+banner it shows, so showing a banner costs the same however big the pack
+is and never opens the library. The layout, all little endian, is::
+
+    header      `HEADER`
+    bodies      for each banner: its content, its markup, and optionally
+                its pre-rendered ANSI output and that of its content alone
+    entries     `ENTRY` for each banner, in id order
+    id index    `ID_SLOT` for each id from the smallest to the largest id:
+                the number of the id's entry plus one, or 0 for a gap
+
+Picking a random banner picks a random entry; showing an id looks its
+entry up in the id index. A library whose ids are mostly gaps gets no id
+index, and ids are found by bisecting the entries instead. Showing a
+banner from a pack (`show_pack_banner`) imports neither the models nor
+the stores, and Rich only if the banner has to be rendered.
+"""
+
+import mmap
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterable, NamedTuple
+
+from .. import trace
+from .render import terminal_size, write_bytes
+
+if TYPE_CHECKING:
+    from ..models import Banner
+
+MAGIC = b"BNRPACK\0"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHHIIIQQ16s")
+"""Magic, version, flags, entry count, smallest id, id span, entries
+offset, id index offset and the colour system of the ANSI output."""
+
+ENTRY = struct.Struct("<IHHQIIII")
+"""Id, width, height, offset of the bodies, then the lengths of the content,
+the markup, the ANSI output and the ANSI output of the content alone."""
+
+ID_SLOT = struct.Struct("<I")
+
+FLAG_ANSI = 1
+"""The pack holds pre-rendered ANSI output."""
+
+FIT_ATTEMPTS = 256
+"""How many random entries to try before scanning for one that fits."""
+
+MAX_GAPS = 4
+"""Skip the id index if it would have more than this many slots per banner."""
+
+
+class PackError(Exception):
+    """The file is not a banner pack this version can read."""
+
+
+class PackEntry(NamedTuple):
+    banner_id: int
+    width: int
+    height: int
+    offset: int
+    content_length: int
+    markup_length: int
+    ansi_length: int
+    content_ansi_length: int
+
+
+class BannerPack:
+    """A pack mapped into memory for reading."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise PackError(f"{path} is empty") from None
+        if len(self._map) < HEADER.size:
+            raise PackError(f"{path} is not a banner pack")
+        (
+            magic, version, self.flags, self.count, self.min_id, self.id_span,
+            self._entries_offset, self._ids_offset, color_system,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise PackError(f"{path} is not a banner pack")
+        if version != VERSION:
+            raise PackError(f"{path} is a version {version} pack; expected {VERSION}")
+        self.color_system = color_system.rstrip(b"\0").decode("ascii") or None
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "BannerPack":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def has_ansi(self) -> bool:
+        return bool(self.flags & FLAG_ANSI)
+
+    def entry(self, index: int) -> PackEntry:
+        """The entry at an index, from 0 to `count` - 1."""
+        return PackEntry._make(
+            ENTRY.unpack_from(self._map, self._entries_offset + index * ENTRY.size)
+        )
+
+    def find(self, banner_id: int) -> PackEntry | None:
+        """The entry of a banner id, or None if the pack does not hold it."""
+        if not self.id_span:
+            index = bisect_left(
+                range(self.count), banner_id,
+                key=lambda index: self.entry(index).banner_id,
+            )
+            if index < self.count and self.entry(index).banner_id == banner_id:
+                return self.entry(index)
+            return None
+        slot = banner_id - self.min_id
+        if not 0 <= slot < self.id_span:
+            return None
+        index, = ID_SLOT.unpack_from(self._map, self._ids_offset + slot * ID_SLOT.size)
+        return self.entry(index - 1) if index else None
+
+    def random(
+        self,
+        max_width: int | None = None,
+        max_height: int | None = None,
+    ) -> PackEntry | None:
+        """Pick an entry uniformly at random, optionally one no bigger than a size."""
+        if not self.count:
+            return None
+        if max_width is None and max_height is None:
+            return self.entry(random.randrange(self.count))
+
+        def fits(entry: PackEntry) -> bool:
+            return (max_width is None or entry.width <= max_width) and (
+                max_height is None or entry.height <= max_height
+            )
+
+        for _ in range(FIT_ATTEMPTS):
+            entry = self.entry(random.randrange(self.count))
+            if fits(entry):
+                return entry
+        # Few banners fit: pick from all those that do, reading only the
+        # entries.
+        fitting = [index for index in range(self.count) if fits(self.entry(index))]
+        return self.entry(random.choice(fitting)) if fitting else None
+
+    def _body(self, entry: PackEntry, start: int, length: int) -> bytes:
+        offset = entry.offset + start
+        return self._map[offset:offset + length]
+
+    def content(self, entry: PackEntry) -> str:
+        return self._body(entry, 0, entry.content_length).decode("utf-8")
+
+    def text(self, entry: PackEntry, content_only: bool = False) -> str:
+        """The text that is shown for a banner: its markup unless it has none."""
+        if content_only or not entry.markup_length:
+            return self.content(entry)
+        return self._body(
+            entry, entry.content_length, entry.markup_length
+        ).decode("utf-8")
+
+    def ansi(self, entry: PackEntry, content_only: bool = False) -> bytes | None:
+        """The pre-rendered output of a banner, or None if the pack has none."""
+        if not self.has_ansi:
+            return None
+        start = entry.content_length + entry.markup_length
+        if content_only and entry.markup_length:
+            return self._body(
+                entry, start + entry.ansi_length, entry.content_ansi_length
+            )
+        return self._body(entry, start, entry.ansi_length)
+
+
+def write_pack(
+    f: BinaryIO,
+    banners: Iterable["Banner"],
+    render: Callable[[str], bytes] | None = None,
+    color_system: str | None = None,
+) -> int:
+    """Write banners as a pack to a seekable binary file.
+
+    Bodies are streamed; only the fixed size entries are kept until the
+    end, so memory grows by `ENTRY.size` bytes and an id per banner.
+
+    Args:
+        banners: The banners in increasing id order.
+        render: If given, called as ``render(text)`` to get the ANSI output
+            stored with each banner.
+        color_system: The colour system `render` renders for.
+
+    Returns:
+        The number of banners written.
+    """
+    from ..models import Banner
+
+    f.write(b"\0" * HEADER.size)
+    offset = HEADER.size
+    entries = bytearray()
+    ids = array("I")
+    for banner in banners:
+        banner_id, content, marked_up = banner.id, banner.content, banner.markedUp or None
+        if banner.width is None or banner.height is None:
+            width, height, _line_count = Banner.dimensions(content, marked_up)
+        else:
+            width, height = banner.width, banner.height
+        bodies = [content.encode("utf-8"), (marked_up or "").encode("utf-8")]
+        if render is not None:
+            bodies.append(render(marked_up or content))
+            # Without markup the content renders the same as the banner.
+            bodies.append(render(content) if marked_up else b"")
+        else:
+            bodies += [b"", b""]
+        entries += ENTRY.pack(
+            banner_id, min(width, 0xFFFF), min(height, 0xFFFF), offset,
+            *(len(body) for body in bodies),
+        )
+        f.writelines(bodies)
+        offset += sum(len(body) for body in bodies)
+        ids.append(banner_id)
+
+    entries_offset = offset
+    f.write(entries)
+    ids_offset = entries_offset + len(entries)
+    min_id = ids[0] if ids else 0
+    id_span = ids[-1] - min_id + 1 if ids else 0
+    if id_span > MAX_GAPS * len(ids):
+        id_span = 0
+    if id_span:
+        slots = bytearray(id_span * ID_SLOT.size)
+        for index, banner_id in enumerate(ids, start=1):
+            ID_SLOT.pack_into(slots, (banner_id - min_id) * ID_SLOT.size, index)
+        f.write(slots)
+
+    f.seek(0)
+    f.write(HEADER.pack(
+        MAGIC, VERSION, FLAG_ANSI if render is not None else 0, len(ids),
+        min_id, id_span, entries_offset, ids_offset,
+        (color_system or "").encode("ascii"),
+    ))
+    return len(ids)
+
+
+@trace.traced("show pack")
+def show_pack_banner(
+    pack_path: str,
+    id_or_random: str,
+    content_only: bool = False,
+    fit: bool = False,
+) -> None:
+    """Show a banner from a pack made by ``banner export --pack``.
+
+    Only the header, one entry and the banner itself are read from the
+    pack, and the library is not opened at all. Output rendered into the
+    pack is written as it is when stdout is a terminal; otherwise the text
+    is rendered here, as `show_banner` would.
+    """
+    try:
+        with trace.span("open pack"):
+            pack = BannerPack(pack_path)
+    except (OSError, PackError) as e:
+        print(f"Cannot read the pack: {e}")
+        return
+
+    with pack:
+        with trace.span("pick banner"):
+            if id_or_random != "random":
+                entry = pack.find(int(id_or_random))
+            elif fit:
+                columns, lines = terminal_size()
+                entry = pack.random(max_width=columns, max_height=lines - 1)
+            else:
+                entry = pack.random()
+        if entry is None:
+            print("Banner not found")
+            return
+
+        data = pack.ansi(entry, content_only) if sys.stdout.isatty() else None
+        if data is not None:
+            write_bytes(data)
+        else:
+            from rich import get_console
+            get_console().print(pack.text(entry, content_only))
@@ -0,0 +1,93 @@
+"""Rendering banners to the terminal through the ANSI cache.
+
+Rich has to parse the markup, measure it and render segments every time a
+banner is printed. The result only depends on the banner, the terminal width
+and the colour system, so the bytes are cached by the store and written
+straight to stdout on later shows.
+"""
+
+import os
+import sys
+from typing import TYPE_CHECKING
+
+from .. import trace
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from ..models import Banner
+
+
+def banner_text(banner: "Banner", content_only: bool = False) -> str:
+    """The text that is shown for a banner."""
+    if content_only or banner.markedUp is None or banner.markedUp == "":
+        return banner.content
+    return banner.markedUp
+
+
+def render_banner(
+    banner: "Banner",
+    content_only: bool = False,
+    console: "Console | None" = None,
+) -> bytes:
+    """Render a banner to ANSI bytes, using and filling the cache.
+
+    Args:
+        banner: The banner to render.
+        content_only: Render the content rather than the markup.
+        console: The console to render for (default: rich's global console).
+    """
+    if console is None:
+        with trace.span("set up console"):
+            from rich import get_console
+            console = get_console()
+
+    from ..storage import get_store
+
+    key = (console.width, console.color_system or "none", content_only)
+
+    store = get_store()
+    with trace.span("render cache lookup") as span:
+        data = store.lookup_render(banner.id, *key)
+        span.set(hit=data is not None)
+    if data is None:
+        with trace.span("render", width=console.width):
+            with console.capture() as capture:
+                console.print(banner_text(banner, content_only))
+            data = capture.get().encode(console.encoding, errors="replace")
+        with trace.span("render cache store"):
+            store.store_render(banner.id, *key, data)
+    return data
+
+
+@trace.traced("write output")
+def write_bytes(data: bytes) -> None:
+    """Write already rendered output to stdout."""
+    sys.stdout.flush()
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(data.decode("utf-8", errors="replace"))
+    else:
+        buffer.write(data)
+    sys.stdout.flush()
+
+
+def print_banner(banner: "Banner", content_only: bool = False) -> None:
+    """Print a banner to the terminal through the cache."""
+    write_bytes(render_banner(banner, content_only))
+
+
+def terminal_size() -> os.terminal_size:
+    """The size of the terminal we are running in.
+
+    Stdout may be redirected, e.g. when prefetching in the background, so
+    stderr and stdin are asked too before falling back to ``$COLUMNS`` and
+    ``$LINES`` or 80x24.
+    """
+    for stream in (sys.__stdout__, sys.__stderr__, sys.__stdin__):
+        try:
+            return os.get_terminal_size(stream.fileno())
+        except (AttributeError, ValueError, OSError):
+            continue
+    import shutil
+    return shutil.get_terminal_size()
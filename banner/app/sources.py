@@ -0,0 +1,155 @@
+"""Lazy bulk sources for `banner add`.
+
+Each function yields ``(content, markedUp)`` pairs one entry at a time, so
+that importing a large collection never holds more than the add pipeline's
+window of banners in memory.
+"""
+
+import fnmatch
+import gzip
+import json
+import os
+import tarfile
+import zipfile
+import zlib
+from typing import Iterator, Tuple
+
+from rich import print
+
+BannerEntry = Tuple["str | None", "str | None"]
+"""The content of a banner, or None if it could not be read, and its markup."""
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+def _unreadable(path: str, error: Exception) -> BannerEntry:
+    """Report a path that could not be read, as an entry that failed."""
+    reason = error.strerror if isinstance(error, OSError) and error.strerror else error
+    print(f"Could not read '{path}': {reason}")
+    return None, None
+
+
+def bulk_source_error(option: str, path: str) -> str | None:
+    """Why `path`, given to a bulk `banner add` option, cannot be read.
+
+    Only what can be told without reading the whole source is checked, so
+    that `banner add` can refuse it before adding anything.
+
+    Returns:
+        The reason, or None if the path looks readable.
+    """
+    if option == "--from-dir":
+        if not os.path.isdir(path):
+            return f"'{path}' is not a directory"
+    elif not os.path.isfile(path):
+        return f"'{path}' does not exist"
+    elif not os.access(path, os.R_OK):
+        return f"'{path}' cannot be read"
+    elif option == "--from-archive":
+        try:
+            is_archive = zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+        except (OSError, EOFError, zlib.error) as e:
+            return f"'{path}' cannot be read: {e}"
+        if not is_archive:
+            return f"'{path}' is not a tar or zip archive"
+    return None
+
+
+def iter_directory(directory: str, pattern: str = "*") -> Iterator[BannerEntry]:
+    """Yield every file below a directory whose name matches `pattern`.
+
+    Files are visited in sorted order and hidden files and directories are
+    skipped. Directories and files that cannot be read are reported and
+    yielded as failed entries.
+    """
+    errors: list[OSError] = []
+    for root, dirs, files in os.walk(directory, onerror=errors.append):
+        while errors:
+            error = errors.pop(0)
+            yield _unreadable(error.filename, error)
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith(".") or not fnmatch.fnmatch(name, pattern):
+                continue
+            file_path = os.path.join(root, name)
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            except OSError as e:
+                yield _unreadable(file_path, e)
+                continue
+            yield _decode(data), None
+    for error in errors:
+        yield _unreadable(error.filename, error)
+
+
+def iter_archive(archive_path: str, pattern: str = "*") -> Iterator[BannerEntry]:
+    """Yield every file in a tar (optionally compressed) or zip archive.
+
+    An archive that cannot be read, or stops being readable part of the
+    way through, is reported and yields a failed entry.
+    """
+    try:
+        yield from _iter_archive(archive_path, pattern)
+    except (OSError, EOFError, zlib.error, tarfile.TarError, zipfile.BadZipFile) as e:
+        yield _unreadable(archive_path, e)
+
+
+def _iter_archive(archive_path: str, pattern: str) -> Iterator[BannerEntry]:
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not fnmatch.fnmatch(name, pattern):
+                    continue
+                yield _decode(archive.read(info)), None
+        return
+
+    # Stream mode reads the members in order without seeking, so the
+    # archive is never indexed up front.
+    with tarfile.open(archive_path, "r|*") as archive:
+        for member in archive:
+            name = os.path.basename(member.name)
+            if not member.isfile() or not fnmatch.fnmatch(name, pattern):
+                continue
+            f = archive.extractfile(member)
+            if f is not None:
+                yield _decode(f.read()), None
+
+
+def iter_jsonl(jsonl_path: str) -> Iterator[BannerEntry]:
+    """Yield banners from a JSON Lines file (``.gz`` files are decompressed).
+
+    Each line is either a JSON string holding the content or an object with
+    a ``content`` key and an optional ``markedUp`` key. A file that cannot
+    be read, or stops being readable part of the way through, is reported
+    and yields a failed entry.
+    """
+    try:
+        yield from _iter_jsonl(jsonl_path)
+    except (OSError, EOFError, zlib.error, UnicodeDecodeError) as e:
+        yield _unreadable(jsonl_path, e)
+
+
+def _iter_jsonl(jsonl_path: str) -> Iterator[BannerEntry]:
+    opener = gzip.open if jsonl_path.endswith(".gz") else open
+    with opener(jsonl_path, "rt", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                entry = e
+            if isinstance(entry, str):
+                yield entry, None
+            elif isinstance(entry, dict) and isinstance(entry.get("content"), str):
+                yield entry["content"], entry.get("markedUp")
+            else:
+                print(
+                    f"{jsonl_path}:{line_number}: expected a JSON string or "
+                    "an object with a 'content' string"
+                )
+                yield None, None
@@ -1,3 +1,7 @@
 from .base import *
+from .compression import *
 from .banner import *
+from .render_cache import *
+from .ascii_art import *
+from .search import *
 
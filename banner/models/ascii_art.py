@@ -0,0 +1,8 @@
+from peewee import *
+from .base import BaseModel
+
+
+class AsciiArt(BaseModel):
+    """Generated ASCII art, kept so the same text and font is drawn once."""
+    key = CharField(max_length=64, unique=True)
+    art = TextField()
@@ -1,8 +1,188 @@
+import hashlib
+import random
 from peewee import *
 from .base import BaseModel
+from .compression import CompressedTextField
 
 
 class Banner(BaseModel):
     id = AutoField(primary_key=True)
-    content = TextField()
-    markedUp = TextField(null=True)
+    content = CompressedTextField()
+    markedUp = CompressedTextField(null=True)
+    digest = CharField(max_length=64, null=True, index=True)
+    width = IntegerField(null=True)
+    height = IntegerField(null=True, index=True)
+    line_count = IntegerField(null=True, index=True)
+
+    class Meta:
+        indexes = (
+            # Lets `random` find banners that fit a terminal from the index
+            # alone.
+            (("width", "height"), False),
+        )
+
+    RANDOM_ATTEMPTS = 32
+    """How many id probes `random` makes before falling back to an offset scan."""
+
+    FIT_ATTEMPTS = 256
+    """How many ids `random` draws at once when looking for a banner that fits."""
+
+    @staticmethod
+    def content_digest(content: str) -> str:
+        """The digest used to spot banners with the same content."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def dimensions(content: str, marked_up: str | None = None) -> tuple[int, int, int]:
+        """Measure a banner as `banner show` prints it.
+
+        Returns:
+            The width in terminal cells and the height in lines of the
+            shown text, i.e. the markup with its tags removed, and the
+            number of lines in the content.
+        """
+        from rich.errors import MarkupError
+        from rich.text import Text
+
+        shown = content if marked_up is None or marked_up == "" else marked_up
+        try:
+            text = Text.from_markup(shown)
+        except MarkupError:
+            text = Text(shown)
+        text.expand_tabs()
+        lines = text.plain.rstrip("\n").split("\n")
+        width = max(Text(line).cell_len for line in lines)
+        return width, len(lines), len(content.rstrip("\n").split("\n"))
+
+    def save(self, *args, **kwargs):
+        if self.content is not None:
+            self.digest = self.content_digest(self.content)
+            self.width, self.height, self.line_count = self.dimensions(
+                self.content, self.markedUp
+            )
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def existing_digests(cls, digests: list[str]) -> set[str]:
+        """Return which of the given digests are already in the library."""
+        found: set[str] = set()
+        # Stay under SQLite's limit on the number of bound parameters.
+        for start in range(0, len(digests), 900):
+            found.update(
+                digest for digest, in cls.select(cls.digest).where(
+                    cls.digest.in_(digests[start:start + 900])
+                ).tuples()
+            )
+        return found
+
+    @classmethod
+    def fits(cls, max_width: int | None, max_height: int | None) -> list:
+        """The conditions matching banners no bigger than the given size."""
+        conditions = []
+        if max_width is not None:
+            conditions.append(cls.width <= max_width)
+        if max_height is not None:
+            conditions.append(cls.height <= max_height)
+        return conditions
+
+    @classmethod
+    def random(
+        cls,
+        max_width: int | None = None,
+        max_height: int | None = None,
+    ) -> "Banner | None":
+        """Pick a banner uniformly at random, or None if there are none.
+
+        Instead of ``ORDER BY RANDOM()``, which generates a key for every row
+        and sorts them, this draws an id between the smallest and largest id
+        (both read from the primary key index) and looks it up. Draws that
+        land in a hole left by a delete are rejected and redrawn, which keeps
+        the pick uniform. Only a library that is mostly holes runs out of
+        attempts and falls back to a single ``OFFSET`` read over the index.
+
+        With `max_width` or `max_height`, only banners that fit are picked.
+        Fitting banners may be rare, so `FIT_ATTEMPTS` ids are drawn at
+        once and a random one of those that fit is read in a single query;
+        every fitting banner is as likely to be among them as any other, so
+        the pick stays uniform. The fallback counts and offsets over the
+        (width, height) index, and only reads the row it lands on.
+        """
+        fits = cls.fits(max_width, max_height)
+        # SQLite only answers MIN/MAX from the index when each is the sole
+        # aggregate of its query, so these are two separate queries.
+        low = cls.select(fn.MIN(cls.id)).scalar()
+        high = cls.select(fn.MAX(cls.id)).scalar()
+        if low is None:
+            return None
+
+        if fits:
+            draws = [
+                random.randint(low, high) for _ in range(cls.FIT_ATTEMPTS)
+            ]
+            banner = cls.get_or_none(
+                cls.id == cls.select(cls.id)
+                .where(cls.id.in_(draws), *fits)
+                .order_by(fn.Random()).limit(1)
+            )
+            if banner is not None:
+                return banner
+        else:
+            for _ in range(cls.RANDOM_ATTEMPTS):
+                banner = cls.get_or_none(cls.id == random.randint(low, high))
+                if banner is not None:
+                    return banner
+
+        total = cls.select().where(*fits).count()
+        if total == 0:
+            return None
+        if not fits:
+            return cls.select().order_by(cls.id).offset(
+                random.randrange(total)
+            ).limit(1).first()
+        return cls.get_or_none(
+            cls.id == cls.select(cls.id).where(*fits).offset(
+                random.randrange(total)
+            ).limit(1)
+        )
+
+    @classmethod
+    def insert_batch(cls, rows: list[dict]) -> tuple[int, list[Exception]]:
+        """Insert rows in a single transaction.
+
+        The rows are written with one ``insert_many``. If that fails, each
+        row is retried in its own savepoint so that a bad row only loses
+        itself rather than the rest of the batch.
+
+        Returns:
+            The number of rows inserted and the errors for those that
+            were not.
+        """
+        if not rows:
+            return 0, []
+
+        for row in rows:
+            if row.get("content") is None:
+                continue
+            if row.get("digest") is None:
+                row["digest"] = cls.content_digest(row["content"])
+            if row.get("width") is None:
+                row["width"], row["height"], row["line_count"] = cls.dimensions(
+                    row["content"], row.get("markedUp")
+                )
+
+        errors: list[Exception] = []
+        with cls._meta.database.atomic():
+            try:
+                with cls._meta.database.atomic():
+                    cls.insert_many(rows).execute()
+                return len(rows), errors
+            except Exception:
+                pass
+
+            for row in rows:
+                try:
+                    with cls._meta.database.atomic():
+                        cls.insert(row).execute()
+                except Exception as e:
+                    errors.append(e)
+        return len(rows) - len(errors), errors
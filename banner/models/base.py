@@ -2,17 +2,30 @@ import os
 import pathlib
 from peewee import *
 
+from ..settings import banner_data_dir
+
 # Get the user's home directory
 home_dir = pathlib.Path.home()
 
-# Create a hidden folder called '.banner' inside the user's home directory
-banner_data_dir = home_dir / '.banner'
-banner_data_dir.mkdir(parents=True, exist_ok=True)
-
 # Set the database file path inside the '.banner' folder
 db_file_path = banner_data_dir / 'app.db'
 
-app_db = SqliteDatabase(str(db_file_path), pragmas={'journal_mode': 'wal'})
+PRAGMAS = {'journal_mode': 'wal', 'foreign_keys': 1}
+"""The pragmas of a connection that may write."""
+
+READ_ONLY_PRAGMAS = {
+    'foreign_keys': 1,
+    # Read pages straight from the file mapping rather than copying them
+    # into the page cache, and keep more of them around.
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16 * 1024,
+}
+"""The pragmas of a read-only connection; the journal mode is left alone."""
+
+app_db = SqliteDatabase(
+    str(db_file_path),
+    pragmas=PRAGMAS
+)
 class BaseModel(Model):
     """A base model that will use our Sqlite database."""
     class Meta:
@@ -0,0 +1,161 @@
+"""Transparent zlib compression for large text columns.
+
+A `CompressedTextField` stores short values as plain text and, once
+compression is enabled with ``banner compress``, long values as a BLOB: a
+two byte id of the dictionary it was compressed with, followed by a raw
+deflate stream. SQLite keeps BLOBs as they are even in a TEXT column, so a
+value's type says whether it is compressed, and a library can hold both
+kinds at once. Reading always gives text back.
+
+The dictionary is trained on the library itself, so the markup tags and
+runs of box drawing characters that most banners share are compressed even
+in short banners. Dictionaries are never changed once written; compressing
+again with a new one adds a row.
+"""
+
+import struct
+import zlib
+from collections import Counter
+from typing import Iterable
+
+from peewee import *
+
+from .base import app_db, BaseModel
+
+HEADER = struct.Struct(">H")
+
+DICTIONARY_SIZE = 32 * 1024
+"""The largest dictionary zlib can use, as its window is 32KiB."""
+
+
+class CompressionDictionary(BaseModel):
+    """A zlib dictionary that `CompressedTextField` values refer to by id."""
+    id = AutoField(primary_key=True)
+    data = BlobField()
+    level = IntegerField(default=6)
+
+
+class Codec:
+    """Compresses and decompresses text with the stored dictionaries.
+
+    The newest dictionary is used for new values, and looked up once per
+    process. Call `reset` after changing the dictionaries.
+    """
+
+    MIN_SIZE = 128
+    """Values shorter than this many bytes are stored as plain text."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._compressors: dict[int, "zlib._Compress"] = {}
+        self._decompressors: dict[int, "zlib._Decompress"] = {}
+        self._active: CompressionDictionary | None = None
+        self._loaded = False
+
+    def disable(self) -> None:
+        """Write plain text from now on, e.g. while decompressing."""
+        self._active = None
+        self._loaded = True
+
+    @property
+    def active(self) -> CompressionDictionary | None:
+        """The dictionary new values are compressed with, or None if off."""
+        if not self._loaded:
+            self._active = None
+            if CompressionDictionary.table_exists():
+                self._active = (
+                    CompressionDictionary.select()
+                    .order_by(CompressionDictionary.id.desc())
+                    .first()
+                )
+            self._loaded = True
+        return self._active
+
+    def _load(self, dictionary_id: int) -> None:
+        # Loading a 32KiB dictionary into zlib costs more than compressing
+        # a typical banner, so it is done once and the primed objects are
+        # copied for each value.
+        row = CompressionDictionary.get_by_id(dictionary_id)
+        zdict = {"zdict": bytes(row.data)} if row.data else {}
+        self._compressors[dictionary_id] = zlib.compressobj(
+            row.level, zlib.DEFLATED, -15, **zdict
+        )
+        self._decompressors[dictionary_id] = zlib.decompressobj(-15, **zdict)
+
+    def compress(self, text: str) -> "str | bytes":
+        """Compress text with the active dictionary, if that makes it smaller."""
+        active = self.active
+        raw = text.encode("utf-8")
+        if active is None or len(raw) < self.MIN_SIZE:
+            return text
+        if active.id not in self._compressors:
+            self._load(active.id)
+        compressor = self._compressors[active.id].copy()
+        data = HEADER.pack(active.id) + compressor.compress(raw) + compressor.flush()
+        return data if len(data) < len(raw) else text
+
+    def decompress(self, value: "str | bytes | None") -> "str | None":
+        """Turn a stored value back into text."""
+        if not isinstance(value, (bytes, memoryview)):
+            return value
+        value = bytes(value)
+        dictionary_id, = HEADER.unpack_from(value)
+        if dictionary_id not in self._decompressors:
+            self._load(dictionary_id)
+        decompressor = self._decompressors[dictionary_id].copy()
+        raw = decompressor.decompress(value[HEADER.size:]) + decompressor.flush()
+        return raw.decode("utf-8")
+
+
+codec = Codec()
+
+
+@app_db.func("banner_text", num_params=1, deterministic=True)
+def banner_text_sql(value):
+    """Lets SQL, such as the search index, read compressed columns."""
+    return codec.decompress(value)
+
+
+class CompressedTextField(TextField):
+    """A text field that is compressed once compression is enabled."""
+
+    def db_value(self, value):
+        value = super().db_value(value)
+        if value is None:
+            return None
+        return codec.compress(value)
+
+    def python_value(self, value):
+        return codec.decompress(value)
+
+
+def train_dictionary(
+    samples: Iterable[str],
+    size: int = DICTIONARY_SIZE,
+    gram: int = 16,
+) -> bytes:
+    """Build a zlib dictionary from the substrings most samples share.
+
+    zlib has no dictionary trainer, so this counts the runs of `gram`
+    bytes in each sample, keeps those found in more than one sample, and
+    packs the most useful into the dictionary. zlib finds matches closer to
+    the end of the dictionary more cheaply, so the most common runs go
+    last.
+    """
+    counts: Counter[bytes] = Counter()
+    for sample in samples:
+        raw = sample.encode("utf-8")
+        # Count each run once per sample, so one long banner cannot fill
+        # the dictionary with itself.
+        counts.update({raw[i:i + gram] for i in range(0, len(raw) - gram + 1, 4)})
+
+    chosen: list[bytes] = []
+    total = 0
+    for run, count in counts.most_common():
+        if count < 2 or total + len(run) > size:
+            break
+        chosen.append(run)
+        total += len(run)
+    return b"".join(reversed(chosen))
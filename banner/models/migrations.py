@@ -0,0 +1,195 @@
+"""Brings databases created by older versions up to the current schema."""
+
+from playhouse.migrate import SqliteMigrator, migrate
+
+from peewee import fn
+
+from .base import app_db
+from .banner import Banner
+from .compression import (
+    DICTIONARY_SIZE,
+    CompressionDictionary,
+    codec,
+    train_dictionary,
+)
+from .schema import SCHEMA_VERSION, schema_version, set_schema_version  # noqa: F401
+from .search import BannerSearch
+
+
+def add_banner_digests(batch_size: int = 1000) -> None:
+    """Add the `Banner.digest` column and backfill it for existing rows."""
+    columns = {column.name for column in app_db.get_columns("banner")}
+    if "digest" not in columns:
+        migrator = SqliteMigrator(app_db)
+        with app_db.atomic():
+            migrate(migrator.add_column("banner", "digest", Banner.digest))
+
+    while True:
+        rows = list(
+            Banner.select(Banner.id, Banner.content)
+            .where(Banner.digest.is_null())
+            .limit(batch_size)
+            .tuples()
+        )
+        if not rows:
+            break
+        with app_db.atomic():
+            for banner_id, content in rows:
+                Banner.update(
+                    digest=Banner.content_digest(content)
+                ).where(Banner.id == banner_id).execute()
+
+
+def add_banner_dimensions(batch_size: int = 1000) -> None:
+    """Add the `Banner` size columns and backfill them for existing rows."""
+    columns = {column.name for column in app_db.get_columns("banner")}
+    missing = [
+        name for name in ("width", "height", "line_count") if name not in columns
+    ]
+    if missing:
+        migrator = SqliteMigrator(app_db)
+        with app_db.atomic():
+            migrate(*(
+                migrator.add_column("banner", name, getattr(Banner, name))
+                for name in missing
+            ))
+
+    while True:
+        rows = list(
+            Banner.select(Banner.id, Banner.content, Banner.markedUp)
+            .where(Banner.width.is_null())
+            .limit(batch_size)
+            .tuples()
+        )
+        if not rows:
+            break
+        with app_db.atomic():
+            for banner_id, content, marked_up in rows:
+                width, height, line_count = Banner.dimensions(content, marked_up)
+                Banner.update(
+                    width=width, height=height, line_count=line_count
+                ).where(Banner.id == banner_id).execute()
+
+
+def add_banner_search() -> None:
+    """Create the full-text search index, indexing any existing banners.
+
+    An index from before banners could be compressed read the banner
+    table directly, so it is rebuilt to read through the view. The view
+    and the triggers only decompress the text if the library has been
+    compressed, which an older version did in every library.
+    """
+    compressed = CompressionDictionary.select().exists()
+    if not BannerSearch.is_current():
+        BannerSearch.install(compressed)
+    elif BannerSearch.reads_compressed() != compressed:
+        BannerSearch.read_compressed(compressed)
+
+
+def database_size() -> int:
+    """The size of the database file in bytes, less its free pages."""
+    page_size = app_db.execute_sql("PRAGMA page_size").fetchone()[0]
+    page_count = app_db.execute_sql("PRAGMA page_count").fetchone()[0]
+    free_pages = app_db.execute_sql("PRAGMA freelist_count").fetchone()[0]
+    return page_size * (page_count - free_pages)
+
+
+def rewrite_banners(batch_size: int = 500) -> int:
+    """Store the text of every banner again, as the codec now wants it.
+
+    Returns:
+        The number of banners rewritten.
+    """
+    num_rewritten = 0
+    last_id = 0
+    while True:
+        rows = list(
+            Banner.select(Banner.id, Banner.content, Banner.markedUp)
+            .where(Banner.id > last_id)
+            .order_by(Banner.id)
+            .limit(batch_size)
+            .tuples()
+        )
+        if not rows:
+            return num_rewritten
+        with app_db.atomic():
+            for banner_id, content, marked_up in rows:
+                Banner.update(
+                    content=content, markedUp=marked_up
+                ).where(Banner.id == banner_id).execute()
+        num_rewritten += len(rows)
+        last_id = rows[-1][0]
+
+
+def compress_library(
+    level: int = 6,
+    dictionary: bool = True,
+    dictionary_size: int = DICTIONARY_SIZE,
+    sample_size: int = 2000,
+) -> tuple[int, int, int]:
+    """Compress the text of every banner, training a dictionary on a sample.
+
+    This rewrites every row, so it is meant to be run offline.
+
+    Returns:
+        The number of banners and the database size before and after.
+    """
+    size_before = database_size()
+    samples = []
+    if dictionary:
+        for content, marked_up in (
+            Banner.select(Banner.content, Banner.markedUp)
+            .order_by(fn.RANDOM())
+            .limit(sample_size)
+            .tuples()
+        ):
+            samples.append(content)
+            if marked_up:
+                samples.append(marked_up)
+
+    with app_db.atomic():
+        active = CompressionDictionary.create(
+            data=train_dictionary(samples, dictionary_size), level=level
+        )
+        # Before any banner is compressed, so the index reads them all.
+        if BannerSearch.is_current():
+            BannerSearch.read_compressed(True)
+    codec.reset()
+    num_banners = rewrite_banners()
+    # No banner refers to an older dictionary any more.
+    CompressionDictionary.delete().where(
+        CompressionDictionary.id != active.id
+    ).execute()
+    codec.reset()
+
+    app_db.execute_sql("VACUUM")
+    return num_banners, size_before, database_size()
+
+
+def decompress_library() -> tuple[int, int, int]:
+    """Store the text of every banner uncompressed, and turn compression off.
+
+    Returns:
+        The number of banners and the database size before and after.
+    """
+    size_before = database_size()
+    codec.disable()
+    num_banners = rewrite_banners()
+    with app_db.atomic():
+        CompressionDictionary.delete().execute()
+        # No banner is compressed any more, so other SQLite clients can
+        # write to the library again.
+        if BannerSearch.is_current():
+            BannerSearch.read_compressed(False)
+    codec.reset()
+
+    app_db.execute_sql("VACUUM")
+    return num_banners, size_before, database_size()
+
+
+def migrate_database() -> None:
+    """Apply any migrations an existing database needs."""
+    if not app_db.table_exists("banner"):
+        return
+    add_banner_digests()
+    add_banner_dimensions()
@@ -0,0 +1,66 @@
+from peewee import *
+from .base import BaseModel
+from .banner import Banner
+
+
+class RenderedBanner(BaseModel):
+    """The ANSI output of a banner, as rendered for one kind of terminal.
+
+    At most `MAX_ROWS` renderings are kept; storing one more drops the
+    oldest stored.
+    """
+    banner = ForeignKeyField(Banner, backref="renders", on_delete="CASCADE")
+    width = IntegerField()
+    color_system = CharField()
+    content_only = BooleanField(default=False)
+    data = BlobField()
+
+    MAX_ROWS = 5000
+    """How many renderings the cache holds at most."""
+
+    class Meta:
+        indexes = (
+            (("banner", "width", "color_system", "content_only"), True),
+        )
+
+    @classmethod
+    def lookup(
+        cls,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool = False,
+    ) -> bytes | None:
+        """Return the cached output for a banner, or None on a miss."""
+        row = cls.select(cls.data).where(
+            (cls.banner == banner_id)
+            & (cls.width == width)
+            & (cls.color_system == color_system)
+            & (cls.content_only == content_only)
+        ).tuples().first()
+        return bytes(row[0]) if row else None
+
+    @classmethod
+    def store(
+        cls,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool,
+        data: bytes,
+    ) -> None:
+        row_id = cls.insert(
+            banner=banner_id,
+            width=width,
+            color_system=color_system,
+            content_only=content_only,
+            data=data,
+        ).on_conflict_replace().execute()
+        # New rows get the largest id, so the oldest are those below the
+        # last `MAX_ROWS` ids; usually there are none, found by the key.
+        cls.delete().where(cls.id <= row_id - cls.MAX_ROWS).execute()
+
+    @classmethod
+    def invalidate(cls, banner_id: int) -> None:
+        """Drop every cached rendering of a banner."""
+        cls.delete().where(cls.banner == banner_id).execute()
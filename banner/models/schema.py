@@ -0,0 +1,23 @@
+"""The version of the schema a database has.
+
+Checking it is all an up to date database needs, so this is kept apart
+from the migrations, which are only imported when one has to run.
+"""
+
+from .base import app_db
+
+SCHEMA_VERSION = 2
+"""The version of the tables, indexes and migrations in this release.
+
+It is kept in the database's ``user_version``, so an up to date database
+is opened without running any DDL. Bump it with every change to them.
+"""
+
+
+def schema_version() -> int:
+    """The schema version of the database, 0 if it predates versioning."""
+    return app_db.execute_sql("PRAGMA user_version").fetchone()[0]
+
+
+def set_schema_version(version: int = SCHEMA_VERSION) -> None:
+    app_db.execute_sql(f"PRAGMA user_version = {int(version)}")
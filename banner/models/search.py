@@ -0,0 +1,170 @@
+from peewee import *
+from playhouse.sqlite_ext import FTS5Model, RowIDField, SearchField
+
+from .base import app_db
+from .compression import banner_text_sql  # noqa: F401 (registers banner_text)
+
+
+class BannerSearch(FTS5Model):
+    """A full-text index over the content and markup of every banner.
+
+    This is an external content table: it stores only the index and reads
+    the text itself from the banner table, through the `SOURCE` view. The
+    triggers in `TRIGGERS` keep the two in sync. Once the library has been
+    compressed, the view and the triggers read the text through the
+    ``banner_text`` function, which only Banner defines; until then they
+    read the columns as they are, so any SQLite client can still write to
+    the library.
+    """
+    rowid = RowIDField()
+    content = SearchField()
+    markedUp = SearchField()
+
+    CONTENT_WEIGHT = 2.0
+    """How much more a match in the content counts than one in the markup."""
+
+    SOURCE = """
+        CREATE VIEW banner_search_source AS
+        SELECT id, {text}(content) AS content, {text}(markedUp) AS markedUp
+        FROM banner
+    """
+    """The view the index reads; ``{text}`` is ``banner_text`` or nothing."""
+
+    TRIGGERS = {
+        "banner_search_insert": """
+        AFTER INSERT ON banner BEGIN
+            INSERT INTO banner_search (rowid, content, markedUp)
+            VALUES (new.id, {text}(new.content), {text}(new.markedUp));
+        END
+        """,
+        "banner_search_delete": """
+        AFTER DELETE ON banner BEGIN
+            INSERT INTO banner_search (banner_search, rowid, content, markedUp)
+            VALUES ('delete', old.id, {text}(old.content), {text}(old.markedUp));
+        END
+        """,
+        "banner_search_update": """
+        AFTER UPDATE OF content, markedUp ON banner BEGIN
+            INSERT INTO banner_search (banner_search, rowid, content, markedUp)
+            VALUES ('delete', old.id, {text}(old.content), {text}(old.markedUp));
+            INSERT INTO banner_search (rowid, content, markedUp)
+            VALUES (new.id, {text}(new.content), {text}(new.markedUp));
+        END
+        """,
+    }
+
+    class Meta:
+        database = app_db
+        table_name = "banner_search"
+        options = {
+            "content": "banner_search_source",
+            "content_rowid": "id",
+            # Prefix indexes keep search-as-you-type queries fast.
+            "prefix": "2 3",
+            "tokenize": "unicode61 remove_diacritics 2",
+        }
+
+    @classmethod
+    def install(cls, compressed: bool = False) -> None:
+        """Create the index and its triggers, and index existing banners.
+
+        Anything left by an older version of the index is replaced.
+
+        Args:
+            compressed: Read the text through ``banner_text``, as a
+                compressed library needs.
+        """
+        database = cls._meta.database
+        with database.atomic():
+            cls.drop_table(safe=True)
+            cls.create_table()
+            cls.read_compressed(compressed)
+            cls.rebuild()
+
+    @classmethod
+    def read_compressed(cls, compressed: bool) -> None:
+        """Replace the view and the triggers to read compressed text or not.
+
+        The index itself is kept: it holds the same text either way.
+        """
+        database = cls._meta.database
+        text = "banner_text" if compressed else ""
+        with database.atomic():
+            database.execute_sql("DROP VIEW IF EXISTS banner_search_source")
+            database.execute_sql(cls.SOURCE.format(text=text))
+            for name, trigger in cls.TRIGGERS.items():
+                database.execute_sql(f"DROP TRIGGER IF EXISTS {name}")
+                database.execute_sql(
+                    f"CREATE TRIGGER {name} {trigger.format(text=text)}"
+                )
+
+    @classmethod
+    def reads_compressed(cls) -> bool:
+        """Whether the view reads the text through ``banner_text``."""
+        sql = cls._meta.database.execute_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = ?",
+            ("banner_search_source",),
+        ).fetchone()
+        return sql is not None and "banner_text" in sql[0]
+
+    @classmethod
+    def is_current(cls) -> bool:
+        """Whether the index exists and reads through `SOURCE`."""
+        sql = cls._meta.database.execute_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (cls._meta.table_name,),
+        ).fetchone()
+        return sql is not None and "banner_search_source" in sql[0]
+
+    @staticmethod
+    def query_for(text: str, prefix: bool = False) -> str | None:
+        """Turn free text into an FTS5 query matching all of its words.
+
+        Each word is quoted, so punctuation in it cannot be taken for FTS5
+        syntax. With `prefix`, the last word also matches as a prefix, for
+        searching as the user types. Returns None if there are no words.
+        """
+        words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+        if not words:
+            return None
+        if prefix:
+            words[-1] += "*"
+        return " ".join(words)
+
+    @classmethod
+    def search(
+        cls,
+        text: str,
+        limit: int = 20,
+        prefix: bool = False,
+    ) -> list[tuple[int, str, float]]:
+        """Find the banners best matching some text.
+
+        Every match is ranked, but only the `limit` best get a snippet,
+        which costs far more per row than the rank does.
+
+        Returns:
+            The id, a snippet of the best matching column and the rank of
+            each match, best first. Lower ranks are better.
+        """
+        query = cls.query_for(text, prefix)
+        if query is None:
+            return []
+        rank = cls.bm25(cls.CONTENT_WEIGHT, 1.0)
+        best = (
+            cls.select(cls.rowid.alias("id"), rank.alias("rank"))
+            .where(cls.match(query))
+            .order_by(rank)
+            .limit(limit)
+            .alias("best")
+        )
+        # Joined back on the rowid, each of the best rows is looked up
+        # directly, rather than every match scanned again.
+        snippet = fn.snippet(cls._meta.entity, -1, "\x02", "\x03", "…", 12)
+        return list(
+            cls.select(cls.rowid, snippet, best.c.rank)
+            .join(best, on=(cls.rowid == best.c.id))
+            .where(cls.match(query))
+            .order_by(best.c.rank)
+            .tuples()
+        )
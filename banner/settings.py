@@ -0,0 +1,17 @@
+"""Where Banner keeps its files, and what it reads from the environment.
+
+Only the standard library is imported here, so that the command line can
+use these before it knows whether a command needs the library at all.
+"""
+
+import pathlib
+
+banner_data_dir = pathlib.Path.home() / ".banner"
+"""A hidden folder called '.banner' inside the user's home directory.
+
+It is created when the database is first opened for writing, not on
+import.
+"""
+
+STORE_ENV = "BANNER_STORE"
+"""The environment variable that picks the store when ``--store`` is not given."""
@@ -0,0 +1,68 @@
+"""Where the banner library is kept.
+
+The command line and the screens reach the library through the current
+`BannerStore`, which is SQLite unless ``--store`` or ``$BANNER_STORE`` says
+otherwise::
+
+    sqlite:PATH     a SQLite database (default: ~/.banner/app.db)
+    dir:PATH        a directory with one file per banner and an index
+    memory:         nowhere; the library is gone when Banner exits
+"""
+
+import os
+
+from ..settings import STORE_ENV
+from .base import BannerStore, SearchResult
+from .directory import DirectoryStore
+from .memory import MemoryStore
+from .sqlite import SqliteStore
+
+STORES = {store.scheme: store for store in (SqliteStore, DirectoryStore, MemoryStore)}
+
+_store: BannerStore | None = None
+
+
+def make_store(spec: str | None = None, read_only: bool = False) -> BannerStore:
+    """Make the store that a spec such as ``dir:~/banners`` names.
+
+    Without a spec, ``$BANNER_STORE`` is used, and without that the default
+    SQLite database. `read_only` says that the caller means to read, which
+    only the SQLite store makes use of.
+
+    Raises:
+        ValueError: If the spec names no known kind of store.
+    """
+    if spec is None:
+        spec = os.environ.get(STORE_ENV) or ""
+    if not spec:
+        return SqliteStore(read_only=read_only)
+
+    scheme, _, location = spec.partition(":")
+    store_class = STORES.get(scheme)
+    if store_class is None:
+        raise ValueError(
+            f"unknown store {spec!r}; expected sqlite:PATH, dir:PATH or memory:"
+        )
+    if store_class is MemoryStore:
+        return MemoryStore()
+    if not location:
+        if store_class is SqliteStore:
+            return SqliteStore(read_only=read_only)
+        raise ValueError(f"the {scheme} store needs a path, e.g. {scheme}:PATH")
+    if store_class is SqliteStore:
+        return SqliteStore(os.path.expanduser(location), read_only=read_only)
+    return store_class(os.path.expanduser(location))
+
+
+def get_store() -> BannerStore:
+    """The store in use, the default SQLite one if none was chosen."""
+    global _store
+    if _store is None:
+        _store = SqliteStore()
+    return _store
+
+
+def use_store(store: BannerStore) -> None:
+    """Make a store the one `get_store` returns."""
+    global _store
+    _store = store
@@ -0,0 +1,311 @@
+"""The interface every banner store implements."""
+
+import re
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+from ..models import Banner
+
+SearchResult = tuple[int, str, float]
+"""A banner id, a snippet with the matches between \\x02 and \\x03, and a rank
+where lower is better."""
+
+RE_WORD = re.compile(r"\w+")
+
+
+class BannerStore(ABC):
+    """Where the banner library is kept.
+
+    The command line and the screens go through the store rather than
+    querying `Banner` themselves, so the library can live in SQLite, in a
+    directory of files or in memory. Stores hand out `Banner` instances
+    as plain records; changes are written back with `save`.
+
+    A store is opened before use and closed afterwards, and can be used as
+    a context manager to do both.
+    """
+
+    scheme: str = ""
+    """The prefix that selects this kind of store in `make_store`."""
+
+    def open(self) -> None:
+        """Get the store ready for use, creating it if it does not exist."""
+
+    def close(self) -> None:
+        """Release whatever `open` acquired."""
+
+    def __enter__(self) -> "BannerStore":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def worker(self) -> Iterator[Callable[[], None]]:
+        """Use the store from a worker thread.
+
+        Yields:
+            A function that another thread can call to abort whatever the
+            worker is doing in the store, if the store supports that.
+        """
+        yield lambda: None
+
+    # Reading
+
+    @abstractmethod
+    def count(self) -> int:
+        """How many banners there are."""
+
+    @abstractmethod
+    def get(self, banner_id: int) -> Banner | None:
+        """The banner with an id, or None if there is none."""
+
+    @abstractmethod
+    def list_banners(
+        self,
+        after: int | None = None,
+        before: int | None = None,
+        reverse: bool = False,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[Banner]:
+        """The banners with ids between `after` and `before`, exclusive.
+
+        Banners come in id order, or from the largest id down with
+        `reverse`, skipping the first `offset` and stopping after `limit`.
+        """
+
+    @abstractmethod
+    def list_previews(
+        self,
+        chars: int,
+        after: int | None = None,
+        before: int | None = None,
+        reverse: bool = False,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[tuple[int, str]]:
+        """Like `list_banners`, but only the id and the start of the shown text.
+
+        The shown text is the markup, or the content if there is none, cut
+        to its first `chars` characters.
+        """
+
+    @abstractmethod
+    def iter_contents(self) -> Iterator[str]:
+        """Stream the content of every banner in id order."""
+
+    @abstractmethod
+    def random(
+        self,
+        max_width: int | None = None,
+        max_height: int | None = None,
+    ) -> Banner | None:
+        """Pick a banner uniformly at random, optionally one no bigger than a size."""
+
+    @abstractmethod
+    def existing_digests(self, digests: list[str]) -> set[str]:
+        """Return which of the given content digests are already stored."""
+
+    @abstractmethod
+    def search(self, query: str, limit: int = 20, prefix: bool = False) -> list[SearchResult]:
+        """Find the banners containing every word of a query, best first.
+
+        Args:
+            query: The words to look for.
+            limit: The most matches to return.
+            prefix: Also match words starting with the last word.
+        """
+
+    def first(self) -> Banner | None:
+        banners = self.list_banners(limit=1)
+        return banners[0] if banners else None
+
+    def last(self) -> Banner | None:
+        banners = self.list_banners(reverse=True, limit=1)
+        return banners[0] if banners else None
+
+    def next(self, banner_id: int) -> Banner | None:
+        """The banner after an id, wrapping around to the first."""
+        banners = self.list_banners(after=banner_id, limit=1)
+        return banners[0] if banners else self.first()
+
+    def previous(self, banner_id: int) -> Banner | None:
+        """The banner before an id, wrapping around to the last."""
+        banners = self.list_banners(before=banner_id, reverse=True, limit=1)
+        return banners[0] if banners else self.last()
+
+    # Writing
+
+    @abstractmethod
+    def add_many(self, rows: list[dict]) -> tuple[int, list[Exception]]:
+        """Add banners given as ``content`` and ``markedUp`` dicts.
+
+        A bad row only loses itself rather than the rest of the rows.
+
+        Returns:
+            The number of banners added and the errors for those that
+            were not.
+        """
+
+    @abstractmethod
+    def save(self, banner: Banner) -> bool:
+        """Write a banner back, or add it if it has no id yet.
+
+        The banner's digest and size are brought up to date, it gets an id
+        if it is new, and any cached rendering of it is dropped.
+        """
+
+    @abstractmethod
+    def delete(self, banner_id: int) -> bool:
+        """Delete a banner. Returns False if there was none with that id."""
+
+    # The rendered banner cache
+
+    @abstractmethod
+    def lookup_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool = False,
+    ) -> bytes | None:
+        """Return the cached ANSI output for a banner, or None on a miss."""
+
+    @abstractmethod
+    def store_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool,
+        data: bytes,
+    ) -> None:
+        """Cache the ANSI output of a banner."""
+
+
+def make_banner(
+    banner_id: int,
+    content: str,
+    marked_up: str | None = None,
+    **fields,
+) -> Banner:
+    """A `Banner` record that is not dirty, as if read from the database."""
+    banner = Banner(
+        __no_default__=1, id=banner_id, content=content, markedUp=marked_up, **fields
+    )
+    banner._dirty.clear()
+    return banner
+
+
+def query_words(query: str) -> list[str]:
+    return RE_WORD.findall(query.casefold())
+
+
+def word_patterns(words: list[str], prefix: bool = False) -> list[re.Pattern]:
+    """Patterns finding each query word as a whole word, ignoring case.
+
+    This follows the search index as far as plain Python easily can: words
+    are runs of letters and digits, and with `prefix` the last word also
+    matches words that start with it.
+    """
+    return [
+        re.compile(
+            rf"(?<!\w){re.escape(word)}"
+            + (r"\w*" if prefix and index == len(words) - 1 else r"(?!\w)"),
+            re.IGNORECASE,
+        )
+        for index, word in enumerate(words)
+    ]
+
+
+def match_words(text: str, words: list[str], patterns: list[re.Pattern]) -> int:
+    """Score a text against a query, or 0 unless every word is in it.
+
+    Each pattern only has to find its first match, and the score counts
+    the words as substrings, which is far cheaper than finding every whole
+    word and ranks much the same.
+    """
+    folded = text.casefold()
+    # Most texts miss a word entirely, which is cheaper still to rule out.
+    if not all(word in folded for word in words):
+        return 0
+    if not all(pattern.search(text) for pattern in patterns):
+        return 0
+    return sum(folded.count(word) for word in words)
+
+
+def make_snippet(
+    text: str,
+    words: list[str],
+    prefix: bool = False,
+    size: int = 12,
+) -> str:
+    """Cut about `size` words of text around the first match, like FTS5's snippet()."""
+    tokens = list(RE_WORD.finditer(text))
+
+    def is_match(token: re.Match) -> bool:
+        word = token.group().casefold()
+        return word in words or (
+            prefix and bool(words) and word.startswith(words[-1])
+        )
+
+    first = next((i for i, token in enumerate(tokens) if is_match(token)), 0)
+    start = max(0, min(first - size // 4, len(tokens) - size))
+    window = tokens[start:start + size]
+    if not window:
+        return text[:80]
+
+    parts = ["…"] if start > 0 else []
+    position = window[0].start() if start > 0 else 0
+    for token in window:
+        parts.append(text[position:token.start()])
+        if is_match(token):
+            parts.append(f"\x02{token.group()}\x03")
+        else:
+            parts.append(token.group())
+        position = token.end()
+    if start + size < len(tokens):
+        parts.append("…")
+    else:
+        parts.append(text[position:position + 40])
+    return "".join(parts)
+
+
+def scan_search(
+    banners: Iterable[Banner],
+    query: str,
+    limit: int = 20,
+    prefix: bool = False,
+) -> list[SearchResult]:
+    """Search by reading every banner, for stores without a search index.
+
+    Banners matching more often rank first, and the rank is negated to sort
+    like the index's bm25() scores.
+    """
+    words = query_words(query)
+    if not words:
+        return []
+    patterns = word_patterns(words, prefix)
+    matches = []
+    for banner in banners:
+        # Like the index, a banner matches if its content and markup
+        # between them hold every word.
+        texts = [banner.content]
+        if banner.markedUp:
+            texts.append(banner.markedUp)
+        count = match_words("\n".join(texts), words, patterns)
+        if count:
+            matches.append((-float(count), banner.id, texts))
+    matches.sort(key=lambda match: match[:2])
+
+    results = []
+    for rank, banner_id, texts in matches[:limit]:
+        # Prefer a snippet from the content, as the index does.
+        snippet = make_snippet(texts[0], words, prefix)
+        if "\x02" not in snippet and len(texts) > 1:
+            snippet = make_snippet(texts[1], words, prefix)
+        results.append((banner_id, snippet, rank))
+    return results
@@ -0,0 +1,259 @@
+"""A store that keeps each banner in its own file, e.g. in a git repository.
+
+The layout of the directory is::
+
+    index.tsv               one line per banner, see `DirectoryStore`
+    banners/000001.txt      the content of banner #1
+    banners/000001.markup   its Rich markup, if it has any
+    .cache/                 rendered banners, ignored by git
+
+Rendered banners are cached by the size and modification time of the
+banner's files, so editing them by hand, or pulling or merging changes
+to them, never shows a stale render.
+
+Banner files are written byte for byte as UTF-8, so they diff and merge
+like any other text file.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from .. import trace
+from .indexed import Entry, IndexedStore
+
+INDEX_HEADER = "# id\twidth\theight\tlines\tmarkup\tdigest\n"
+
+COMPACT_MIN_LINES = 1000
+"""Leave small indexes alone however many of their lines are stale."""
+
+
+class DirectoryStore(IndexedStore):
+    """Keeps the library in a directory of plain text files.
+
+    ``index.tsv`` holds everything about a banner except its text, one
+    tab separated line each, so it is read once when the store opens and
+    counting, paging, spotting duplicates and picking a random banner that
+    fits never open a banner file. Searching reads every banner file.
+
+    Every add, edit or delete appends a line to the index, so writes cost
+    the same however big the library is. A later line for an id replaces
+    an earlier one, and a line holding just an id deletes it. Once the
+    stale lines outnumber the live ones, the index is rewritten atomically
+    with only the live ones.
+
+    If the index is missing, e.g. because it was deleted after editing
+    banner files by hand, it is rebuilt from the files on open.
+    """
+
+    scheme = "dir"
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.banners_path = self.path / "banners"
+        self.index_path = self.path / "index.tsv"
+        self.cache_path = self.path / ".cache"
+        self._index_lines = 0
+
+    def open(self) -> None:
+        self.banners_path.mkdir(parents=True, exist_ok=True)
+        if not self.cache_path.exists():
+            self.cache_path.mkdir()
+            (self.cache_path / ".gitignore").write_text("*\n")
+        self._entries.clear()
+        self._ids.clear()
+        self._digests.clear()
+        with trace.span("load index") as span:
+            if self.index_path.exists():
+                self._load_index()
+            else:
+                self.reindex()
+            span.set(banners=len(self._ids))
+
+    def _content_path(self, banner_id: int) -> Path:
+        return self.banners_path / f"{banner_id:06d}.txt"
+
+    def _markup_path(self, banner_id: int) -> Path:
+        return self.banners_path / f"{banner_id:06d}.markup"
+
+    # The index
+
+    def _load_index(self) -> None:
+        entries = self._entries
+        self._index_lines = 0
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                self._index_lines += 1
+                fields = line.rstrip("\n").split("\t")
+                banner_id = int(fields[0])
+                if len(fields) == 1:
+                    entries.pop(banner_id, None)
+                    continue
+                entries[banner_id] = Entry(
+                    fields[5], int(fields[1]), int(fields[2]), int(fields[3]),
+                    fields[4] == "1",
+                )
+        self._digests.update(entry.digest for entry in entries.values())
+        # Appends keep new ids in order, but hand edits or merges may not.
+        self._ids.extend(sorted(entries))
+
+    def _index_line(self, banner_id: int) -> str:
+        entry = self._entries.get(banner_id)
+        if entry is None:
+            return f"{banner_id}\n"
+        return (
+            f"{banner_id}\t{entry.width}\t{entry.height}\t{entry.line_count}\t"
+            f"{int(entry.has_markup)}\t{entry.digest}\n"
+        )
+
+    def _persist(self, banner_ids: list[int]) -> None:
+        stale = self._index_lines + len(banner_ids) - len(self._ids)
+        if stale > max(len(self._ids), COMPACT_MIN_LINES) or not self.index_path.exists():
+            self._rewrite_index()
+            return
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.writelines(self._index_line(banner_id) for banner_id in banner_ids)
+        self._index_lines += len(banner_ids)
+
+    def _rewrite_index(self) -> None:
+        self._replace(
+            self.index_path,
+            (INDEX_HEADER + "".join(
+                self._index_line(banner_id) for banner_id in self._ids
+            )).encode("utf-8"),
+        )
+        self._index_lines = len(self._ids)
+
+    def reindex(self) -> None:
+        """Rebuild the index from the banner files."""
+        self._entries.clear()
+        self._ids.clear()
+        self._digests.clear()
+        banner_ids = sorted(
+            int(entry.name[:-len(".txt")])
+            for entry in os.scandir(self.banners_path)
+            if entry.name.endswith(".txt") and entry.name[:-len(".txt")].isdigit()
+        )
+        for banner_id in banner_ids:
+            content, marked_up = self._read(banner_id, None)
+            self._index(banner_id, content, marked_up)
+        self._rewrite_index()
+        shutil.rmtree(self.cache_path / "renders", ignore_errors=True)
+
+    # The banner files
+
+    @staticmethod
+    def _replace(path: Path, data: bytes) -> None:
+        """Write a file atomically, so a reader never sees half of it."""
+        # Not mkstemp, whose files only the owner can read; these are
+        # meant to be shared through version control.
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _read(self, banner_id: int, entry: Entry | None) -> tuple[str, str | None]:
+        content = self._content_path(banner_id).read_bytes().decode("utf-8")
+        marked_up = None
+        if entry is None or entry.has_markup:
+            try:
+                marked_up = self._markup_path(banner_id).read_bytes().decode("utf-8")
+            except FileNotFoundError:
+                pass
+        return content, marked_up
+
+    def _preview(self, banner_id: int, entry: Entry, chars: int) -> str:
+        path = (
+            self._markup_path(banner_id) if entry.has_markup
+            else self._content_path(banner_id)
+        )
+        # A character is at most four bytes of UTF-8; a character cut in
+        # half at the end is dropped.
+        with open(path, "rb") as f:
+            data = f.read(chars * 4)
+        return data.decode("utf-8", errors="ignore")[:chars]
+
+    def _write(self, banner_id: int, content: str, marked_up: str | None) -> None:
+        content_path = self._content_path(banner_id)
+        if content_path.exists():
+            self._replace(content_path, content.encode("utf-8"))
+        else:
+            # Nothing reads a new banner until it is in the index.
+            content_path.write_bytes(content.encode("utf-8"))
+        markup_path = self._markup_path(banner_id)
+        if marked_up:
+            self._replace(markup_path, marked_up.encode("utf-8"))
+        else:
+            markup_path.unlink(missing_ok=True)
+
+    def _remove(self, banner_id: int) -> None:
+        self._content_path(banner_id).unlink(missing_ok=True)
+        self._markup_path(banner_id).unlink(missing_ok=True)
+
+    # The rendered banner cache
+
+    def _files_stamp(self, banner_id: int) -> str:
+        """What changes whenever a banner's files do, even behind our back."""
+        parts = []
+        for path in (self._content_path(banner_id), self._markup_path(banner_id)):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                parts.append("0")
+            else:
+                parts.append(f"{stat.st_mtime_ns:x}.{stat.st_size:x}")
+        return "-".join(parts)
+
+    def _render_path(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool,
+    ) -> Path:
+        return (
+            self.cache_path / "renders" / str(banner_id)
+            / self._files_stamp(banner_id)
+            / f"{width}-{color_system}-{int(content_only)}.ans"
+        )
+
+    def lookup_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool = False,
+    ) -> bytes | None:
+        try:
+            return self._render_path(
+                banner_id, width, color_system, content_only
+            ).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def store_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool,
+        data: bytes,
+    ) -> None:
+        if banner_id not in self._entries:
+            return
+        path = self._render_path(banner_id, width, color_system, content_only)
+        if not path.parent.exists():
+            # The banner changed since its other renders were cached.
+            self._invalidate_renders(banner_id)
+            path.parent.mkdir(parents=True)
+        self._replace(path, data)
+
+    def _invalidate_renders(self, banner_id: int) -> None:
+        shutil.rmtree(self.cache_path / "renders" / str(banner_id), ignore_errors=True)
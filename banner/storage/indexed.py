@@ -0,0 +1,279 @@
+"""The shared base of the stores that index the library in memory."""
+
+import random
+from abc import abstractmethod
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Iterator, NamedTuple
+
+from ..models import Banner
+from .base import BannerStore, SearchResult, make_banner, scan_search
+
+
+class Entry(NamedTuple):
+    """What the index knows about a banner: everything but its text."""
+    digest: str
+    width: int
+    height: int
+    line_count: int
+    has_markup: bool
+
+
+class IndexedStore(BannerStore):
+    """A store that keeps an index of every banner in memory.
+
+    Counting, paging, finding duplicates and picking random banners, even
+    ones that fit a size, are answered from the index; only the banners
+    handed out are read. Subclasses keep the text and, if they persist, the
+    index. Like SQLite, a new banner gets the id after the largest one.
+    """
+
+    FIT_ATTEMPTS = Banner.FIT_ATTEMPTS
+    """How many random draws to try before listing every banner that fits."""
+
+    def __init__(self) -> None:
+        self._entries: dict[int, Entry] = {}
+        self._ids: list[int] = []
+        self._digests: Counter[str] = Counter()
+        self._renders: dict[int, dict[tuple[int, str, bool], bytes]] = {}
+
+    @abstractmethod
+    def _read(self, banner_id: int, entry: Entry) -> tuple[str, str | None]:
+        """Read a banner's content and markup."""
+
+    @abstractmethod
+    def _write(self, banner_id: int, content: str, marked_up: str | None) -> None:
+        """Write a banner's content and markup, replacing any already there."""
+
+    @abstractmethod
+    def _remove(self, banner_id: int) -> None:
+        """Remove a banner's text."""
+
+    def _persist(self, banner_ids: list[int]) -> None:
+        """Persist the index entries of banners just added, changed or deleted."""
+
+    def _preview(self, banner_id: int, entry: Entry, chars: int) -> str:
+        content, marked_up = self._read(banner_id, entry)
+        return (marked_up or content)[:chars]
+
+    def _index(
+        self,
+        banner_id: int,
+        content: str,
+        marked_up: str | None,
+        row: dict | None = None,
+    ) -> Entry:
+        """Put a banner into the index, reusing what `row` already worked out."""
+        row = row or {}
+        digest = row.get("digest") or Banner.content_digest(content)
+        if row.get("width") is None:
+            width, height, line_count = Banner.dimensions(content, marked_up)
+        else:
+            width, height, line_count = row["width"], row["height"], row["line_count"]
+        entry = Entry(digest, width, height, line_count, bool(marked_up))
+
+        old = self._entries.get(banner_id)
+        if old is None:
+            # New ids are always the largest, so this keeps the list sorted.
+            self._ids.append(banner_id)
+        else:
+            self._forget_digest(old.digest)
+        self._entries[banner_id] = entry
+        self._digests[entry.digest] += 1
+        return entry
+
+    def _unindex(self, banner_id: int) -> None:
+        entry = self._entries.pop(banner_id)
+        del self._ids[bisect_left(self._ids, banner_id)]
+        self._forget_digest(entry.digest)
+
+    def _forget_digest(self, digest: str) -> None:
+        self._digests[digest] -= 1
+        if self._digests[digest] <= 0:
+            del self._digests[digest]
+
+    # Reading
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def get(self, banner_id: int) -> Banner | None:
+        entry = self._entries.get(banner_id)
+        if entry is None:
+            return None
+        return make_banner(
+            banner_id,
+            *self._read(banner_id, entry),
+            digest=entry.digest,
+            width=entry.width,
+            height=entry.height,
+            line_count=entry.line_count,
+        )
+
+    def _select(
+        self,
+        after: int | None,
+        before: int | None,
+        reverse: bool,
+        limit: int | None,
+        offset: int,
+    ) -> list[int]:
+        low = 0 if after is None else bisect_right(self._ids, after)
+        high = len(self._ids) if before is None else bisect_left(self._ids, before)
+        if reverse:
+            stop = high - offset
+            start = low if limit is None else max(low, stop - limit)
+            return self._ids[start:stop][::-1] if stop > start else []
+        start = low + offset
+        stop = high if limit is None else min(high, start + limit)
+        return self._ids[start:stop]
+
+    def list_banners(
+        self,
+        after: int | None = None,
+        before: int | None = None,
+        reverse: bool = False,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[Banner]:
+        return [
+            self.get(banner_id)
+            for banner_id in self._select(after, before, reverse, limit, offset)
+        ]
+
+    def list_previews(
+        self,
+        chars: int,
+        after: int | None = None,
+        before: int | None = None,
+        reverse: bool = False,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[tuple[int, str]]:
+        return [
+            (banner_id, self._preview(banner_id, self._entries[banner_id], chars))
+            for banner_id in self._select(after, before, reverse, limit, offset)
+        ]
+
+    def iter_contents(self) -> Iterator[str]:
+        for banner_id in list(self._ids):
+            entry = self._entries.get(banner_id)
+            if entry is not None:
+                yield self._read(banner_id, entry)[0]
+
+    def random(
+        self,
+        max_width: int | None = None,
+        max_height: int | None = None,
+    ) -> Banner | None:
+        """Pick a banner uniformly at random.
+
+        With a size, random banners are drawn until one fits, which is
+        quick unless few do; after `FIT_ATTEMPTS` misses one is picked from
+        the list of every banner that fits.
+        """
+        if not self._ids:
+            return None
+        if max_width is None and max_height is None:
+            return self.get(random.choice(self._ids))
+
+        def fits(entry: Entry) -> bool:
+            return (max_width is None or entry.width <= max_width) and (
+                max_height is None or entry.height <= max_height
+            )
+
+        for _ in range(self.FIT_ATTEMPTS):
+            banner_id = random.choice(self._ids)
+            if fits(self._entries[banner_id]):
+                return self.get(banner_id)
+        fitting = [
+            banner_id for banner_id in self._ids if fits(self._entries[banner_id])
+        ]
+        return self.get(random.choice(fitting)) if fitting else None
+
+    def existing_digests(self, digests: list[str]) -> set[str]:
+        return {digest for digest in digests if digest in self._digests}
+
+    def search(self, query: str, limit: int = 20, prefix: bool = False) -> list[SearchResult]:
+        """Search by reading every banner; these stores have no search index."""
+        banners = (self.get(banner_id) for banner_id in list(self._ids))
+        return scan_search(
+            (banner for banner in banners if banner is not None), query, limit, prefix
+        )
+
+    # Writing
+
+    def _add(self, content: str | None, marked_up: str | None, row: dict | None = None) -> int:
+        if not isinstance(content, str):
+            raise ValueError("A banner needs content")
+        banner_id = self._ids[-1] + 1 if self._ids else 1
+        self._write(banner_id, content, marked_up or None)
+        self._index(banner_id, content, marked_up, row)
+        return banner_id
+
+    def add_many(self, rows: list[dict]) -> tuple[int, list[Exception]]:
+        added: list[int] = []
+        errors: list[Exception] = []
+        for row in rows:
+            try:
+                added.append(self._add(row.get("content"), row.get("markedUp"), row))
+            except Exception as e:
+                errors.append(e)
+        if added:
+            self._persist(added)
+        return len(added), errors
+
+    def save(self, banner: Banner) -> bool:
+        if banner.id is None:
+            banner.id = self._add(banner.content, banner.markedUp)
+        elif banner.id in self._entries:
+            self._write(banner.id, banner.content, banner.markedUp or None)
+            self._index(banner.id, banner.content, banner.markedUp)
+            self._invalidate_renders(banner.id)
+        else:
+            return False
+        self._persist([banner.id])
+
+        entry = self._entries[banner.id]
+        banner.digest = entry.digest
+        banner.width, banner.height, banner.line_count = (
+            entry.width, entry.height, entry.line_count
+        )
+        banner._dirty.clear()
+        return True
+
+    def delete(self, banner_id: int) -> bool:
+        if banner_id not in self._entries:
+            return False
+        self._remove(banner_id)
+        self._unindex(banner_id)
+        self._invalidate_renders(banner_id)
+        self._persist([banner_id])
+        return True
+
+    # The rendered banner cache
+
+    def lookup_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool = False,
+    ) -> bytes | None:
+        return self._renders.get(banner_id, {}).get((width, color_system, content_only))
+
+    def store_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool,
+        data: bytes,
+    ) -> None:
+        if banner_id in self._entries:
+            self._renders.setdefault(banner_id, {})[
+                (width, color_system, content_only)
+            ] = data
+
+    def _invalidate_renders(self, banner_id: int) -> None:
+        self._renders.pop(banner_id, None)
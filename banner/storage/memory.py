@@ -0,0 +1,23 @@
+"""A store that keeps the library in memory."""
+
+from .indexed import Entry, IndexedStore
+
+
+class MemoryStore(IndexedStore):
+    """Keeps the library in memory only, e.g. for benchmarks or a scratch
+    session. Everything is lost when the process exits."""
+
+    scheme = "memory"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._texts: dict[int, tuple[str, str | None]] = {}
+
+    def _read(self, banner_id: int, entry: Entry) -> tuple[str, str | None]:
+        return self._texts[banner_id]
+
+    def _write(self, banner_id: int, content: str, marked_up: str | None) -> None:
+        self._texts[banner_id] = (content, marked_up)
+
+    def _remove(self, banner_id: int) -> None:
+        del self._texts[banner_id]
@@ -0,0 +1,283 @@
+"""The default store, which keeps the library in SQLite through the models."""
+
+import os
+import sqlite3
+from contextlib import contextmanager, suppress
+from typing import Callable, Iterator
+from urllib.parse import quote
+
+from peewee import OperationalError, fn
+
+from .. import trace
+from ..models import (
+    app_db,
+    AsciiArt,
+    Banner,
+    BannerSearch,
+    CompressionDictionary,
+    PRAGMAS,
+    READ_ONLY_PRAGMAS,
+    RenderedBanner,
+)
+from ..models.schema import SCHEMA_VERSION, schema_version, set_schema_version
+from .base import BannerStore, SearchResult
+
+
+class SqliteStore(BannerStore):
+    """Keeps the library in the SQLite database the models are bound to.
+
+    Only this store has a full text search index, compression (see
+    ``banner compress``) and a persistent ASCII art cache.
+
+    Opened read-only, the database is connected to with ``mode=ro`` and
+    the `READ_ONLY_PRAGMAS`, so reading takes no write locks and does not
+    create the database. It is opened for writing as usual if it does not
+    exist yet or needs migrating, and reopened for writing by the first
+    write. Rendered banners are not such a write: they are kept until the
+    store closes, after the command has shown them, and only then cached.
+    """
+
+    scheme = "sqlite"
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        read_only: bool = False,
+    ) -> None:
+        """Initialise the store.
+
+        Args:
+            path: The database file. By default it is the one `app_db` was
+                set up with, ``~/.banner/app.db`` unless something has
+                called ``app_db.init``.
+            read_only: Open the database for reading only, until something
+                is written.
+        """
+        self.path = None if path is None else os.fspath(path)
+        self.read_only = read_only
+        self._database: str | None = None
+        """The database file while `app_db` is connected to it read-only."""
+        self._pending_renders: dict[tuple[int, int, str, bool], bytes] = {}
+        """Renderings to cache once the store is writable or closes."""
+
+    def open(self) -> None:
+        if self.path is not None and self.path != app_db.database:
+            app_db.init(self.path)
+        if not (self.read_only and self._open_read_only()):
+            self._open_writable()
+
+    def _open_read_only(self) -> bool:
+        """Connect read-only, if the database exists and is up to date."""
+        database = app_db.database
+        if database == ":memory:" or not os.path.isfile(database):
+            return False
+        app_db.init(
+            f"file:{quote(os.path.abspath(database))}?mode=ro",
+            pragmas=READ_ONLY_PRAGMAS,
+            uri=True,
+        )
+        self._database = database
+        try:
+            with trace.span("connect", read_only=True):
+                app_db.connect()
+                if schema_version() >= SCHEMA_VERSION:
+                    return True
+        except OperationalError:
+            pass
+        self._reset_database()
+        return False
+
+    def _open_writable(self) -> None:
+        if app_db.database != ":memory:":
+            os.makedirs(
+                os.path.dirname(os.path.abspath(app_db.database)), exist_ok=True
+            )
+        with trace.span("connect", read_only=False):
+            app_db.connect(reuse_if_open=True)
+        self.create_tables()
+
+    def _reset_database(self) -> None:
+        """Point `app_db` back at the database file, for writing."""
+        if self._database is not None:
+            app_db.init(self._database, pragmas=PRAGMAS, uri=False)
+            self._database = None
+
+    def _writable(self) -> None:
+        """Reopen a database opened read-only for writing."""
+        if self._database is not None:
+            self._reset_database()
+            self._open_writable()
+            self._store_pending_renders()
+
+    def _store_pending_renders(self) -> None:
+        pending, self._pending_renders = self._pending_renders, {}
+        with app_db.atomic():
+            for key, data in pending.items():
+                RenderedBanner.store(*key, data)
+
+    def close(self) -> None:
+        if self._pending_renders:
+            with trace.span("cache renders", renders=len(self._pending_renders)):
+                try:
+                    self._writable()
+                except OperationalError:
+                    # E.g. the database is locked or on a read-only file
+                    # system; the cache can do without these.
+                    self._pending_renders.clear()
+        app_db.close()
+        self._reset_database()
+
+    @staticmethod
+    def create_tables() -> None:
+        """Create the tables and apply any migrations, unless already done."""
+        if schema_version() >= SCHEMA_VERSION:
+            return
+        from ..models.migrations import add_banner_search, migrate_database
+
+        all_models = [Banner, RenderedBanner, AsciiArt, CompressionDictionary]
+        with trace.span("migrate schema"), app_db.atomic():
+            migrate_database()
+            app_db.create_tables(
+                all_models
+            )
+            add_banner_search()
+            set_schema_version()
+
+    @contextmanager
+    def worker(self) -> Iterator[Callable[[], None]]:
+        # Peewee connections belong to a thread, so this one is ours to
+        # interrupt without disturbing the UI thread's.
+        with app_db.connection_context():
+            connection = app_db.connection()
+
+            def interrupt() -> None:
+                # The work may have finished and closed it meanwhile.
+                with suppress(sqlite3.ProgrammingError):
+                    connection.interrupt()
+
+            yield interrupt
+
+    # Reading
+
+    def count(self) -> int:
+        return Banner.select().count()
+
+    def get(self, banner_id: int) -> Banner | None:
+        return Banner.get_or_none(Banner.id == banner_id)
+
+    @staticmethod
+    def _range(
+        query,
+        after: int | None,
+        before: int | None,
+        reverse: bool,
+        limit: int | None,
+        offset: int,
+    ):
+        # Keyset bounds seek on the primary key index rather than scanning.
+        if after is not None:
+            query = query.where(Banner.id > after)
+        if before is not None:
+            query = query.where(Banner.id < before)
+        query = query.order_by(Banner.id.desc() if reverse else Banner.id)
+        if limit is not None:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+        return query
+
+    def list_banners(
+        self,
+        after: int | None = None,
+        before: int | None = None,
+        reverse: bool = False,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[Banner]:
+        return list(self._range(Banner.select(), after, before, reverse, limit, offset))
+
+    def list_previews(
+        self,
+        chars: int,
+        after: int | None = None,
+        before: int | None = None,
+        reverse: bool = False,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[tuple[int, str]]:
+        # Only the start of each banner leaves SQLite.
+        preview = fn.substr(
+            fn.banner_text(
+                fn.coalesce(fn.nullif(Banner.markedUp, ""), Banner.content)
+            ),
+            1,
+            chars,
+        )
+        query = Banner.select(Banner.id, preview).tuples()
+        return list(self._range(query, after, before, reverse, limit, offset))
+
+    def iter_contents(self) -> Iterator[str]:
+        # Rows are read through a cursor rather than being cached on the
+        # query, so memory stays flat however big the library is.
+        query = Banner.select(Banner.content).order_by(Banner.id).tuples()
+        for content, in query.iterator():
+            yield content
+
+    def random(
+        self,
+        max_width: int | None = None,
+        max_height: int | None = None,
+    ) -> Banner | None:
+        return Banner.random(max_width=max_width, max_height=max_height)
+
+    def existing_digests(self, digests: list[str]) -> set[str]:
+        return Banner.existing_digests(digests)
+
+    def search(self, query: str, limit: int = 20, prefix: bool = False) -> list[SearchResult]:
+        return BannerSearch.search(query, limit, prefix)
+
+    # Writing
+
+    def add_many(self, rows: list[dict]) -> tuple[int, list[Exception]]:
+        self._writable()
+        return Banner.insert_batch(rows)
+
+    def save(self, banner: Banner) -> bool:
+        self._writable()
+        is_new = banner.id is None
+        result = banner.save()
+        if not is_new:
+            RenderedBanner.invalidate(banner.id)
+        return bool(result)
+
+    def delete(self, banner_id: int) -> bool:
+        self._writable()
+        # Its renderings go with it, through the foreign key.
+        return Banner.delete().where(Banner.id == banner_id).execute() > 0
+
+    # The rendered banner cache
+
+    def lookup_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool = False,
+    ) -> bytes | None:
+        data = self._pending_renders.get((banner_id, width, color_system, content_only))
+        if data is not None:
+            return data
+        return RenderedBanner.lookup(banner_id, width, color_system, content_only)
+
+    def store_render(
+        self,
+        banner_id: int,
+        width: int,
+        color_system: str,
+        content_only: bool,
+        data: bytes,
+    ) -> None:
+        if self._database is not None:
+            self._pending_renders[banner_id, width, color_system, content_only] = data
+            return
+        RenderedBanner.store(banner_id, width, color_system, content_only, data)
@@ -0,0 +1,249 @@
+"""Phase timing, to find out where Banner spends its time.
+
+Tracing is off unless ``banner --profile`` or ``$BANNER_TRACE=FILE``
+turns it on. While it is off, `span` hands out one shared object that does
+nothing and `traced` functions make one extra call, so the command line
+and the screens can be instrumented freely. Importing this module costs
+next to nothing, as what writing a trace needs is imported when it is
+written.
+
+While it is on, every span becomes a complete event in a Chrome trace
+file, which chrome://tracing and https://ui.perfetto.dev open. Spans
+nest by time within a thread, so phases run in the TUI's workers show up
+on their own tracks. The file also holds the total time of each phase::
+
+    {"traceEvents": [...], "phases": {"open store": 1.2, ...}, ...}
+
+With ``--cprofile`` or ``$BANNER_TRACE_CPROFILE=1`` the main thread is
+also profiled with cProfile, and the stats are saved next to the trace
+with a ``.prof`` suffix for ``python -m pstats`` or snakeviz.
+"""
+
+import functools
+import os
+import sys
+import time
+from _thread import get_ident
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+TRACE_ENV = "BANNER_TRACE"
+"""The environment variable that names a trace file to write."""
+
+CPROFILE_ENV = "BANNER_TRACE_CPROFILE"
+"""The environment variable that turns on cProfile along with tracing."""
+
+DEFAULT_PATH = "banner-trace.json"
+
+LOADED_AT = time.perf_counter()
+"""When this module was imported, which the entry point does first, so
+that the time until the command starts is the time spent importing."""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _NullSpan:
+    """The span handed out while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def set(self, **args: Any) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A phase being timed; `set` adds details to show with it."""
+
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add(self.name, self.start, time.perf_counter(), self.args)
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects the spans of one run and writes them out."""
+
+    def __init__(self, path: str, cprofile: bool = False) -> None:
+        self.path = path
+        self.events: list[tuple[str, float, float, int, dict]] = []
+        # Named as they are seen, since worker threads may be gone by the
+        # time the trace is written.
+        self.threads: dict[int, str] = {}
+        self.profiler = None
+        if cprofile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def add(self, name: str, start: float, end: float, args: dict) -> None:
+        # Appending is atomic, so worker threads need no lock.
+        tid = get_ident()
+        if tid not in self.threads:
+            import threading
+            self.threads[tid] = threading.current_thread().name
+        self.events.append((name, start, end, tid, args))
+
+    def phases(self) -> dict[str, float]:
+        """The total milliseconds spent in each phase."""
+        totals: dict[str, float] = {}
+        for name, start, end, _, _ in self.events:
+            totals[name] = totals.get(name, 0.0) + (end - start) * 1000
+        return totals
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = [
+            {
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self.threads.items()
+        ]
+        for name, start, end, tid, args in sorted(self.events, key=lambda e: e[1]):
+            events.append({
+                "name": name,
+                "cat": "banner",
+                "ph": "X",
+                "ts": round((start - LOADED_AT) * 1_000_000, 1),
+                "dur": round((end - start) * 1_000_000, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "phases": {name: round(ms, 3) for name, ms in self.phases().items()},
+            "otherData": {"argv": " ".join(sys.argv), "python": sys.version.split()[0]},
+        }
+
+    def write(self) -> list[str]:
+        """Write the trace, and the profile if there is one.
+
+        Returns:
+            The paths written.
+        """
+        import json
+
+        paths = [self.path]
+        if self.profiler is not None:
+            self.profiler.disable()
+            profile_path = os.path.splitext(self.path)[0] + ".prof"
+            self.profiler.dump_stats(profile_path)
+            paths.append(profile_path)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return paths
+
+    def summary(self) -> str:
+        """The phases of the main thread as an indented list, in order."""
+        import threading
+
+        main_thread = threading.main_thread().ident
+        events = sorted(
+            (event for event in self.events if event[3] == main_thread),
+            key=lambda event: (event[1], -event[2]),
+        )
+        lines = []
+        open_ends: list[float] = []
+        for name, start, end, _, args in events:
+            while open_ends and start >= open_ends[-1]:
+                open_ends.pop()
+            details = " ".join(f"{key}={value}" for key, value in args.items())
+            lines.append(
+                f"{(end - start) * 1000:9.2f}ms  {'  ' * len(open_ends)}{name}"
+                + (f"  ({details})" if details else "")
+            )
+            open_ends.append(end)
+        return "\n".join(lines)
+
+
+_tracer: Tracer | None = None
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, **args: Any) -> Span | _NullSpan:
+    """Time a phase: ``with span("render", width=80): ...``."""
+    tracer = _tracer
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, name, args)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Time every call of a function as a phase called `name`."""
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+def record(name: str, start: float, end: float, **args: Any) -> None:
+    """Add a phase that was timed before tracing started."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.add(name, start, end, args)
+
+
+@contextmanager
+def tracing(
+    path: str | None = None,
+    cprofile: bool = False,
+    summary: bool = False,
+) -> Iterator[Tracer | None]:
+    """Trace everything run inside, if a path or ``$BANNER_TRACE`` gives a file.
+
+    Args:
+        path: The trace file to write.
+        cprofile: Also profile the main thread with cProfile. Without a
+            path, this traces to `DEFAULT_PATH`.
+        summary: Print the phases and where they were written to stderr.
+    """
+    global _tracer
+    cprofile = cprofile or bool(os.environ.get(CPROFILE_ENV))
+    path = path or os.environ.get(TRACE_ENV) or (DEFAULT_PATH if cprofile else None)
+    if path is None or _tracer is not None:
+        yield _tracer
+        return
+
+    tracer = _tracer = Tracer(path, cprofile)
+    try:
+        yield tracer
+    finally:
+        _tracer = None
+        paths = tracer.write()
+        if summary:
+            print(tracer.summary(), file=sys.stderr)
+            print(f"Trace written to {', '.join(paths)}", file=sys.stderr)
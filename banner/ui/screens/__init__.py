@@ -4,5 +4,9 @@ from .main import Main
 from .add import AddBanner
 from .edit import EditBanner
 from .gen_ascii_text import GenAsciiText
+from .font_gallery import FontGallery
+from .search import SearchBanners
+from .browse import BrowseBanners
 
-__all__ = ["Main", "AddBanner", "EditBanner", "GenAsciiText"]
+__all__ = ["Main", "AddBanner", "EditBanner", "GenAsciiText", "FontGallery",
+           "SearchBanners", "BrowseBanners"]
@@ -5,6 +5,7 @@ from textual.widgets import Header, Footer, TabbedContent, TabPane, TextArea, Ri
 from textual.reactive import var
 
 from ...models import Banner
+from ...storage import get_store
 from ..dialogs.info import InformationDialog
 
 from ..dialogs.error import ErrorDialog
@@ -48,7 +49,7 @@ class AddBanner(Screen[bool]):
         self.banner.content = event.text_area.text
 
     def action_save_banner(self):
-        result = self.banner.save()
+        result = get_store().save(self.banner)
         if result:
             self.notify(f"Banner #{self.banner.id} has been saved")
             self.dismiss(True)
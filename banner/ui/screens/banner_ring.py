@@ -0,0 +1,58 @@
+"""A ring buffer of the banners either side of the one on show."""
+
+from rich.console import RenderableType
+
+from ...models import Banner
+
+
+class BannerRing:
+    """Caches the banners around the current one, with their renderables.
+
+    The ring holds a contiguous run of ids in id order, so the neighbours of
+    any cached banner except the two ends are known without a query.
+    """
+
+    def __init__(self, size: int = 5) -> None:
+        """Initialise the ring.
+
+        Args:
+            size: How many banners to keep on each side of the current one.
+        """
+        self.size = size
+        self.generation = 0
+        """Bumped by every invalidation so stale prefetches can be dropped."""
+        self._ids: list[int] = []
+        self._entries: dict[int, tuple[Banner, RenderableType]] = {}
+
+    def __contains__(self, banner_id: int) -> bool:
+        return banner_id in self._entries
+
+    def get(self, banner_id: int) -> tuple[Banner, RenderableType] | None:
+        return self._entries.get(banner_id)
+
+    def _neighbour(self, banner_id: int, offset: int) -> tuple[Banner, RenderableType] | None:
+        if banner_id not in self._entries:
+            return None
+        index = self._ids.index(banner_id) + offset
+        if 0 <= index < len(self._ids):
+            return self._entries[self._ids[index]]
+        return None
+
+    def next(self, banner_id: int) -> tuple[Banner, RenderableType] | None:
+        """The cached banner after `banner_id`, if there is one."""
+        return self._neighbour(banner_id, 1)
+
+    def previous(self, banner_id: int) -> tuple[Banner, RenderableType] | None:
+        """The cached banner before `banner_id`, if there is one."""
+        return self._neighbour(banner_id, -1)
+
+    def fill(self, entries: list[tuple[Banner, RenderableType]]) -> None:
+        """Replace the ring with a contiguous run of banners in id order."""
+        self._ids = [banner.id for banner, _ in entries]
+        self._entries = {entry[0].id: entry for entry in entries}
+
+    def invalidate(self) -> None:
+        """Forget every cached banner, after one is added, edited or deleted."""
+        self.generation += 1
+        self._ids = []
+        self._entries = {}
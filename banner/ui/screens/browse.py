@@ -0,0 +1,48 @@
+from textual import on, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.screen import Screen
+from textual.widgets import Footer, Header
+
+from ..widgets import BannerTable
+from .edit import EditBanner
+
+
+class BrowseBanners(Screen[bool]):
+    """Lists the whole library, to pick a banner to edit."""
+
+    DEFAULT_CSS = """
+    BrowseBanners #banner_table {
+        height: 1fr;
+    }
+    """
+
+    BINDINGS = [
+        Binding("ctrl+q,escape", "go_back", "Back"),
+    ]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.edited = False
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield BannerTable(id="banner_table")
+        yield Footer()
+
+    def on_mount(self):
+        self.title = "Browse Banners"
+        table = self.query_one("#banner_table", BannerTable)
+        self.sub_title = f"{table.row_count} banners"
+        table.focus()
+
+    @on(BannerTable.Selected, "#banner_table")
+    @work
+    async def edit_banner(self, event: BannerTable.Selected) -> None:
+        if await self.app.push_screen_wait(EditBanner(banner_id=event.banner_id)):
+            self.edited = True
+            self.query_one("#banner_table", BannerTable).reload()
+
+    def action_go_back(self):
+        # Tell the caller whether anything it shows may be stale.
+        self.dismiss(self.edited)
@@ -1,11 +1,13 @@
 from textual import on, work
 from textual.binding import Binding
 from textual.screen import Screen
-from textual.widgets import Header, Footer, TabbedContent, TabPane, TextArea, RichLog
+from textual.widgets import Header, Footer, TabbedContent, TabPane, TextArea
 from textual.reactive import var
 
 from ...models import Banner
+from ...storage import get_store
 from ..dialogs import InformationDialog, ErrorDialog, YesNoDialog
+from ..widgets import MarkupPreview
 
 # TODO: Allow editing of original content along with markup
 
@@ -38,15 +40,15 @@ class EditBanner(Screen[bool]):
             with TabPane("Edit", id="edit_tab"):
                 yield TextArea.code_editor(text=self.banner_markup, id="edit_textarea")
             with TabPane("Preview", id="preview_tab"):
-                yield RichLog(highlight=True, markup=True, id="preview_log")
+                yield MarkupPreview(id="preview_log")
         yield Footer()
 
     def on_mount(self):
         self.title = f"Editing Banner #{self.banner_id}"
         text_edit: TextArea = self.query_one("#edit_textarea")
-        text_preview: RichLog = self.query_one("#preview_log")
+        text_preview: MarkupPreview = self.query_one("#preview_log")
         text_edit.text = self.banner_markup
-        text_preview.write(self.banner_markup)
+        text_preview.update_markup(self.banner_markup, debounce=False)
 
         # Save the initial markup
         self.initial_markup = self.banner_markup
@@ -54,9 +56,10 @@ class EditBanner(Screen[bool]):
     @on(TextArea.Changed, "#edit_textarea")
     def on_edit_textarea_changed(self, event: TextArea.Changed):
         self.banner_markup = event.text_area.text
-        text_preview: RichLog = self.query_one("#preview_log")
-        text_preview.clear()
-        text_preview.write(event.text_area.text)
+        # Parsed in the background once typing pauses, re-rendering only
+        # the lines that changed.
+        text_preview: MarkupPreview = self.query_one("#preview_log")
+        text_preview.update_markup(event.text_area.text)
 
         self.banner.markedUp = event.text_area.text
 
@@ -67,7 +70,7 @@ class EditBanner(Screen[bool]):
     def action_save_banner(self):
         if self.banner is not None:
             if self.banner.is_dirty():
-                result = self.banner.save()
+                result = get_store().save(self.banner)
                 if result:
                     self.notify(f"Banner #{self.banner_id} has been saved")
                 else:
@@ -113,13 +116,13 @@ class EditBanner(Screen[bool]):
                 self.banner_markup = self.banner.content
                 text_edit: TextArea = self.query_one("#edit_textarea")
                 text_edit.text = self.banner_markup
-                self.banner.save()
+                get_store().save(self.banner)
                 self.notify(
                     f"Banner markup has been reset to original content.")
 
     def watch_banner_id(self, banner_id: int | None):
         if banner_id is not None:
-            banner = Banner.get(Banner.id == self.banner_id)
+            banner = get_store().get(self.banner_id)
             if banner is not None:
                 self.banner = banner
             else:
@@ -0,0 +1,119 @@
+import asyncio
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr
+
+from rich.console import Group
+from rich.text import Text
+from textual import on, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.screen import Screen
+from textual.widgets import Footer, Header, OptionList
+from textual.widgets.option_list import Option
+
+from art import ASCII_FONTS
+
+from ...app.ascii import art_cache, timed_gen_ascii_text, worker_context
+
+
+class FontGallery(Screen[str | None]):
+    """Shows some text drawn in every font, to pick one from."""
+
+    DEFAULT_CSS = """
+    FontGallery #gallery {
+        height: 1fr;
+    }
+    """
+
+    BINDINGS = [
+        Binding("ctrl+q,escape", "go_back", "Back"),
+    ]
+
+    def __init__(self, text: str, jobs: int | None = None, **kwargs):
+        """Initialise the gallery.
+
+        Args:
+            text: The text to draw.
+            jobs: How many processes to draw in (default: one per CPU).
+        """
+        super().__init__(**kwargs)
+        self.text = text
+        self.jobs = jobs
+        self.num_rendered = 0
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        # OptionList only renders the lines that are scrolled into view, so
+        # hundreds of multi-line entries stay cheap.
+        yield OptionList(id="gallery")
+        yield Footer()
+
+    def on_mount(self):
+        self.title = "Font Gallery"
+        self.sub_title = f"0/{len(ASCII_FONTS)} fonts"
+        self.render_fonts()
+
+    def add_font(self, font: str, art_text: str, seconds: float | None) -> None:
+        timing = "cached" if seconds is None else f"{seconds * 1000:.1f} ms"
+        self.query_one("#gallery", OptionList).add_option(
+            Option(
+                Group(
+                    Text(f"{font} ({timing})", style="bold"),
+                    Text(art_text.rstrip("\n"), no_wrap=True, overflow="crop"),
+                    Text(""),
+                ),
+                id=font,
+            )
+        )
+        self.num_rendered += 1
+        self.sub_title = f"{self.num_rendered}/{len(ASCII_FONTS)} fonts"
+
+    @work(exclusive=True, group="gallery")
+    async def render_fonts(self) -> None:
+        """Draw the text in every font across a process pool.
+
+        Cached fonts are shown first. The rest are added as their
+        processes finish, so the list can be browsed while the remaining
+        fonts render.
+        """
+        missing = []
+        for font in ASCII_FONTS:
+            art_text = art_cache.get(self.text, font)
+            if art_text is None:
+                missing.append(font)
+            else:
+                self.add_font(font, art_text, None)
+
+        if not missing:
+            return
+
+        loop = asyncio.get_running_loop()
+        context = worker_context()
+        # Textual replaces stderr with an object without a usable file
+        # descriptor, while the resource tracker that the pool starts and
+        # the workers that the first submissions start are handed the one
+        # of stderr.
+        with redirect_stderr(sys.__stderr__):
+            pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=context)
+        results = []
+        try:
+            with redirect_stderr(sys.__stderr__):
+                futures = [
+                    loop.run_in_executor(pool, timed_gen_ascii_text, self.text, font)
+                    for font in missing
+                ]
+            for future in asyncio.as_completed(futures):
+                art_text, font, seconds = await future
+                results.append((self.text, font, art_text))
+                self.add_font(font, art_text, seconds)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            art_cache.put_many(results)
+
+    @on(OptionList.OptionSelected, "#gallery")
+    def font_selected(self, event: OptionList.OptionSelected) -> None:
+        self.dismiss(event.option.id)
+
+    def action_go_back(self):
+        self.dismiss(None)
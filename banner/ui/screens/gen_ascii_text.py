@@ -1,3 +1,7 @@
+import asyncio
+import time
+from collections import deque
+
 from textual import on, work
 from textual.app import ComposeResult
 from textual.binding import Binding
@@ -6,11 +10,14 @@ from textual.containers import Horizontal, Vertical, Container
 from textual.widgets import Footer, Header, Static, Button, RichLog, Select, Input
 from textual.reactive import var
 
-from art import text2art, ASCII_FONTS
+from art import ASCII_FONTS
 
 from ..dialogs import YesNoDialog, ErrorDialog
 
 from ...models import Banner
+from ...storage import get_store
+from ...app.ascii import art_cache, resolve_font
+from .font_gallery import FontGallery
 
 
 class GenAsciiText(Screen[bool]):
@@ -23,9 +30,13 @@ class GenAsciiText(Screen[bool]):
 
     banner: var[Banner | None] = var(None)
 
+    PREVIEW_DEBOUNCE = 0.15
+    """Seconds to wait for typing to pause before rendering the preview."""
+
     BINDINGS = [
         Binding("ctrl+s", "save_banner", "Save"),
         Binding("ctrl+r", "regenerate", "Regenerate"),
+        Binding("ctrl+g", "open_gallery", "Font Gallery"),
         Binding("ctrl+q,escape", "go_back", "Back"),
     ]
 
@@ -37,6 +48,8 @@ class GenAsciiText(Screen[bool]):
             content="",
             markedUp=""
         )
+        self.preview_latencies: deque[float] = deque(maxlen=100)
+        """Seconds from the latest input change to its preview, newest last."""
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -75,12 +88,18 @@ class GenAsciiText(Screen[bool]):
         self.text = str(event.value)
 
     def action_regenerate(self) -> None:
-        self.art_text = text2art(self.text, font=self.selected_font)
+        self.request_preview(debounce=False)
+
+    @work
+    async def action_open_gallery(self) -> None:
+        font = await self.app.push_screen_wait(FontGallery(self.text))
+        if font is not None:
+            self.query_one("#font_select", Select).value = font
 
     def action_save_banner(self) -> None:
         if self.banner is not None:
             if self.banner.is_dirty():
-                result = self.banner.save()
+                result = get_store().save(self.banner)
                 if result:
                     self.notify(f"Banner #{self.banner.id} has been saved")
                 else:
@@ -108,17 +127,54 @@ class GenAsciiText(Screen[bool]):
                     self.dismiss(False)
 
     def watch_text(self, text: str) -> None:
-        self.art_text = text2art(text, font=self.selected_font)
+        self.request_preview()
 
     def watch_selected_font(self, selected_font: str) -> None:
-        self.art_text = text2art(self.text, font=selected_font)
+        self.request_preview()
+
+    def request_preview(self, debounce: bool = True) -> None:
+        """Render the preview for the current text and font in the background."""
+        if not self.is_mounted:
+            return
+        self.render_preview(
+            self.text,
+            self.selected_font,
+            time.perf_counter(),
+            debounce,
+        )
+
+    @work(exclusive=True, group="preview")
+    async def render_preview(
+        self,
+        text: str,
+        font: str,
+        requested_at: float,
+        debounce: bool,
+    ) -> None:
+        """Render ASCII art off the UI thread.
+
+        The cache lookup, which may query the database, runs in the thread
+        too. The worker is exclusive, so a newer request cancels this one,
+        whether it is still waiting out the debounce or drawing in its
+        thread, and stale art never reaches the preview.
+        """
+        if debounce:
+            await asyncio.sleep(self.PREVIEW_DEBOUNCE)
+
+        font = resolve_font(font, text)
+        art_text = await asyncio.to_thread(art_cache.render, text, font)
+
+        self.art_text = art_text
+        latency = time.perf_counter() - requested_at
+        self.preview_latencies.append(latency)
+        self.sub_title = f"{font} · preview in {latency * 1000:.0f} ms"
 
     def watch_art_text(self, art_text: str) -> None:
         self.update_preview(art_text)
         self.banner.content = art_text
 
     def get_textart(self, text: str) -> str:
-        art_text = text2art(text, font=self.selected_font)
+        art_text = art_cache.render(text, font=self.selected_font)
         return art_text
 
     def update_preview(self, content: str) -> None:
@@ -1,4 +1,9 @@
+import asyncio
 
+from rich.console import RenderableType
+from rich.errors import MarkupError
+from rich.highlighter import Highlighter
+from rich.text import Text
 from textual import on, work
 from textual.app import ComposeResult
 from textual.binding import Binding
@@ -9,23 +14,45 @@ from textual.reactive import var
 
 from ..dialogs import YesNoDialog
 
+from ... import trace
 from ...models import Banner
+from ...storage import get_store
 
 from .edit import EditBanner
 from .add import AddBanner
 from .gen_ascii_text import GenAsciiText
+from .search import SearchBanners
+from .browse import BrowseBanners
+from .banner_ring import BannerRing
+
+
+def banner_renderable(banner: Banner, highlighter: Highlighter) -> RenderableType:
+    """Parse a banner the way `RichLog.write` would, so it can be done ahead."""
+    if banner.markedUp is None or banner.markedUp == "":
+        markup = banner.content
+    else:
+        markup = banner.markedUp
+    try:
+        text = Text.from_markup(markup)
+    except MarkupError:
+        text = Text(markup)
+    return highlighter(text)
 
 
 class Main(Screen):
-    current_index = var(1)
     total_banners = var(0)
     banner_id = var(0)
 
+    PREFETCH_SIZE = 5
+    """How many banners to preload on each side of the current one."""
+
     BINDINGS = [
         Binding("a,i,n,ctrl+a,ctrl+i,insert", "add_banner", "Add"),
         Binding("e,m,ctrl+e", "edit_banner", "Edit"),
         Binding("g,ctrl+g", "gen_ascii_text_banner", "Gen. ASCII Text"),
         Binding("d,x,ctrl+d,delete", "delete_banner", "Delete"),
+        Binding("/,s,ctrl+f", "search_banners", "Search"),
+        Binding("b,l,ctrl+l", "browse_banners", "Browse"),
         Binding("q,ctrl+q,escape", "request_quit", "Quit"),
         Binding("left,up", "navigate(0)", "", show=False),
         Binding("right,down", "navigate(1)", "", show=False),
@@ -46,57 +73,109 @@ class Main(Screen):
         )
         yield Footer()
 
-    def update_banner_preview(self):
-        self.total_banners = Banner.select().count()
-        if self.total_banners > 0:
-            banners = Banner.select().order_by(Banner.id).paginate(
-                self.current_index,
-                1,
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.ring = BannerRing(self.PREFETCH_SIZE)
+
+    @trace.traced("show banner")
+    def show_banner(
+        self,
+        banner: Banner | None,
+        renderable: RenderableType | None = None,
+    ) -> None:
+        """Show a banner in the carousel, or clear it if there is none.
+
+        Args:
+            banner: The banner to show.
+            renderable: The banner already parsed by `banner_renderable`.
+        """
+        banner_preview: RichLog = self.query_one("#banner_preview")
+        banner_preview.clear()
+        if banner is None:
+            self.banner_id = 0
+            self.title = "No Banners"
+            return
+
+        self.banner_id = banner.id
+        if renderable is None:
+            renderable = banner_renderable(banner, banner_preview.highlighter)
+        banner_preview.write(renderable)
+        self.title = f"Banner #{self.banner_id}"
+        self.prefetch_neighbours(self.banner_id)
+
+    def show_cached(self, entry: tuple[Banner, RenderableType] | None) -> bool:
+        """Show a banner from the ring. Returns False if it wasn't cached."""
+        if entry is None:
+            return False
+        self.show_banner(*entry)
+        return True
+
+    @work(exclusive=True, group="prefetch")
+    async def prefetch_neighbours(self, banner_id: int) -> None:
+        """Preload the banners around `banner_id` into the ring.
+
+        The ids are cheap seeks in the store; parsing the markup is the
+        slow part, so it happens in a thread, and banners already in the
+        ring are not parsed again.
+        """
+        generation = self.ring.generation
+        store = get_store()
+        with trace.span("list neighbours"):
+            after = store.list_banners(after=banner_id, limit=self.ring.size)
+            before = store.list_banners(
+                before=banner_id + 1, reverse=True, limit=self.ring.size + 1
             )
-            banner = banners[0]
-            self.banner_id = banner.id
-            if banner:
-                if banner.markedUp is None or banner.markedUp == "":
-                    current_banner = banner.content
-                else:
-                    current_banner = banner.markedUp
-
-                banner_preview: RichLog = self.query_one("#banner_preview")
-                banner_preview.clear()
-                banner_preview.write(current_banner)
-                self.title = f"Banner #{self.banner_id}"
+        banners = before[::-1] + after
+        highlighter = self.query_one("#banner_preview", RichLog).highlighter
+
+        @trace.traced("parse neighbours")
+        def parse() -> list[tuple[Banner, RenderableType]]:
+            return [
+                self.ring.get(banner.id)
+                or (banner, banner_renderable(banner, highlighter))
+                for banner in banners
+            ]
+
+        entries = await asyncio.to_thread(parse)
+        # An add, edit or delete while we were busy makes these stale.
+        if generation == self.ring.generation:
+            self.ring.fill(entries)
+
+    def update_banner_preview(self):
+        """Reload the current banner, e.g. after it has been edited."""
+        self.ring.invalidate()
+        self.show_banner(get_store().get(self.banner_id))
 
     def on_mount(self):
-        self.update_banner_preview()
+        # The count is taken once; add and delete keep it up to date.
+        self.total_banners = get_store().count()
+        self.show_banner(get_store().first())
 
     @on(Button.Pressed, "#prev_btn")
     def prev_banner(self) -> None:
         self.go_to_previous()
 
     def go_to_previous(self):
-        self.total_banners = Banner.select().count()
-        if self.current_index > 1:
-            self.current_index -= 1
-        else:
-            self.current_index = self.total_banners
-        self.update_banner_preview()
+        if self.show_cached(self.ring.previous(self.banner_id)):
+            return
+        # Keyset navigation: a seek from the current id instead of an
+        # offset, wrapping around to the last banner.
+        self.show_banner(get_store().previous(self.banner_id))
 
     @on(Button.Pressed, "#next_btn")
     def next_banner(self) -> None:
         self.go_to_next()
 
     def go_to_next(self):
-        self.total_banners = Banner.select().count()
-        if self.current_index < self.total_banners:
-            self.current_index += 1
-        else:
-            self.current_index = 1
-        self.update_banner_preview()
+        if self.show_cached(self.ring.next(self.banner_id)):
+            return
+        self.show_banner(get_store().next(self.banner_id))
 
     def go_to_last(self) -> None:
-        self.total_banners = Banner.select().count()
-        self.current_index = self.total_banners
-        self.update_banner_preview()
+        self.show_banner(get_store().last())
+
+    def watch_total_banners(self, total_banners: int) -> None:
+        self.sub_title = f"{total_banners} banners"
 
     def action_navigate(self, direction: int):
         if direction > 0:
@@ -109,6 +188,8 @@ class Main(Screen):
         if await self.app.push_screen_wait(
             AddBanner(),
         ):
+            self.total_banners += 1
+            self.ring.invalidate()
             self.go_to_last()
 
     @work
@@ -120,6 +201,8 @@ class Main(Screen):
         )
         if edited:
             self.update_banner_preview()
+        else:
+            self.ring.invalidate()
 
     @work
     async def action_delete_banner(self):
@@ -132,9 +215,10 @@ class Main(Screen):
                 """
             ),
         ):
-            result = Banner.delete().where(Banner.id == self.banner_id).execute()
-            if result:
+            if get_store().delete(self.banner_id):
                 self.notify(f"Banner #{self.banner_id} has been deleted")
+                self.total_banners -= 1
+                self.ring.invalidate()
                 self.go_to_previous()
             else:
                 self.notify("Failed to delete banner", severity="error")
@@ -144,7 +228,20 @@ class Main(Screen):
         if await self.app.push_screen_wait(
             GenAsciiText(),
         ):
+            self.total_banners += 1
+            self.ring.invalidate()
             self.go_to_last()
 
+    @work
+    async def action_search_banners(self):
+        banner_id = await self.app.push_screen_wait(SearchBanners())
+        if banner_id is not None:
+            self.show_banner(get_store().get(banner_id))
+
+    @work
+    async def action_browse_banners(self):
+        if await self.app.push_screen_wait(BrowseBanners()):
+            self.update_banner_preview()
+
     def action_request_quit(self):
         self.app.exit()
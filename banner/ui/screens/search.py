@@ -0,0 +1,105 @@
+import asyncio
+
+from rich.text import Text
+from textual import on, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.screen import Screen
+from textual.widgets import Footer, Header, Input, OptionList
+from textual.widgets.option_list import Option
+
+from ... import trace
+from ...app.commands import search_snippet
+from ...storage import get_store
+
+
+class SearchBanners(Screen[int | None]):
+    """Searches the banners as the user types, to pick one to show."""
+
+    DEFAULT_CSS = """
+    SearchBanners #results {
+        height: 1fr;
+    }
+    """
+
+    BINDINGS = [
+        Binding("ctrl+q,escape", "go_back", "Back"),
+        Binding("down", "focus_results", "", show=False),
+    ]
+
+    DEBOUNCE = 0.05
+    """Seconds to wait for typing to pause before searching."""
+
+    LIMIT = 100
+    """How many matches to list."""
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Input(placeholder="Search banners", id="search_input")
+        yield OptionList(id="results")
+        yield Footer()
+
+    def on_mount(self):
+        self.title = "Search Banners"
+
+    @on(Input.Changed, "#search_input")
+    def query_changed(self, event: Input.Changed) -> None:
+        self.search(event.value)
+
+    @work(exclusive=True, group="search")
+    async def search(self, query: str) -> None:
+        """Search in a thread, interrupting the search if a newer one starts.
+
+        Starting a new search cancels this worker. A search still waiting
+        out the debounce just stops; one already running in the store is
+        interrupted if the store can do that, so a slow query never holds
+        up the next keystroke.
+        """
+        await asyncio.sleep(self.DEBOUNCE)
+        store = get_store()
+        interrupts = []
+
+        @trace.traced("search query")
+        def run_search():
+            with store.worker() as interrupt:
+                interrupts.append(interrupt)
+                return store.search(query, self.LIMIT, prefix=True)
+
+        try:
+            matches = await asyncio.to_thread(run_search)
+        except asyncio.CancelledError:
+            if interrupts:
+                interrupts[0]()
+            raise
+
+        results = self.query_one("#results", OptionList)
+        results.clear_options()
+        results.add_options(
+            Option(
+                Text.assemble(
+                    (f"#{banner_id} ", "bold"), search_snippet(snippet)
+                ),
+                id=str(banner_id),
+            )
+            for banner_id, snippet, _rank in matches
+        )
+        self.sub_title = f"{len(matches)} matches" if query.strip() else ""
+
+    def action_focus_results(self) -> None:
+        results = self.query_one("#results", OptionList)
+        results.focus()
+        if results.highlighted is None and results.option_count:
+            results.highlighted = 0
+
+    @on(Input.Submitted, "#search_input")
+    def select_first(self) -> None:
+        results = self.query_one("#results", OptionList)
+        if results.option_count:
+            self.dismiss(int(results.get_option_at_index(0).id))
+
+    @on(OptionList.OptionSelected, "#results")
+    def banner_selected(self, event: OptionList.OptionSelected) -> None:
+        self.dismiss(int(event.option.id))
+
+    def action_go_back(self):
+        self.dismiss(None)
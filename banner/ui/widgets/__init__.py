@@ -0,0 +1,6 @@
+"""Widgets shared by the screens."""
+
+from .banner_table import BannerTable
+from .markup_preview import MarkupPreview
+
+__all__ = ["BannerTable", "MarkupPreview"]
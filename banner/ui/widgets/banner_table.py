@@ -0,0 +1,292 @@
+"""Provides a virtualized list of every banner in the library."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from math import ceil
+
+from rich.highlighter import ReprHighlighter
+from rich.segment import Segment
+from rich.style import Style
+from textual import events, work
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.reactive import var
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from ... import trace
+from ...storage import get_store
+from .markup_preview import render_markup_line, split_markup_lines
+
+Row = tuple[int, list[Strip]]
+"""A banner id and its rendered preview lines."""
+
+
+class BannerTable(ScrollView, can_focus=True):
+    """Lists banners in id order, with the first few lines of each.
+
+    Rows are fetched a page at a time, only once a page scrolls into view,
+    and only the first `PREVIEW_CHARS` characters of each banner are read.
+    Just enough pages to cover a few screens are kept, so memory and
+    render time depend on the size of the viewport rather than the size
+    of the library.
+    """
+
+    DEFAULT_CSS = """
+    BannerTable {
+        background: $surface;
+        & > .banner-table--id {
+            color: $text-muted;
+            text-style: bold;
+        }
+        & > .banner-table--cursor {
+            background: $block-cursor-blurred-background;
+        }
+        &:focus > .banner-table--cursor {
+            background: $block-cursor-background;
+        }
+    }
+    """
+
+    COMPONENT_CLASSES = {"banner-table--id", "banner-table--cursor"}
+
+    BINDINGS = [
+        Binding("enter", "select", "Open", show=False),
+        Binding("up", "move(-1)", "", show=False),
+        Binding("down", "move(1)", "", show=False),
+        Binding("pageup", "page(-1)", "", show=False),
+        Binding("pagedown", "page(1)", "", show=False),
+        Binding("home", "first", "", show=False),
+        Binding("end", "last", "", show=False),
+    ]
+
+    PREVIEW_LINES = 3
+    """How many lines of each banner to show."""
+
+    ROW_HEIGHT = PREVIEW_LINES + 1
+    """The preview lines plus a blank line between rows."""
+
+    PREVIEW_CHARS = 1024
+    """How much of each banner to read for its preview."""
+
+    PAGE_SIZE = 32
+    """How many rows to fetch at a time."""
+
+    ID_WIDTH = 9
+
+    cursor_row: var[int] = var(0)
+    """The index of the highlighted row."""
+
+    class Selected(Message):
+        """Posted when a banner is picked."""
+
+        def __init__(self, table: BannerTable, banner_id: int) -> None:
+            super().__init__()
+            self.table = table
+            self.banner_id = banner_id
+
+        @property
+        def control(self) -> BannerTable:
+            return self.table
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.highlighter = ReprHighlighter()
+        self.row_count = 0
+        self._pages: OrderedDict[int, list[Row]] = OrderedDict()
+        self._loading: set[int] = set()
+        self._generation = 0
+
+    def on_mount(self) -> None:
+        self.reload()
+
+    def reload(self) -> None:
+        """Forget every loaded page and count the banners again."""
+        self._generation += 1
+        self._pages.clear()
+        self._loading.clear()
+        self.row_count = get_store().count()
+        # Previews are cropped to the width, so only scroll vertically.
+        self.virtual_size = Size(0, self.row_count * self.ROW_HEIGHT)
+        self.cursor_row = min(self.cursor_row, max(self.row_count - 1, 0))
+        self.refresh()
+
+    @property
+    def max_pages(self) -> int:
+        """Keep enough pages for three screens' worth of rows."""
+        visible_rows = ceil(self.scrollable_content_region.height / self.ROW_HEIGHT)
+        return 3 * (ceil(visible_rows / self.PAGE_SIZE) + 1)
+
+    def get_row(self, index: int) -> Row | None:
+        """The row at an index, or None while its page is still loading."""
+        page, offset = divmod(index, self.PAGE_SIZE)
+        rows = self._pages.get(page)
+        if rows is None:
+            if page not in self._loading:
+                self._loading.add(page)
+                self.load_page(page)
+            return None
+        self._pages.move_to_end(page)
+        return rows[offset] if offset < len(rows) else None
+
+    @property
+    def selected_id(self) -> int | None:
+        row = self.get_row(self.cursor_row)
+        return None if row is None else row[0]
+
+    @trace.traced("fetch page")
+    def _fetch_page(
+        self,
+        page: int,
+        after_id: int | None,
+        before_id: int | None,
+        row_count: int,
+    ) -> list[tuple[int, str]]:
+        """Read one page of previews, seeking from a neighbour if we can.
+
+        Args:
+            page: The page to read.
+            after_id: The last id of the page before, if it is loaded.
+            before_id: The first id of the page after, if it is loaded.
+            row_count: How many banners there are.
+        """
+        list_previews = get_store().list_previews
+        if after_id is not None:
+            return list_previews(
+                self.PREVIEW_CHARS, after=after_id, limit=self.PAGE_SIZE
+            )
+        if before_id is not None:
+            return list_previews(
+                self.PREVIEW_CHARS, before=before_id, reverse=True,
+                limit=self.PAGE_SIZE,
+            )[::-1]
+        # Nothing to seek from, e.g. after a jump: count from whichever end
+        # is nearer, so that jumping to the end reads only the last page.
+        start = page * self.PAGE_SIZE
+        if start < row_count // 2:
+            return list_previews(
+                self.PREVIEW_CHARS, offset=start, limit=self.PAGE_SIZE
+            )
+        stop = min(start + self.PAGE_SIZE, row_count)
+        return list_previews(
+            self.PREVIEW_CHARS, reverse=True, offset=row_count - stop,
+            limit=stop - start,
+        )[::-1]
+
+    def _render_preview(self, markup: str) -> list[Strip]:
+        lines = markup.split("\n")[:self.PREVIEW_LINES]
+        return [
+            render_markup_line(key, self.app.console, self.highlighter)
+            for key in split_markup_lines("\n".join(lines))
+        ]
+
+    @work(group="banner_table_pages")
+    async def load_page(self, page: int) -> None:
+        generation = self._generation
+        # The loaded pages belong to the event loop, so the neighbours are
+        # looked up here and only their ids handed to the thread.
+        before = self._pages.get(page - 1)
+        after = self._pages.get(page + 1)
+        after_id = before[-1][0] if before else None
+        before_id = after[0][0] if after else None
+        row_count = self.row_count
+        store = get_store()
+
+        @trace.traced("parse page")
+        def parse(banners: list[tuple[int, str]]) -> list[Row]:
+            return [
+                (banner_id, self._render_preview(markup))
+                for banner_id, markup in banners
+            ]
+
+        def load() -> list[Row]:
+            with store.worker():
+                banners = self._fetch_page(page, after_id, before_id, row_count)
+            return parse(banners)
+
+        rows = await asyncio.to_thread(load)
+        if generation != self._generation:
+            return
+        self._loading.discard(page)
+        self._pages[page] = rows
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        self.refresh_lines(
+            page * self.PAGE_SIZE * self.ROW_HEIGHT - self.scroll_offset.y,
+            self.PAGE_SIZE * self.ROW_HEIGHT,
+        )
+
+    def render_line(self, y: int) -> Strip:
+        width = self.scrollable_content_region.width
+        index, line = divmod(self.scroll_offset.y + y, self.ROW_HEIGHT)
+        if index >= self.row_count or line >= self.PREVIEW_LINES:
+            return Strip.blank(width, self.rich_style)
+
+        style = self.rich_style
+        if index == self.cursor_row:
+            style += self.get_component_rich_style("banner-table--cursor")
+        # Clicks report the row they landed on through the style's meta.
+        style += Style(meta={"row": index})
+
+        row = self.get_row(index)
+        if row is None:
+            label = "…" if line == 0 else ""
+            preview = Strip([])
+        else:
+            label = f"#{row[0]}" if line == 0 else ""
+            previews = row[1]
+            preview = previews[line] if line < len(previews) else Strip([])
+
+        id_strip = Strip(
+            [Segment(
+                label.rjust(self.ID_WIDTH - 1) + " ",
+                self.get_component_rich_style("banner-table--id"),
+            )],
+            self.ID_WIDTH,
+        )
+        preview_width = max(width - self.ID_WIDTH, 0)
+        preview = preview.crop_extend(0, preview_width, None)
+        return Strip.join([id_strip, preview]).apply_style(style)
+
+    def _refresh_row(self, index: int) -> None:
+        self.refresh_lines(
+            index * self.ROW_HEIGHT - self.scroll_offset.y, self.ROW_HEIGHT
+        )
+
+    def watch_cursor_row(self, old_row: int, new_row: int) -> None:
+        self._refresh_row(old_row)
+        self._refresh_row(new_row)
+        self.scroll_to_region(
+            Region(0, new_row * self.ROW_HEIGHT, 1, self.ROW_HEIGHT),
+            animate=False,
+            force=True,
+        )
+
+    def action_move(self, rows: int) -> None:
+        if self.row_count:
+            self.cursor_row = min(max(self.cursor_row + rows, 0), self.row_count - 1)
+
+    def action_page(self, direction: int) -> None:
+        visible_rows = max(self.scrollable_content_region.height // self.ROW_HEIGHT, 1)
+        self.action_move(direction * visible_rows)
+
+    def action_first(self) -> None:
+        self.action_move(-self.row_count)
+
+    def action_last(self) -> None:
+        self.action_move(self.row_count)
+
+    def action_select(self) -> None:
+        banner_id = self.selected_id
+        if banner_id is not None:
+            self.post_message(self.Selected(self, banner_id))
+
+    def _on_click(self, event: events.Click) -> None:
+        row = event.style.meta.get("row")
+        if row is not None:
+            self.cursor_row = row
+            if event.chain > 1:
+                self.action_select()
@@ -0,0 +1,174 @@
+"""Provides a preview of Rich markup that only re-renders changed lines."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+
+from rich.console import Console
+from rich.errors import MarkupError
+from rich.highlighter import Highlighter, ReprHighlighter
+from rich.markup import RE_TAGS
+from rich.text import Text
+from textual import work
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+LineKey = tuple[tuple[str, ...], str]
+"""A line of markup and the tags left open by the lines before it."""
+
+
+def split_markup_lines(markup: str) -> list[LineKey]:
+    """Split markup into lines, noting the tags open at the start of each.
+
+    Rich tags may span lines, so a line can only be parsed on its own if the
+    tags still open from earlier lines are re-opened in front of it.
+    """
+    keys = []
+    stack: list[str] = []
+    for line in markup.split("\n"):
+        keys.append((tuple(stack), line))
+        for match in RE_TAGS.finditer(line):
+            _, backslashes, tag = match.groups()
+            if len(backslashes) % 2:
+                continue  # An escaped tag.
+            if tag.startswith("/"):
+                name = tag[1:].strip()
+                if not name:
+                    if stack:
+                        stack.pop()
+                else:
+                    # Like Rich, close the most recent tag with that name.
+                    for index in range(len(stack) - 1, -1, -1):
+                        if stack[index].split("=", 1)[0].strip() == name:
+                            del stack[index]
+                            break
+            else:
+                stack.append(tag)
+    return keys
+
+
+def render_markup_line(
+    key: LineKey,
+    console: Console,
+    highlighter: Highlighter,
+) -> Strip:
+    """Parse and render one line of markup, as `split_markup_lines` keyed it."""
+    open_tags, line = key
+    try:
+        text = Text.from_markup("".join(f"[{tag}]" for tag in open_tags) + line)
+    except MarkupError:
+        text = Text(line)
+    text = highlighter(text)
+    segments = [
+        segment for segment in text.render(console) if segment.text != "\n"
+    ]
+    return Strip(segments, text.cell_len)
+
+
+class MarkupPreview(ScrollView, can_focus=True):
+    """Shows Rich markup, re-rendering only the lines that change.
+
+    Each line is parsed on its own, together with any tags still open from
+    the lines above, and the rendered result is cached per line. Updates
+    are debounced and parsed in a worker so typing never waits for them.
+    """
+
+    DEFAULT_CSS = """
+    MarkupPreview {
+        background: $surface;
+    }
+    """
+
+    DEBOUNCE = 0.05
+    """Seconds to wait for typing to pause before updating."""
+
+    CACHE_SIZE = 4096
+    """How many rendered lines to keep."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.highlighter: Highlighter = ReprHighlighter()
+        self._keys: list[LineKey] = []
+        self._strips: list[Strip] = []
+        self._cache: OrderedDict[LineKey, Strip] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.update_times: deque[float] = deque(maxlen=100)
+        """Seconds from each update request to the preview showing it."""
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.scrollable_content_region.width
+        if index >= len(self._strips):
+            return Strip.blank(width, self.rich_style)
+        return self._strips[index].crop_extend(
+            scroll_x, scroll_x + width, self.rich_style
+        ).apply_style(self.rich_style)
+
+    def _render_lines(self, markup: str) -> list[LineKey]:
+        """Split markup and render the lines missing from the cache.
+
+        Runs in a thread. Rendered lines go straight into the cache, so the
+        work is kept even if a newer update cancels this one.
+        """
+        console = self.app.console
+        keys = split_markup_lines(markup)
+        for key in dict.fromkeys(keys):
+            if key not in self._cache:
+                strip = render_markup_line(key, console, self.highlighter)
+                with self._cache_lock:
+                    self._cache[key] = strip
+        return keys
+
+    def _apply(self, keys: list[LineKey]) -> None:
+        strips = []
+        with self._cache_lock:
+            for key in keys:
+                self._cache.move_to_end(key)
+                strips.append(self._cache[key])
+            while len(self._cache) > max(self.CACHE_SIZE, len(keys)):
+                self._cache.popitem(last=False)
+
+        # Only the lines between the common prefix and the common suffix of
+        # the old and new text need repainting.
+        old_keys = self._keys
+        start = 0
+        limit = min(len(old_keys), len(keys))
+        while start < limit and old_keys[start] == keys[start]:
+            start += 1
+        end_old, end_new = len(old_keys), len(keys)
+        while (
+            end_old > start and end_new > start
+            and old_keys[end_old - 1] == keys[end_new - 1]
+        ):
+            end_old -= 1
+            end_new -= 1
+
+        self._keys = keys
+        self._strips = strips
+        self.virtual_size = Size(
+            max((strip.cell_length for strip in strips), default=0),
+            len(strips),
+        )
+        if end_old != end_new:
+            # Lines were added or removed, so everything below moved.
+            end_new = max(len(old_keys), len(keys))
+        if end_new > start:
+            scroll_y = self.scroll_offset.y
+            self.refresh_lines(start - scroll_y, end_new - start)
+
+    def update_markup(self, markup: str, debounce: bool = True) -> None:
+        """Show new markup, in the background."""
+        self._update(markup, time.perf_counter(), debounce)
+
+    @work(exclusive=True, group="markup_preview")
+    async def _update(self, markup: str, requested_at: float, debounce: bool) -> None:
+        if debounce:
+            await asyncio.sleep(self.DEBOUNCE)
+        keys = await asyncio.to_thread(self._render_lines, markup)
+        self._apply(keys)
+        self.update_times.append(time.perf_counter() - requested_at)
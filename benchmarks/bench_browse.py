@@ -0,0 +1,114 @@
+"""Measure scrolling through the BrowseBanners screen, headless.
+
+Runs the TUI with Textual's test pilot against temporary libraries of
+increasing size, pages through the list and jumps to its end and back,
+timing each step until the visible rows are loaded. Both the time per
+step and the number of rows held in memory should depend on the size of
+the viewport, not the size of the library: the script fails if the median
+step on the largest library takes over `FLAT_FACTOR` times as long as on
+the smallest, or if more rows are held than the table means to keep.
+
+Usage::
+
+    python benchmarks/bench_browse.py [--rows 1000 100000] [--steps 100]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banner.app.app import BannerApp  # noqa: E402
+from banner.app.cli import get_args  # noqa: E402
+from banner.models import app_db, Banner  # noqa: E402
+from banner.ui.screens import BrowseBanners  # noqa: E402
+from banner.ui.widgets import BannerTable  # noqa: E402
+
+CONTENT = "[bold cyan]Hello[/], World!\n" * 40
+
+FLAT_FACTOR = 3.0
+"""How much slower a step may be on the largest library than the smallest."""
+
+
+def build_library(rows: int) -> None:
+    app_db.create_tables([Banner])
+    with app_db.atomic():
+        for start in range(0, rows, 10_000):
+            Banner.insert_many(
+                [(f"{i}\n{CONTENT}",) for i in range(start, min(rows, start + 10_000))],
+                fields=[Banner.content],
+            ).execute()
+
+
+async def loaded(pilot, table: BannerTable) -> None:
+    """Wait until every visible row has been fetched."""
+    await pilot.pause()
+    first = table.scroll_offset.y // table.ROW_HEIGHT
+    visible = table.scrollable_content_region.height // table.ROW_HEIGHT
+    for index in range(first, min(first + visible, table.row_count)):
+        while table.get_row(index) is None:
+            await asyncio.sleep(0.001)
+
+
+async def measure(steps: int) -> tuple[list, int, int]:
+    app = BannerApp(get_args([]))
+    timings = []
+    held = 0
+    async with app.run_test(size=(100, 40)) as pilot:
+        await pilot.pause()
+        app.push_screen(BrowseBanners())
+        await pilot.pause()
+        table = app.screen.query_one(BannerTable)
+        await loaded(pilot, table)
+        keys = ["pagedown"] * (steps // 2) + ["end", "home"] + ["pageup"] * 2
+        keys += ["end"] + ["pageup"] * (steps // 2)
+        for key in keys:
+            start = time.perf_counter()
+            await pilot.press(key)
+            await loaded(pilot, table)
+            timings.append(time.perf_counter() - start)
+            held = max(held, sum(len(rows) for rows in table._pages.values()))
+        limit = table.max_pages * table.PAGE_SIZE
+    return timings, held, limit
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--steps", type=int, default=100)
+    args = parser.parse_args()
+
+    medians = []
+    failed = False
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            app_db.init(str(Path(tmp) / "bench.db"), pragmas={"journal_mode": "wal"})
+            app_db.connect()
+            build_library(rows)
+            timings, held, limit = asyncio.run(measure(args.steps))
+            app_db.close()
+        medians.append(statistics.median(timings))
+        print(
+            f"{rows:>8} banners: median {medians[-1] * 1000:6.2f}ms, "
+            f"max {max(timings) * 1000:6.2f}ms per step, "
+            f"at most {held} rows held"
+        )
+        if held > limit:
+            print(f"  FAIL: held more than {limit} rows")
+            failed = True
+    if medians[-1] > FLAT_FACTOR * medians[0]:
+        print(
+            f"FAIL: a step takes {medians[-1] / medians[0]:.1f}x as long on the "
+            f"largest library as on the smallest (at most {FLAT_FACTOR:g}x)"
+        )
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Cold start benchmark for opening the library.
+
+Builds a library in a throwaway home directory, then times, in a fresh
+process each run, what the read commands pay before reading a banner:
+opening the store read-only, opening it for writing with an up to date
+schema, and opening it for writing when the schema has to be set up
+again (as every command did before the schema was versioned). It also
+reports the wall time of ``banner show`` and ``banner search``. The script
+fails if opening an up to date library, read-only or for writing, is not
+faster than setting the schema up again.
+
+Usage::
+
+    python benchmarks/bench_cold_start.py [--rows 10000] [--runs 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+OPEN = """
+import sqlite3, sys, time
+from banner.storage import SqliteStore
+if sys.argv[2] == "unversioned":
+    connection = sqlite3.connect(sys.argv[1])
+    connection.execute("PRAGMA user_version = 0")
+    connection.close()
+store = SqliteStore(sys.argv[1], read_only=sys.argv[2] == "read-only")
+start = time.perf_counter()
+store.open()
+store.get(1)
+print(time.perf_counter() - start)
+store.close()
+"""
+"""Run in a fresh process: open the store and read a banner."""
+
+COMMANDS = (
+    ["show", "random"],
+    ["show", "1"],
+    ["search", "python"],
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, PYTHONPATH=str(ROOT))
+        env.pop("BANNER_STORE", None)
+        db_path = Path(home) / ".banner" / "app.db"
+
+        sys.path.insert(0, str(ROOT))
+        from banner.storage import SqliteStore
+
+        rng = random.Random(42)
+        words = ["hello", "world", "banner", "python", "shell", "ascii"]
+        with SqliteStore(db_path) as store:
+            for start in range(0, args.rows, 500):
+                store.add_many([
+                    {"content": " ".join(rng.choice(words) for _ in range(40))}
+                    for _ in range(min(500, args.rows - start))
+                ])
+
+        def open_time(mode: str) -> float:
+            result = subprocess.run(
+                [sys.executable, "-c", OPEN, str(db_path), mode],
+                env=env, check=True, capture_output=True, text=True,
+            )
+            return float(result.stdout)
+
+        print(f"{args.rows} banners, median of {args.runs} fresh processes")
+        medians = {}
+        for mode in ("read-only", "read-write", "unversioned"):
+            medians[mode] = statistics.median(open_time(mode) for _ in range(args.runs))
+            print(f"open {mode:<28}{medians[mode] * 1000:8.2f}ms")
+
+        for command in COMMANDS:
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, "-m", "banner", *command],
+                    env=env, check=True, stdout=subprocess.DEVNULL, cwd=home,
+                )
+                timings.append(time.perf_counter() - start)
+            print(
+                f"banner {' '.join(command):<26}"
+                f"{statistics.median(timings) * 1000:8.2f}ms wall"
+            )
+
+    failed = False
+    for mode in ("read-only", "read-write"):
+        if medians[mode] >= medians["unversioned"]:
+            print(f"FAIL: open {mode} is no faster than setting up the schema")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Compare database size and throughput with banner compression off and on.
+
+Generates a library of ASCII art banners, each with a marked up copy, and
+writes it to temporary databases without compression, with plain zlib and
+with zlib and a dictionary trained on the library. For each it reports
+the database size and how fast banners are written and read back, and
+for the trained dictionary also how long ``banner compress`` takes on the
+uncompressed library. The script fails if compression does not make the
+database smaller, or if the trained dictionary does no better than plain
+zlib.
+
+Usage::
+
+    python benchmarks/bench_compression.py [--rows 5000]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from art import text2art  # noqa: E402
+
+from banner.models import (  # noqa: E402
+    app_db,
+    codec,
+    train_dictionary,
+    Banner,
+    BannerSearch,
+    CompressionDictionary,
+)
+from banner.models.migrations import compress_library, database_size  # noqa: E402
+
+FONTS = ["standard", "block", "big", "doom", "slant", "banner3", "colossal", "starwars"]
+COLOURS = ["red", "green", "blue", "magenta", "cyan", "yellow", "bold white"]
+WORDS = ["hello", "world", "banner", "terminal", "python", "shell", "prompt", "ascii"]
+
+
+def make_banners(rows: int) -> list[dict]:
+    rng = random.Random(42)
+    banners = []
+    for index in range(rows):
+        text = f"{rng.choice(WORDS)} {index}"
+        content = text2art(text, font=rng.choice(FONTS))
+        colour = rng.choice(COLOURS)
+        marked_up = "\n".join(
+            f"[{colour}]{line}[/{colour}]" for line in content.split("\n")
+        )
+        banners.append({"content": content, "markedUp": marked_up})
+    return banners
+
+
+def setup(path: Path, level: int | None, samples: list[str]) -> None:
+    app_db.init(str(path), pragmas={"journal_mode": "wal"})
+    app_db.connect()
+    app_db.create_tables([Banner, CompressionDictionary])
+    BannerSearch.install(compressed=level is not None)
+    if level is not None:
+        CompressionDictionary.create(data=train_dictionary(samples), level=level)
+    codec.reset()
+
+
+def write(banners: list[dict]) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(banners), 500):
+        Banner.insert_batch([dict(row) for row in banners[offset:offset + 500]])
+    return time.perf_counter() - start
+
+
+def read() -> float:
+    start = time.perf_counter()
+    for _content, _marked_up in Banner.select(
+        Banner.content, Banner.markedUp
+    ).tuples().iterator():
+        pass
+    return time.perf_counter() - start
+
+
+def report(label: str, rows: int, write_time: float, read_time: float) -> int:
+    app_db.execute_sql("VACUUM")
+    size = database_size()
+    print(
+        f"{label:<22} {size / 1024 / 1024:8.2f} MiB, "
+        f"write {rows / write_time:8.0f} banners/s, "
+        f"read {rows / read_time:9.0f} banners/s"
+    )
+    return size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--level", type=int, default=6)
+    args = parser.parse_args()
+
+    banners = make_banners(args.rows)
+    raw_size = sum(
+        len(row["content"].encode()) + len(row["markedUp"].encode()) for row in banners
+    )
+    print(f"{args.rows} banners, {raw_size / 1024 / 1024:.2f} MiB of text")
+    samples = [text for row in banners[:2000] for text in row.values()]
+
+    modes = {
+        "uncompressed": None,
+        "zlib": "plain",
+        "zlib + dictionary": "trained",
+    }
+    sizes = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, mode in modes.items():
+            setup(
+                Path(tmp) / f"{label}.db",
+                None if mode is None else args.level,
+                samples if mode == "trained" else [],
+            )
+            write_time = write(banners)
+            read_time = read()
+            sizes[label] = report(label, args.rows, write_time, read_time)
+            app_db.close()
+
+        # The offline migration on a library written without compression.
+        app_db.init(str(Path(tmp) / "uncompressed.db"), pragmas={"journal_mode": "wal"})
+        app_db.connect()
+        codec.reset()
+        start = time.perf_counter()
+        num_banners, before, after = compress_library(level=args.level)
+        elapsed = time.perf_counter() - start
+        print(
+            f"banner compress: {num_banners} banners in {elapsed:.2f}s, "
+            f"{before / 1024 / 1024:.2f} MiB -> {after / 1024 / 1024:.2f} MiB"
+        )
+        app_db.close()
+
+    failed = False
+    if not sizes["zlib"] < sizes["uncompressed"]:
+        print("FAIL: zlib does not make the database smaller")
+        failed = True
+    if not sizes["zlib + dictionary"] < sizes["zlib"]:
+        print("FAIL: the trained dictionary does no better than plain zlib")
+        failed = True
+    if not after < before:
+        print("FAIL: banner compress did not make the database smaller")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
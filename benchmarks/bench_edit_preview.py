@@ -0,0 +1,141 @@
+"""Measure frame time while typing into a large banner in EditBanner, headless.
+
+Opens the edit screen on a banner with many lines of truecolor markup and
+types into it with Textual's test pilot. A ticker on the event loop
+measures the frame time, i.e. how long the UI goes without being able to
+respond, and the preview reports how long it takes to catch up after each
+key. The preview is parsed in the background and only changed lines
+re-render, so frames should stay short however large the banner is: the
+script fails if the p95 frame time exceeds `FRAME_BUDGET`, if the median
+preview update exceeds `PREVIEW_BUDGET`, or if the preview never updates.
+
+Usage::
+
+    python benchmarks/bench_edit_preview.py [--lines 300] [--keys 100]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from textual.events import Key  # noqa: E402
+
+from banner.app.app import BannerApp  # noqa: E402
+from banner.app.cli import get_args  # noqa: E402
+from banner.models import app_db, Banner  # noqa: E402
+from banner.ui.screens import EditBanner  # noqa: E402
+from banner.ui.widgets import MarkupPreview  # noqa: E402
+
+
+def large_markup(lines: int) -> str:
+    rows = []
+    for y in range(lines):
+        cells = "".join(
+            f"[#{(x * 8) % 256:02x}{(y * 4) % 256:02x}{(x * y) % 256:02x}]█[/]"
+            for x in range(32)
+        )
+        rows.append(f"[bold]{cells}[/bold] line {y}")
+    return "\n".join(rows)
+
+
+def percentile(values: list, fraction: float) -> float:
+    return sorted(values)[int(len(values) * fraction)]
+
+
+TICK = 0.005
+
+FRAME_BUDGET = 0.05
+"""Longest the UI may go without responding, at the 95th percentile."""
+
+PREVIEW_BUDGET = 1.0
+"""Longest the preview may take to catch up with a key, at the median."""
+
+
+async def tick(frame_times: list) -> None:
+    """Record how late the event loop runs a task that wants to run every tick."""
+    last = time.perf_counter()
+    while True:
+        await asyncio.sleep(TICK)
+        now = time.perf_counter()
+        frame_times.append(now - last)
+        last = now
+
+
+async def measure(banner_id: int, keys: int, interval: float):
+    app = BannerApp(get_args([]))
+    frame_times = []
+    async with app.run_test(size=(120, 50)) as pilot:
+        await pilot.pause()
+        app.push_screen(EditBanner(banner_id))
+        await pilot.pause(0.5)
+        screen = app.screen
+        assert isinstance(screen, EditBanner)
+        preview = screen.query_one(MarkupPreview)
+        screen.action_show_tab("edit_tab")
+        screen.query_one("#edit_textarea").focus()
+        await pilot.pause()
+        ticker = asyncio.create_task(tick(frame_times))
+        for index in range(keys):
+            # Post the keys directly rather than with `pilot.press`, which
+            # waits for the whole process to go idle after each one.
+            app.post_message(Key("enter", None) if index % 20 == 19 else Key("x", "x"))
+            await asyncio.sleep(interval)
+        await pilot.pause(0.5)
+        ticker.cancel()
+        update_times = list(preview.update_times)
+    return frame_times, update_times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument(
+        "--interval", type=float, default=0.05,
+        help="seconds between key presses",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_db.init(str(Path(tmp) / "bench.db"), pragmas={"journal_mode": "wal"})
+        app_db.connect()
+        app_db.create_tables([Banner])
+        # Main shows the first banner, so keep that one small.
+        Banner.create(content="Hello, World!")
+        banner = Banner.create(content=large_markup(args.lines))
+        frame_times, update_times = asyncio.run(
+            measure(banner.id, args.keys, args.interval)
+        )
+        app_db.close()
+
+    print(
+        f"frame:     median {statistics.median(frame_times) * 1000:6.2f}ms, "
+        f"p95 {percentile(frame_times, 0.95) * 1000:6.2f}ms, "
+        f"max {max(frame_times) * 1000:6.2f}ms"
+    )
+    failed = False
+    if percentile(frame_times, 0.95) > FRAME_BUDGET:
+        print(f"FAIL: p95 frame time over {FRAME_BUDGET * 1000:g}ms")
+        failed = True
+    if not update_times:
+        print("FAIL: the preview never updated")
+        return 1
+    print(
+        f"preview:   median {statistics.median(update_times) * 1000:6.2f}ms, "
+        f"p95 {percentile(update_times, 0.95) * 1000:6.2f}ms "
+        f"({len(update_times)} updates for {args.keys} keys)"
+    )
+    if statistics.median(update_times) > PREVIEW_BUDGET:
+        print(f"FAIL: median preview update over {PREVIEW_BUDGET * 1000:g}ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Measure export time and peak memory as the library grows.
+
+Each export target is run against temporary libraries of increasing size;
+peak Python memory (from tracemalloc) should stay flat while time grows
+linearly. The script fails if an export's peak memory on the largest
+library is over `PEAK_FACTOR` times that on the smallest, apart from the
+`ENTRY_BYTES` a zip archive holds for each banner in its central directory
+until it is closed.
+
+Usage::
+
+    python benchmarks/bench_export.py [--rows 10000 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banner.app.cli import get_args  # noqa: E402
+from banner.app.commands import export_banners  # noqa: E402
+from banner.models import app_db, Banner  # noqa: E402
+
+CONTENT = "[bold magenta]Hello[/], World!\n" * 12
+
+PEAK_FACTOR = 2.0
+"""How much more memory an export may use on the largest library than the smallest."""
+
+ENTRY_BYTES = {"zip": 1024}
+"""Memory an export may hold per banner exported, on top of `PEAK_FACTOR`."""
+
+TARGETS = {
+    "single file": ["export", "--single-file"],
+    "gzip": ["export", "--gzip"],
+    "tar.gz": ["export", "--archive", "tar.gz"],
+    "zip": ["export", "--archive", "zip"],
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    peaks = {}
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            app_db.init(str(Path(tmp) / "bench.db"))
+            app_db.connect()
+            app_db.create_tables([Banner])
+            with app_db.atomic():
+                for start in range(0, rows, 10_000):
+                    Banner.insert_many(
+                        [(f"{CONTENT}{i}",) for i in range(start, min(rows, start + 10_000))],
+                        fields=[Banner.content],
+                    ).execute()
+
+            for label, argv in TARGETS.items():
+                out = str(Path(tmp) / label.replace(" ", "_"))
+                export_args = get_args(argv + [out])
+                stdout = sys.stdout
+                sys.stdout = open(os.devnull, "w")
+                tracemalloc.start()
+                start = time.perf_counter()
+                try:
+                    export_banners(export_args)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    sys.stdout.close()
+                    sys.stdout = stdout
+                print(
+                    f"{rows:>8} banners, {label:<12} {elapsed:6.2f}s, "
+                    f"peak {peak / 1024 / 1024:6.1f} MiB"
+                )
+                peaks.setdefault(label, []).append((rows, peak))
+            app_db.close()
+
+    failed = False
+    for label, target_peaks in peaks.items():
+        (_, smallest), (rows, largest) = target_peaks[0], target_peaks[-1]
+        if largest > PEAK_FACTOR * smallest + ENTRY_BYTES.get(label, 0) * rows:
+            print(
+                f"FAIL: {label} peaks at {largest / smallest:.1f}x the memory "
+                f"on the largest library (at most {PEAK_FACTOR:g}x)"
+            )
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
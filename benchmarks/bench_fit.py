@@ -0,0 +1,142 @@
+"""Compare ``Banner.random`` with a size limit against measuring every banner.
+
+Builds a temporary library of banners of assorted sizes, with their size
+columns filled in the way ``BannerWriter`` fills them, then times picking a
+random banner that fits an 80x24 terminal through the indexed columns
+against loading and measuring the content of every row. It then checks
+that the pick stays uniform on a library where the fitting banners come
+in runs, as a bulk import leaves them. The script fails if the indexed
+pick is not at least `MIN_SPEEDUP` times faster, or if the chi-squared
+statistic exceeds `MAX_CHI2_PER_DOF` times its degrees of freedom.
+
+Usage::
+
+    python benchmarks/bench_fit.py [--rows 100000] [--fitting 0.1]
+"""
+
+import argparse
+import collections
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banner.models import app_db, Banner  # noqa: E402
+
+COLUMNS, LINES = 80, 24
+
+MIN_SPEEDUP = 10
+
+MAX_CHI2_PER_DOF = 2.5
+"""Far above the 1 expected of a uniform pick, and far below a biased one."""
+
+
+def build_library(rows: int, fitting: float) -> None:
+    app_db.create_tables([Banner])
+    rng = random.Random(42)
+    batch = []
+    with app_db.atomic():
+        for index in range(rows):
+            if rng.random() < fitting:
+                width, height = rng.randint(10, COLUMNS), rng.randint(1, LINES - 1)
+            else:
+                width, height = rng.randint(COLUMNS + 1, 200), rng.randint(1, 60)
+            content = "\n".join(f"{index:<{width}}"[:width] for _ in range(height))
+            batch.append({"content": content})
+            if len(batch) == 1000:
+                Banner.insert_batch(batch)
+                batch = []
+        Banner.insert_batch(batch)
+
+
+def build_runs(runs: list[tuple[int, int]]) -> None:
+    """Add runs of ``(count, width)`` banners of one width each."""
+    batch = []
+    for run, (count, width) in enumerate(runs):
+        batch.extend(
+            {"content": f"{run}-{index}".ljust(width, "x")} for index in range(count)
+        )
+    Banner.insert_batch(batch)
+
+
+def chi_squared(draws: int) -> tuple[float, int]:
+    """Pick `draws` fitting banners and measure how far from uniform they are."""
+    ids = [
+        banner_id for banner_id, in Banner.select(Banner.id)
+        .where(*Banner.fits(COLUMNS, LINES - 1)).tuples()
+    ]
+    counts = collections.Counter(
+        Banner.random(max_width=COLUMNS, max_height=LINES - 1).id
+        for _ in range(draws)
+    )
+    expected = draws / len(ids)
+    return sum((counts[i] - expected) ** 2 / expected for i in ids), len(ids) - 1
+
+
+def measure_all() -> Banner | None:
+    fitting = [
+        banner_id
+        for banner_id, content, marked_up in Banner.select(
+            Banner.id, Banner.content, Banner.markedUp
+        ).tuples().iterator()
+        if (lambda size: size[0] <= COLUMNS and size[1] <= LINES - 1)(
+            Banner.dimensions(content, marked_up)
+        )
+    ]
+    return Banner.get_or_none(Banner.id == random.choice(fitting)) if fitting else None
+
+
+def time_it(label: str, pick, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        banner = pick()
+        assert banner is not None and banner.width <= COLUMNS
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<28} {elapsed * 1000:10.3f}ms per pick")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--fitting", type=float, default=0.1,
+        help="share of the banners that fit the terminal",
+    )
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_db.init(str(Path(tmp) / "bench.db"), pragmas={"journal_mode": "wal"})
+        app_db.connect()
+        build_library(args.rows, args.fitting)
+        indexed = time_it(
+            "Banner.random(80, 23)",
+            lambda: Banner.random(max_width=COLUMNS, max_height=LINES - 1),
+            args.repeat,
+        )
+        measured = time_it("measure every banner", measure_all, 1)
+        print(f"speedup: {measured / indexed:.0f}x")
+
+        # Two runs of narrow banners, each after a long run of wide ones.
+        Banner.delete().execute()
+        build_runs([(1000, 200), (10, 10), (1000, 200), (10, 10)])
+        chi2, dof = chi_squared(4000)
+        print(f"uniformity: chi^2 = {chi2:.1f} over {dof} dof")
+        app_db.close()
+
+    failed = False
+    if measured / indexed < MIN_SPEEDUP:
+        print(f"FAIL: the indexed pick is less than {MIN_SPEEDUP}x faster")
+        failed = True
+    if chi2 > MAX_CHI2_PER_DOF * dof:
+        print(f"FAIL: chi^2 over {MAX_CHI2_PER_DOF:g}x the degrees of freedom")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
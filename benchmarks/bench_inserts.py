@@ -0,0 +1,75 @@
+"""Compare per-row ``Banner.create`` with batched ``BannerWriter`` inserts.
+
+Each run writes into a fresh WAL database in a temporary directory, so the
+per-row variant pays one commit (and fsync) per banner, as ``banner add``
+used to. The script fails if batching is not at least `MIN_SPEEDUP` times
+faster.
+
+Usage::
+
+    python benchmarks/bench_inserts.py [--rows 10000 100000] [--batch-size 500]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banner.app.app import BannerWriter  # noqa: E402
+from banner.models import app_db, Banner  # noqa: E402
+
+CONTENT = "[bold]Hello[/], World!\n" * 12
+
+MIN_SPEEDUP = 1.5
+
+
+def per_row(rows: int, batch_size: int) -> None:
+    for i in range(rows):
+        Banner.create(content=f"{CONTENT}{i}")
+
+
+def batched(rows: int, batch_size: int) -> None:
+    with BannerWriter(batch_size) as writer:
+        for i in range(rows):
+            writer.add(f"{CONTENT}{i}")
+
+
+def run(strategy, rows: int, batch_size: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        app_db.init(str(Path(tmp) / "bench.db"), pragmas={"journal_mode": "wal"})
+        app_db.connect()
+        app_db.create_tables([Banner])
+        start = time.perf_counter()
+        strategy(rows, batch_size)
+        elapsed = time.perf_counter() - start
+        assert Banner.select().count() == rows
+        app_db.close()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    failed = False
+    for rows in args.rows:
+        before = run(per_row, rows, args.batch_size)
+        after = run(batched, rows, args.batch_size)
+        print(
+            f"{rows:>8} rows: per-row {before:8.2f}s "
+            f"({rows / before:9.0f}/s), batched {after:6.2f}s "
+            f"({rows / after:9.0f}/s), {before / after:.0f}x"
+        )
+        if before / after < MIN_SPEEDUP:
+            print(f"  FAIL: batching is less than {MIN_SPEEDUP:g}x faster")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Measure carousel navigation latency in the Main screen, headless.
+
+Runs the TUI with Textual's test pilot against temporary libraries of
+increasing size and times next/previous navigation, including the preview
+update. With keyset navigation the latency should stay flat as the
+library grows: the script fails if the median navigation on the largest
+library takes over `FLAT_FACTOR` times as long as on the smallest.
+
+Usage::
+
+    python benchmarks/bench_navigation.py [--rows 10 1000 100000] [--steps 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banner.app.app import BannerApp  # noqa: E402
+from banner.app.cli import get_args  # noqa: E402
+from banner.models import app_db, Banner  # noqa: E402
+from banner.ui.screens import Main  # noqa: E402
+
+CONTENT = "[bold cyan]Hello[/], World!\n" * 12
+
+FLAT_FACTOR = 3.0
+"""How much slower navigation may be on the largest library than the smallest."""
+
+
+def build_library(rows: int) -> None:
+    app_db.create_tables([Banner])
+    with app_db.atomic():
+        for start in range(0, rows, 10_000):
+            Banner.insert_many(
+                [(f"{CONTENT}{i}",) for i in range(start, min(rows, start + 10_000))],
+                fields=[Banner.content],
+            ).execute()
+
+
+async def measure(steps: int, settle: float) -> list:
+    app = BannerApp(get_args([]))
+    timings = []
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, Main)
+        # Start at the end of the library, where OFFSET scans were slowest,
+        # so navigation also exercises the wraparound.
+        screen.go_to_last()
+        for step in range(steps):
+            navigate = screen.go_to_next if step % 3 else screen.go_to_previous
+            start = time.perf_counter()
+            navigate()
+            timings.append(time.perf_counter() - start)
+            # Give the neighbour prefetch a chance to run, as a key repeat
+            # would.
+            await pilot.pause(settle)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument(
+        "--settle", type=float, default=0.03,
+        help="seconds to wait between key presses",
+    )
+    args = parser.parse_args()
+
+    medians = []
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            app_db.init(str(Path(tmp) / "bench.db"), pragmas={"journal_mode": "wal"})
+            app_db.connect()
+            build_library(rows)
+            timings = asyncio.run(measure(args.steps, args.settle))
+            app_db.close()
+        medians.append(statistics.median(timings))
+        print(
+            f"{rows:>8} banners: median {medians[-1] * 1000:6.2f}ms, "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95)] * 1000:6.2f}ms "
+            f"per navigation"
+        )
+    if medians[-1] > FLAT_FACTOR * medians[0]:
+        print(
+            f"FAIL: navigation takes {medians[-1] / medians[0]:.1f}x as long on the "
+            f"largest library as on the smallest (at most {FLAT_FACTOR:g}x)"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
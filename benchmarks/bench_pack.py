@@ -0,0 +1,170 @@
+"""Compare showing a banner from a pack with showing it from the library.
+
+Builds a library in a temporary home directory, exports it with
+``banner export --pack --ansi``, then times reading one banner from the
+pack against reading it from the store, both in process and as the wall
+time of ``banner show``, writing to a pipe and to a terminal the way a
+shell startup file runs it. The script fails if the pack is slower than
+the library at anything.
+
+Usage::
+
+    python benchmarks/bench_pack.py [--rows 100000] [--repeat 2000] [--runs 20]
+"""
+
+import argparse
+import os
+import pty
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from banner.app.pack import BannerPack  # noqa: E402
+from banner.storage import SqliteStore  # noqa: E402
+
+WORDS = ["hello", "world", "banner", "terminal", "python", "shell", "prompt", "ascii"]
+
+
+def make_rows(rows: int) -> list[dict]:
+    rng = random.Random(42)
+    banners = []
+    for index in range(rows):
+        width, height = rng.randint(10, 160), rng.randint(1, 40)
+        line = " ".join(rng.choice(WORDS) for _ in range(width // 6))
+        content = "\n".join(f"{index} {line}"[:width] for _ in range(height))
+        marked_up = f"[bold cyan]{content}[/]" if index % 3 == 0 else None
+        banners.append({"content": content, "markedUp": marked_up})
+    return banners
+
+
+def timed(operation, repeat: int = 1) -> float:
+    """The median seconds `operation` takes over `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20, help="Runs of 'banner show' to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, PYTHONPATH=str(ROOT))
+        env.pop("BANNER_STORE", None)
+        db_path = Path(home) / ".banner" / "app.db"
+        db_path.parent.mkdir()
+        pack_path = str(Path(home) / "banners.pack")
+
+        store = SqliteStore(db_path)
+        store.open()
+        rows = make_rows(args.rows)
+        for start in range(0, len(rows), 500):
+            store.add_many(rows[start:start + 500])
+
+        def cli(*argv: str) -> None:
+            subprocess.run(
+                [sys.executable, "-m", "banner", *argv], env=env, check=True,
+                stdout=subprocess.DEVNULL,
+            )
+
+        def cli_terminal(*argv: str) -> None:
+            """Run ``banner`` with its output going to a pseudo-terminal."""
+            master, slave = pty.openpty()
+
+            def drain() -> None:
+                try:
+                    while os.read(master, 65536):
+                        pass
+                except OSError:
+                    pass  # The terminal was closed.
+
+            reader = threading.Thread(target=drain)
+            reader.start()
+            try:
+                subprocess.run(
+                    [sys.executable, "-m", "banner", *argv], env=env, check=True,
+                    stdout=slave,
+                )
+            finally:
+                os.close(slave)
+                reader.join()
+                os.close(master)
+
+        start = time.perf_counter()
+        cli("export", "--pack", pack_path, "--ansi")
+        export_time = time.perf_counter() - start
+        ids = [banner.id for banner in store.list_banners()]
+
+        pack = BannerPack(pack_path)
+        results = {
+            "random": (
+                timed(store.random, args.repeat),
+                timed(lambda: pack.ansi(pack.random()), args.repeat),
+            ),
+            "random 80x23": (
+                timed(lambda: store.random(80, 23), args.repeat),
+                timed(lambda: pack.ansi(pack.random(80, 23)), args.repeat),
+            ),
+            "by id": (
+                timed(lambda: store.get(random.choice(ids)), args.repeat),
+                timed(lambda: pack.ansi(pack.find(random.choice(ids))), args.repeat),
+            ),
+        }
+        pack.close()
+        store.close()
+
+        def open_store() -> None:
+            with SqliteStore(db_path):
+                pass
+
+        results["open"] = (
+            timed(open_store, 20),
+            timed(lambda: BannerPack(pack_path).close(), args.repeat),
+        )
+        # Output goes to a pipe, so the pack's ANSI output is not used and
+        # both render with Rich: this is the slowest case for the pack.
+        results["banner show random (wall)"] = (
+            timed(lambda: cli("show", "random"), args.runs),
+            timed(lambda: cli("show", "--pack", pack_path, "random"), args.runs),
+        )
+        # To a terminal the pack's ANSI output is written as it is.
+        results["... to a terminal (wall)"] = (
+            timed(lambda: cli_terminal("show", "random"), args.runs),
+            timed(
+                lambda: cli_terminal("show", "--pack", pack_path, "random"),
+                args.runs,
+            ),
+        )
+
+    print(
+        f"{args.rows} banners, pack of {Path(pack_path).name} exported in "
+        f"{export_time:.1f}s; median time per operation"
+    )
+    print(f"{'':<28}{'library':>12}{'pack':>12}")
+    for operation, (library, packed) in results.items():
+        print(f"{operation:<28}{library * 1000:10.3f}ms{packed * 1000:10.3f}ms")
+
+    slower = [
+        operation for operation, (library, packed) in results.items() if packed >= library
+    ]
+    for operation in slower:
+        print(f"FAIL: {operation} is no faster from the pack")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
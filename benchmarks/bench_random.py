@@ -0,0 +1,102 @@
+"""Compare ``Banner.random`` against ``ORDER BY RANDOM()``.
+
+Builds a temporary library, deletes a share of the rows to leave holes in the
+id sequence, then times both strategies and checks that ``Banner.random``
+stays uniform over the surviving ids. The script fails if
+``Banner.random`` is not faster, or if the chi-squared statistic exceeds
+`MAX_CHI2_PER_DOF` times its degrees of freedom.
+
+Usage::
+
+    python benchmarks/bench_random.py [--rows 1000000] [--holes 0.3]
+"""
+
+import argparse
+import collections
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from peewee import fn  # noqa: E402
+
+from banner.models import app_db, Banner  # noqa: E402
+
+MAX_CHI2_PER_DOF = 2.5
+"""Far above the 1 expected of a uniform pick, and far below a biased one."""
+
+
+def build_library(rows: int, holes: float) -> None:
+    app_db.create_tables([Banner])
+    content = "Hello, World!\n" * 8
+    with app_db.atomic():
+        for start in range(0, rows, 10_000):
+            Banner.insert_many(
+                [(content,)] * min(10_000, rows - start),
+                fields=[Banner.content],
+            ).execute()
+    doomed = random.sample(range(1, rows + 1), int(rows * holes))
+    with app_db.atomic():
+        for start in range(0, len(doomed), 900):
+            Banner.delete().where(
+                Banner.id.in_(doomed[start:start + 900])
+            ).execute()
+
+
+def time_it(label: str, pick, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pick()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<24} {elapsed * 1000:10.3f}ms per pick")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--holes", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_db.init(str(Path(tmp) / "bench.db"), pragmas={"journal_mode": "wal"})
+        app_db.connect()
+        build_library(args.rows, args.holes)
+        print(f"{Banner.select().count()} banners, {args.holes:.0%} holes")
+
+        old = time_it(
+            "ORDER BY RANDOM()",
+            lambda: Banner.select().order_by(fn.Random()).limit(1).get(),
+            args.repeat,
+        )
+        new = time_it("Banner.random()", Banner.random, args.repeat * 50)
+        print(f"speed-up: {old / new:.0f}x")
+
+        # Uniformity on a small library with holes.
+        Banner.delete().execute()
+        build_library(50, 0.5)
+        ids = [banner.id for banner in Banner.select(Banner.id)]
+        draws = 20_000
+        counts = collections.Counter(Banner.random().id for _ in range(draws))
+        expected = draws / len(ids)
+        chi2 = sum((counts[i] - expected) ** 2 / expected for i in ids)
+        dof = len(ids) - 1
+        print(f"uniformity: chi^2 = {chi2:.1f} over {dof} dof")
+        app_db.close()
+
+    failed = False
+    if new >= old:
+        print("FAIL: Banner.random is no faster than ORDER BY RANDOM()")
+        failed = True
+    if chi2 > MAX_CHI2_PER_DOF * dof:
+        print(f"FAIL: chi^2 over {MAX_CHI2_PER_DOF:g}x the degrees of freedom")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Time full-text searches with ``BannerSearch.search``.
+
+Builds a temporary library of banners made of words drawn from a Zipf-like
+vocabulary, so that some words appear in most banners and others in a
+handful, indexes it, then times queries of each kind. Every match is
+ranked, so a search should take under 10ms plus `RANK_BUDGET` for each
+banner it matches, and the script fails if one takes longer.
+
+Usage::
+
+    python benchmarks/bench_search.py [--rows 100000] [--repeat 50]
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banner.models import app_db, Banner, BannerSearch  # noqa: E402
+
+SYLLABLES = [
+    consonant + vowel
+    for consonant in "bcdfghjklmnprstvwz"
+    for vowel in "aeiou"
+]
+
+
+def make_vocabulary(size: int) -> list[str]:
+    rng = random.Random(0)
+    words: dict[str, None] = {}
+    while len(words) < size:
+        words["".join(rng.choices(SYLLABLES, k=rng.randint(1, 4)))] = None
+    return list(words)
+
+
+VOCABULARY = make_vocabulary(20_000)
+CUM_WEIGHTS = list(
+    itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY)))
+)
+
+RANK_BUDGET = 0.000003
+"""Seconds a search may spend ranking each matching banner."""
+
+QUERIES = {
+    "common word": (VOCABULARY[0], False),
+    "rare word": (VOCABULARY[15_000], False),
+    "two words": (f"{VOCABULARY[1]} {VOCABULARY[20]}", False),
+    "prefix (2 chars)": (VOCABULARY[2][:2], True),
+    "prefix (4 chars)": (VOCABULARY[3][:4], True),
+    "markup": ("bold red", False),
+    "no match": ("nothing", False),
+}
+
+
+def banner_text(rng: random.Random) -> tuple[str, str | None]:
+    lines = [
+        " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=6)) for _ in range(4)
+    ]
+    content = "\n".join(lines)
+    if rng.random() < 0.3:
+        return content, f"[bold {rng.choice(['red', 'green', 'blue'])}]{content}[/]"
+    return content, None
+
+
+def build_library(rows: int) -> None:
+    rng = random.Random(42)
+    app_db.create_tables([Banner])
+    BannerSearch.install()
+    with app_db.atomic():
+        for start in range(0, rows, 10_000):
+            Banner.insert_many(
+                [banner_text(rng) for _ in range(min(10_000, rows - start))],
+                fields=[Banner.content, Banner.markedUp],
+            ).execute()
+    BannerSearch.optimize()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_db.init(str(Path(tmp) / "bench.db"), pragmas={"journal_mode": "wal"})
+        app_db.connect()
+        start = time.perf_counter()
+        build_library(args.rows)
+        print(f"built and indexed {args.rows} banners in {time.perf_counter() - start:.1f}s")
+
+        slow = False
+        for label, (query, prefix) in QUERIES.items():
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                matches = BannerSearch.search(query, args.limit, prefix)
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            query_for = BannerSearch.query_for(query, prefix)
+            matched = query_for and (
+                BannerSearch.select().where(BannerSearch.match(query_for)).count()
+            )
+            budget = 0.010 + RANK_BUDGET * matched
+            slow |= median > budget
+            print(
+                f"{label:<18} {len(matches):>3} of {matched:>6} matches, "
+                f"median {median * 1000:7.3f}ms, "
+                f"max {max(timings) * 1000:7.3f}ms, "
+                f"budget {budget * 1000:7.3f}ms"
+            )
+        app_db.close()
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Startup benchmark for the fast command path.
+
+Runs every one of ``banner.app.cli.FAST_COMMANDS`` under
+``python -X importtime`` against a throwaway home directory and fails if
+any of the heavy stacks are imported, or if a fast command has no command
+line in `COMMANDS` to run it with, then reports the total import time and
+wall-clock time of each command.
+
+Usage::
+
+    python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from banner.app.cli import FAST_COMMANDS  # noqa: E402
+
+FORBIDDEN = ("textual", "aiohttp", "validators", "art", "banner.ui", "banner.app.app")
+"""Top-level modules that the fast path must never import."""
+
+COMMANDS = {
+    "compress": (["compress"], ["compress", "--off"]),
+    "delete": (["delete", "{id}"],),
+    "export": (["export", "--single-file", os.devnull],),
+    "reset": (["reset", "1"],),
+    "search": (["search", "hello"],),
+    "show": (["show", "random"], ["show", "1", "--content-only"]),
+}
+"""How to run each fast command. ``{id}`` is replaced by a banner that has
+not been deleted yet, and every command is answered "y" if it asks."""
+
+
+def _env(home: str) -> dict:
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["USERPROFILE"] = home
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _seed(env: dict, home: str, count: int) -> None:
+    source = Path(home) / "seed.jsonl"
+    source.write_text(
+        "".join(f'"Hello, World! {index}"\n' for index in range(count)),
+        encoding="utf-8",
+    )
+    subprocess.run(
+        [sys.executable, "-m", "banner", "add", "--from-jsonl", str(source)],
+        env=env, check=True, capture_output=True,
+    )
+
+
+def imported_modules(importtime_output: str) -> dict:
+    """Parse ``-X importtime`` output into ``{module: (cumulative_us, depth)}``."""
+    modules = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            modules[name.strip()] = (int(cumulative), depth)
+    return modules
+
+
+def forbidden_imports(modules: dict) -> list:
+    return sorted(
+        name for name in modules
+        if any(name == bad or name.startswith(bad + ".") for bad in FORBIDDEN)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    missing = sorted(FAST_COMMANDS - COMMANDS.keys())
+    if missing:
+        print(f"FAIL: no command line to run {', '.join(missing)} with")
+        return 1
+
+    commands = [
+        command for name in sorted(FAST_COMMANDS) for command in COMMANDS[name]
+    ]
+    # Banner 1 is kept for the commands that need one; every delete gets
+    # its own.
+    ids = iter(range(2, 2 + (args.runs + 1) * len(commands)))
+
+    def argv(command: list) -> list:
+        return [arg.format(id=next(ids)) if arg == "{id}" else arg for arg in command]
+
+    failed = False
+    with tempfile.TemporaryDirectory() as home:
+        env = _env(home)
+        _seed(env, home, 2 + (args.runs + 1) * len(commands))
+        for command in commands:
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-m", "banner", *argv(command)],
+                env=env, capture_output=True, text=True, cwd=home, input="y\n",
+            )
+            if result.returncode != 0:
+                print(f"banner {' '.join(command)} failed:\n{result.stderr}")
+                return 1
+            modules = imported_modules(result.stderr)
+            bad = forbidden_imports(modules)
+            top_level = sum(
+                us for us, depth in modules.values() if depth == 0
+            )
+
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, "-m", "banner", *argv(command)],
+                    env=env, capture_output=True, check=True, cwd=home, input=b"y\n",
+                )
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+
+            print(
+                f"banner {' '.join(command)}: "
+                f"imports {top_level / 1000:.1f}ms, "
+                f"median wall {timings[len(timings) // 2] * 1000:.1f}ms"
+            )
+            if bad:
+                failed = True
+                print(f"  FAIL: imported {', '.join(bad)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
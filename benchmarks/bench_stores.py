@@ -0,0 +1,162 @@
+"""Run the same operations against every kind of banner store.
+
+Builds an identical library in a temporary SQLite database, a temporary
+directory store and a memory store, then times what the command line and
+the screens ask of a store: adding in batches, opening an existing
+library, counting, looking up by id, stepping through, picking at random
+(with and without a size limit), paging previews, searching, exporting,
+editing and deleting. The script fails if any store takes longer than
+its `BUDGETS` entry for an operation that should not depend on the size
+of the library.
+
+Usage::
+
+    python benchmarks/bench_stores.py [--rows 10000] [--stores sqlite dir memory]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banner.storage import make_store  # noqa: E402
+
+WORDS = ["hello", "world", "banner", "terminal", "python", "shell", "prompt", "ascii"]
+
+BUDGETS = {
+    "add (per banner)": 0.002,
+    "get": 0.01,
+    "next": 0.01,
+    "previous": 0.01,
+    "random": 0.01,
+    "random 80x23": 0.02,
+    "page of 32 previews": 0.02,
+    "export (per banner)": 0.001,
+    "save": 0.02,
+    "delete": 0.01,
+}
+"""The most seconds an operation may take on any store, however many banners it holds."""
+
+
+def make_rows(rows: int) -> list[dict]:
+    rng = random.Random(42)
+    banners = []
+    for index in range(rows):
+        width, height = rng.randint(10, 160), rng.randint(1, 40)
+        line = " ".join(rng.choice(WORDS) for _ in range(width // 6))
+        content = "\n".join(f"{index} {line}"[:width] for _ in range(height))
+        marked_up = f"[bold cyan]{content}[/]" if index % 3 == 0 else None
+        banners.append({"content": content, "markedUp": marked_up})
+    return banners
+
+
+def timed(operation, repeat: int = 1) -> float:
+    """The median seconds `operation` takes over `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(spec: str, rows: list[dict], repeat: int) -> dict[str, float]:
+    rng = random.Random(7)
+    results = {}
+    store = make_store(spec)
+    store.open()
+
+    def add() -> None:
+        for start in range(0, len(rows), 500):
+            store.add_many([dict(row) for row in rows[start:start + 500]])
+
+    results["add (per banner)"] = timed(add) / len(rows)
+    ids = [banner_id for banner_id, _ in store.list_previews(1)]
+
+    if not spec.startswith("memory"):
+        store.close()
+        store = make_store(spec)
+        results["open"] = timed(store.open)
+
+    results["count"] = timed(store.count, repeat)
+    results["get"] = timed(lambda: store.get(rng.choice(ids)), repeat)
+    results["next"] = timed(lambda: store.next(rng.choice(ids)), repeat)
+    results["previous"] = timed(lambda: store.previous(rng.choice(ids)), repeat)
+    results["random"] = timed(store.random, repeat)
+    results["random 80x23"] = timed(lambda: store.random(80, 23), repeat)
+    results["page of 32 previews"] = timed(
+        lambda: store.list_previews(
+            1024, offset=rng.randrange(len(ids)), limit=32
+        ),
+        repeat,
+    )
+    results["search"] = timed(lambda: store.search("python shell"), 5)
+    results["export (per banner)"] = timed(
+        lambda: sum(1 for _ in store.iter_contents())
+    ) / len(rows)
+
+    def edit() -> None:
+        banner = store.get(rng.choice(ids))
+        banner.markedUp = f"[red]{banner.content}[/]"
+        store.save(banner)
+
+    results["save"] = timed(edit, min(repeat, 100))
+
+    def delete() -> None:
+        store.delete(ids.pop(rng.randrange(len(ids))))
+
+    results["delete"] = timed(delete, min(repeat, 100))
+    store.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--stores", nargs="+", choices=["sqlite", "dir", "memory"],
+        default=["sqlite", "dir", "memory"],
+    )
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        specs = {
+            "sqlite": f"sqlite:{Path(tmp) / 'bench.db'}",
+            "dir": f"dir:{Path(tmp) / 'library'}",
+            "memory": "memory:",
+        }
+        for name in args.stores:
+            results[name] = run(specs[name], rows, args.repeat)
+
+    print(f"{args.rows} banners, median time per operation")
+    print(f"{'':<22}" + "".join(f"{name:>12}" for name in results))
+    operations = dict.fromkeys(op for timings in results.values() for op in timings)
+    for operation in operations:
+        cells = []
+        for timings in results.values():
+            seconds = timings.get(operation)
+            cells.append(f"{'-':>12}" if seconds is None else f"{seconds * 1000:10.3f}ms")
+        print(f"{operation:<22}" + "".join(cells))
+
+    failed = False
+    for name, timings in results.items():
+        for operation, budget in BUDGETS.items():
+            if timings[operation] > budget:
+                print(
+                    f"FAIL: {operation} on {name} takes "
+                    f"{timings[operation] * 1000:.3f}ms (at most {budget * 1000:g}ms)"
+                )
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
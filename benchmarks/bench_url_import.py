@@ -0,0 +1,221 @@
+"""Benchmark URL imports against a local aiohttp test server.
+
+First checks that `UrlFetcher` retries transient failures with backoff,
+gives up after its retries, does not retry other errors and keeps to its
+connection limit, against a local server that counts what it is asked;
+the script fails if it does not.
+
+Then serves banners from a local server that adds latency and fails a
+share of requests with 503, and compares the old one-session-per-URL
+serial import with `add_banners`, which shares one pooled session and
+fetches concurrently with retries.
+
+Usage::
+
+    python benchmarks/bench_url_import.py [--urls 500] [--latency 0.02]
+                                          [--check-only]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from banner.app.fetch import UrlFetcher  # noqa: E402
+from banner.models import app_db, Banner  # noqa: E402
+
+
+def make_app(latency: float, failure_rate: float) -> web.Application:
+    async def banner(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        if random.random() < failure_rate:
+            return web.Response(status=503)
+        return web.Response(text=f"Banner {request.match_info['id']}\n" * 10)
+
+    app = web.Application()
+    app.router.add_get("/banner/{id}.txt", banner)
+    return app
+
+
+def make_check_app(hits: dict[str, int], in_flight: list[int]) -> web.Application:
+    """A server for `check_fetcher`, counting the requests for each path.
+
+    ``/flaky`` answers 503 twice, then 200; ``/down`` always answers 503;
+    ``/missing`` answers 404; ``/slow`` takes a while, and `in_flight`
+    holds how many requests it is serving and the most it has served at
+    once.
+    """
+    async def handle(request: web.Request) -> web.Response:
+        path = request.path
+        hits[path] = hits.get(path, 0) + 1
+        if path == "/flaky":
+            if hits[path] <= 2:
+                return web.Response(status=503)
+            return web.Response(text="ok")
+        if path == "/down":
+            return web.Response(status=503)
+        if path == "/slow":
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+            await asyncio.sleep(0.05)
+            in_flight[0] -= 1
+            return web.Response(text="slow")
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get("/{path}", handle)
+    return app
+
+
+async def check_fetcher() -> list[str]:
+    """Check the retries, backoff and connection limits of `UrlFetcher`.
+
+    Returns:
+        What went wrong, if anything.
+    """
+    hits: dict[str, int] = {}
+    in_flight = [0, 0]
+    runner = web.AppRunner(make_check_app(hits, in_flight))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    failures = []
+
+    def check(ok: bool, what: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    try:
+        backoff = 0.02
+        async with UrlFetcher(retries=3, backoff=backoff) as fetcher:
+            text = await fetcher.fetch(f"{base_url}/flaky")
+            check(
+                text == "ok" and hits["/flaky"] == 3,
+                f"503 twice then 200: fetched {text!r} in {hits['/flaky']} requests",
+            )
+
+            start = time.perf_counter()
+            text = await fetcher.fetch(f"{base_url}/down")
+            elapsed = time.perf_counter() - start
+            check(
+                text is None and hits["/down"] == 4,
+                f"always 503: gave up with {text!r} after {hits['/down']} requests",
+            )
+            # Three retries wait backoff, 2 * backoff and 4 * backoff.
+            check(
+                elapsed >= 7 * backoff,
+                f"backoff: gave up after {elapsed:.3f}s, at least {7 * backoff:.3f}s",
+            )
+
+            text = await fetcher.fetch(f"{base_url}/missing")
+            check(
+                text is None and hits["/missing"] == 1,
+                f"404: gave up with {text!r} after {hits['/missing']} requests",
+            )
+
+        async with UrlFetcher(limit=16, limit_per_host=2, retries=0) as fetcher:
+            texts = await asyncio.gather(
+                *(fetcher.fetch(f"{base_url}/slow") for _ in range(8))
+            )
+            check(
+                texts == ["slow"] * 8 and in_flight[1] == 2,
+                f"2 connections per host: {in_flight[1]} requests at once at most",
+            )
+    finally:
+        await runner.cleanup()
+
+    # Nothing listens on the port any more.
+    async with UrlFetcher(retries=1, backoff=0.01) as fetcher:
+        text = await fetcher.fetch(f"{base_url}/flaky")
+        check(text is None, f"connection refused: gave up with {text!r}")
+    return failures
+
+
+async def serial_import(urls: list) -> int:
+    """The import loop as it was: a new session per URL, one at a time."""
+    fetched = 0
+    for url in urls:
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as response:
+                    await response.text()
+                    fetched += 1
+        except aiohttp.ClientError:
+            pass
+    return fetched
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--urls", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=16)
+    parser.add_argument(
+        "--check-only", action="store_true",
+        help="Only check UrlFetcher's behaviour, without timing imports",
+    )
+    args = parser.parse_args()
+
+    if await check_fetcher():
+        return 1
+    if args.check_only:
+        return 0
+
+    from banner.app.app import add_banners
+
+    runner = web.AppRunner(make_app(args.latency, args.failure_rate))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    urls = [f"http://127.0.0.1:{port}/banner/{i}.txt" for i in range(args.urls)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_db.init(str(Path(tmp) / "bench.db"))
+        app_db.connect()
+        app_db.create_tables([Banner])
+        try:
+            start = time.perf_counter()
+            fetched = await serial_import(urls)
+            serial = time.perf_counter() - start
+            print(f"serial:  {serial:7.2f}s ({fetched} fetched)")
+
+            start = time.perf_counter()
+            succeeded, failed, _, contents = await add_banners(
+                urls, ascii=False, dry_run=True, font="random",
+                concurrency=args.concurrency, per_host=args.per_host,
+                retries=3,
+            )
+            pooled = time.perf_counter() - start
+            print(
+                f"pooled:  {pooled:7.2f}s ({len(contents)} fetched, "
+                f"{failed} failed)"
+            )
+            print(f"speed-up: {serial / pooled:.1f}x")
+            ordered = all(
+                content.startswith(f"Banner {i}\n")
+                for i, content in enumerate(contents)
+            )
+            if failed == 0 and not ordered:
+                print("FAIL: results are not in source order")
+                return 1
+        finally:
+            app_db.close()
+            await runner.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,23 @@
+"""A reproducible benchmark suite over generated banner libraries.
+
+For each library size it generates a library of realistic banners with
+mixed Rich markup (see `library`) in a temporary database, times the
+store, the commands, the Main screen and the ``banner`` command line
+against it (see `cases`), and saves the results as JSON (see `results`)
+so that runs on different commits can be compared. Nothing leaves the
+machine: URL imports fetch from a server on the loopback interface (see
+`server`).
+
+Usage, from the root of the repository::
+
+    python -m benchmarks.suite run [--sizes 1k 100k 1m] [--groups core tui cli]
+                                   [--cases PATTERN ...] [--seed 0]
+                                   [--repeat-scale 1.0] [--output FILE]
+                                   [--baseline OLD.json [--threshold 1.2]]
+    python -m benchmarks.suite compare OLD.json NEW.json [--threshold 1.2]
+    python -m benchmarks.suite list
+
+Results go to ``benchmarks/results/`` by default. `compare` exits with 1
+if any case got slower by more than the threshold, and so does `run` when
+it is given the results of an earlier run as a baseline.
+"""
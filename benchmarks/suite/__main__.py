@@ -0,0 +1,175 @@
+"""The command line of the benchmark suite; see the package docstring."""
+
+import argparse
+import fnmatch
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from banner.storage import SqliteStore, use_store  # noqa: E402
+
+from . import results  # noqa: E402
+from .cases import CASES, TERMINAL_ENV, Context  # noqa: E402
+from .library import SIZES, VERSION, build_library  # noqa: E402
+from .server import serve_banners  # noqa: E402
+
+GROUPS = ("core", "tui", "cli")
+
+
+def selected_cases(groups: list[str], patterns: list[str] | None) -> list:
+    return [
+        case for case in CASES
+        if case.group in groups
+        and (not patterns or any(fnmatch.fnmatch(case.name, p) for p in patterns))
+    ]
+
+
+def run_size(
+    name: str,
+    cases: list,
+    seed: int,
+    repeat_scale: float,
+    base_url: str,
+) -> dict:
+    count = SIZES[name]
+    with tempfile.TemporaryDirectory(prefix="banner-bench-") as tmp:
+        db_path = Path(tmp) / "library.db"
+        print(f"\n{name}: generating {count} banners...", flush=True)
+        start = time.perf_counter()
+        build_library(db_path, count, seed)
+        print(f"{name}: generated in {time.perf_counter() - start:.1f}s", flush=True)
+
+        store = SqliteStore(db_path)
+        use_store(store)
+        timings = {}
+        with store:
+            context = Context(
+                root=ROOT, tmp=Path(tmp), db_path=db_path, seed=seed,
+                store=store, base_url=base_url,
+                ids=[banner_id for banner_id, _ in store.list_previews(1)],
+            )
+            for case in cases:
+                repeat = max(1, round(case.repeat * repeat_scale))
+                measured = case.measure(context, repeat)
+                timings[case.name] = results.summarize(case.group, measured)
+                print(
+                    f"  {case.name:<36}"
+                    f"{results.format_time(timings[case.name]['median']):>12}"
+                    f"  (median of {len(measured)})",
+                    flush=True,
+                )
+    return {"banners": count, "cases": timings}
+
+
+def run(args: argparse.Namespace) -> int:
+    cases = selected_cases(args.groups, args.cases)
+    if not cases:
+        print("No cases match", file=sys.stderr)
+        return 2
+    os.environ.update(TERMINAL_ENV)
+    os.environ.pop("BANNER_STORE", None)
+
+    output = args.output or (
+        ROOT / "benchmarks" / "results"
+        / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    run_results = results.new_results(ROOT, VERSION, args.seed)
+    with serve_banners(args.latency) as base_url:
+        for name in args.sizes:
+            run_results["sizes"][name] = run_size(
+                name, cases, args.seed, args.repeat_scale, base_url
+            )
+            # Saved after every size, so a long run is not lost to a crash.
+            results.save(run_results, Path(output))
+    print(f"\nSaved the results to {output}")
+    if args.baseline is None:
+        return 0
+    return report_regressions(results.load(args.baseline), run_results, args.threshold)
+
+
+def compare(args: argparse.Namespace) -> int:
+    return report_regressions(
+        results.load(args.old), results.load(args.new), args.threshold
+    )
+
+
+def report_regressions(old: dict, new: dict, threshold: float) -> int:
+    regressions = results.compare(old, new, threshold)
+    if regressions:
+        print(f"\n{regressions} cases are more than {threshold}x slower")
+        return 1
+    return 0
+
+
+def list_cases(args: argparse.Namespace) -> int:
+    for case in CASES:
+        print(f"{case.group:<6}{case.name:<36}x{case.repeat}")
+    return 0
+
+
+def add_threshold(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--threshold", type=float, default=1.2,
+        help="Report cases whose median grew by more than this factor (default: 1.2)",
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite",
+        description=__doc__.splitlines()[0],
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the suite and save the results")
+    run_parser.add_argument(
+        "--sizes", nargs="+", choices=list(SIZES), default=["1k", "100k"],
+        help="The library sizes to run against (default: 1k 100k)",
+    )
+    run_parser.add_argument(
+        "--groups", nargs="+", choices=GROUPS, default=list(GROUPS),
+    )
+    run_parser.add_argument(
+        "--cases", nargs="+", metavar="PATTERN",
+        help="Only run the cases whose names match one of these globs",
+    )
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument(
+        "--repeat-scale", type=float, default=1.0,
+        help="Multiply how many times each case is run",
+    )
+    run_parser.add_argument(
+        "--latency", type=float, default=0.005,
+        help="Seconds the local server waits before answering (default: 0.005)",
+    )
+    run_parser.add_argument("--output", type=Path, help="Where to save the results")
+    run_parser.add_argument(
+        "--baseline", type=Path, metavar="FILE",
+        help="Compare with the results of an earlier run and fail on regressions",
+    )
+    add_threshold(run_parser)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare the results of two runs"
+    )
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    add_threshold(compare_parser)
+    compare_parser.set_defaults(func=compare)
+
+    list_parser = subparsers.add_parser("list", help="List the cases")
+    list_parser.set_defaults(func=list_cases)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""What the suite times.
+
+Every case times one operation a number of times against a generated
+library and returns the seconds each run took. Cases are grouped:
+
+``core``    functions and store methods called in this process
+``tui``     the Main screen, run headless by Textual's test pilot
+``cli``     ``banner`` commands, run in a fresh process each time
+
+Cases run in the order they are defined here, and those that change the
+library come after those that only read it, so that every size is read
+in the state it was generated in.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from banner.app import commands
+from banner.app.cli import get_args
+from banner.storage import SqliteStore
+
+from .library import generate_banners
+
+TERMINAL_ENV = {
+    "COLUMNS": "100",
+    "LINES": "30",
+    "FORCE_COLOR": "1",
+    "COLORTERM": "truecolor",
+    "TERM": "xterm-256color",
+}
+"""The terminal every case renders for, whatever the suite is run in."""
+
+
+@dataclass
+class Context:
+    """A generated library and what the cases need to work with it."""
+    root: Path
+    tmp: Path
+    db_path: Path
+    seed: int
+    store: SqliteStore
+    base_url: str
+    ids: list[int] = field(default_factory=list)
+    rng: random.Random = field(default_factory=lambda: random.Random(7))
+    batches: itertools.count = field(default_factory=lambda: itertools.count(1))
+
+    def env(self) -> dict:
+        env = dict(os.environ, HOME=str(self.tmp), PYTHONPATH=str(self.root))
+        env.pop("BANNER_STORE", None)
+        env.update(TERMINAL_ENV)
+        return env
+
+    def new_rows(self, count: int) -> list[dict]:
+        """Banners that are not in the library yet."""
+        seed = f"{self.seed}:new:{next(self.batches)}"
+        return [
+            {"content": f"{row['content']}\n{seed}", "markedUp": None}
+            for row in generate_banners(count, seed)
+        ]
+
+
+class Case(NamedTuple):
+    name: str
+    group: str
+    repeat: int
+    measure: Callable[[Context, int], list[float]]
+
+
+CASES: list[Case] = []
+
+
+def case(name: str, group: str, repeat: int):
+    """Register a function ``measure(context, repeat) -> timings`` as a case."""
+    def register(measure: Callable[[Context, int], list[float]]):
+        CASES.append(Case(name, group, repeat, measure))
+        return measure
+    return register
+
+
+def timed(operation: Callable[[], object], repeat: int) -> list[float]:
+    """Run an operation `repeat` times, with its output thrown away."""
+    timings = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operation()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def cli(context: Context, repeat: int, *argv: str, stdin: bytes | None = None) -> list[float]:
+    """Time ``banner --store sqlite:DB ARGV...`` in a new process each run."""
+    command = [
+        sys.executable, "-m", "banner", "--store", f"sqlite:{context.db_path}", *argv
+    ]
+    env = context.env()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            command, env=env, cwd=context.tmp, input=stdin, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+# The store
+
+
+@case("store.open read-only", "core", 20)
+def store_open(context: Context, repeat: int) -> list[float]:
+    def open_store() -> None:
+        with SqliteStore(context.db_path, read_only=True):
+            pass
+
+    return timed(open_store, repeat)
+
+
+@case("store.count", "core", 20)
+def store_count(context: Context, repeat: int) -> list[float]:
+    return timed(context.store.count, repeat)
+
+
+@case("store.get", "core", 500)
+def store_get(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: context.store.get(context.rng.choice(context.ids)), repeat)
+
+
+@case("store.next", "core", 500)
+def store_next(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: context.store.next(context.rng.choice(context.ids)), repeat)
+
+
+@case("store.previous", "core", 500)
+def store_previous(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: context.store.previous(context.rng.choice(context.ids)), repeat)
+
+
+@case("store.random", "core", 500)
+def store_random(context: Context, repeat: int) -> list[float]:
+    return timed(context.store.random, repeat)
+
+
+@case("store.random 80x23", "core", 200)
+def store_random_fit(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: context.store.random(80, 23), repeat)
+
+
+@case("store.list_previews page", "core", 200)
+def store_page(context: Context, repeat: int) -> list[float]:
+    return timed(
+        lambda: context.store.list_previews(
+            1024, offset=context.rng.randrange(len(context.ids)), limit=32
+        ),
+        repeat,
+    )
+
+
+@case("store.search common", "core", 20)
+def store_search_common(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: context.store.search("hello world"), repeat)
+
+
+@case("store.search rare", "core", 20)
+def store_search_rare(context: Context, repeat: int) -> list[float]:
+    return timed(
+        lambda: context.store.search(str(context.rng.randrange(len(context.ids)))),
+        repeat,
+    )
+
+
+@case("store.search prefix", "core", 20)
+def store_search_prefix(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: context.store.search("welc", prefix=True), repeat)
+
+
+# The commands
+
+
+@case("show_banner render", "core", 100)
+def show_render(context: Context, repeat: int) -> list[float]:
+    # Banners not shown before, so each is rendered and cached.
+    repeat = min(repeat, len(context.ids))
+    unseen = iter(context.rng.sample(context.ids, repeat))
+    return timed(lambda: commands.show_banner(str(next(unseen))), repeat)
+
+
+@case("show_banner cached", "core", 200)
+def show_cached(context: Context, repeat: int) -> list[float]:
+    banner_id = str(context.ids[len(context.ids) // 2])
+    timed(lambda: commands.show_banner(banner_id), 1)
+    return timed(lambda: commands.show_banner(banner_id), repeat)
+
+
+@case("show_banner random", "core", 200)
+def show_random(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: commands.show_banner("random"), repeat)
+
+
+@case("search_banners", "core", 20)
+def search(context: Context, repeat: int) -> list[float]:
+    return timed(lambda: commands.search_banners("banner python"), repeat)
+
+
+@case("export_banners single file", "core", 3)
+def export_single(context: Context, repeat: int) -> list[float]:
+    args = get_args(["export", "--single-file", os.devnull])
+    return timed(lambda: commands.export_banners(args), repeat)
+
+
+@case("export_banners pack", "core", 3)
+def export_pack(context: Context, repeat: int) -> list[float]:
+    args = get_args(["export", "--pack", str(context.tmp / "bench.pack")])
+    return timed(lambda: commands.export_banners(args), repeat)
+
+
+# The TUI
+
+
+@case("Main navigation", "tui", 100)
+def main_navigation(context: Context, repeat: int) -> list[float]:
+    from banner.app.app import BannerApp
+    from banner.ui.screens import Main
+
+    async def navigate() -> list[float]:
+        app = BannerApp(get_args([]))
+        timings = []
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            screen = app.screen
+            assert isinstance(screen, Main)
+            screen.go_to_last()
+            for step in range(repeat):
+                go = screen.go_to_next if step % 3 else screen.go_to_previous
+                start = time.perf_counter()
+                go()
+                timings.append(time.perf_counter() - start)
+                # As a key repeat would, leave time for the prefetch.
+                await pilot.pause(0.03)
+        return timings
+
+    return asyncio.run(navigate())
+
+
+# Commands run from the shell, reading
+
+
+@case("banner show random", "cli", 10)
+def cli_show_random(context: Context, repeat: int) -> list[float]:
+    return cli(context, repeat, "show", "random")
+
+
+@case("banner show ID", "cli", 10)
+def cli_show_id(context: Context, repeat: int) -> list[float]:
+    return cli(context, repeat, "show", str(context.rng.choice(context.ids)))
+
+
+@case("banner show random --fit", "cli", 10)
+def cli_show_fit(context: Context, repeat: int) -> list[float]:
+    return cli(context, repeat, "show", "random", "--fit")
+
+
+@case("banner show ID --content-only", "cli", 10)
+def cli_show_content(context: Context, repeat: int) -> list[float]:
+    return cli(context, repeat, "show", str(context.rng.choice(context.ids)), "--content-only")
+
+
+@case("banner search", "cli", 10)
+def cli_search(context: Context, repeat: int) -> list[float]:
+    return cli(context, repeat, "search", "banner", "python")
+
+
+@case("banner export --single-file", "cli", 3)
+def cli_export(context: Context, repeat: int) -> list[float]:
+    return cli(context, repeat, "export", "--single-file", os.devnull)
+
+
+@case("banner export --pack", "cli", 3)
+def cli_export_pack(context: Context, repeat: int) -> list[float]:
+    return cli(context, repeat, "export", "--pack", str(context.tmp / "cli.pack"))
+
+
+@case("banner show --pack random", "cli", 10)
+def cli_show_pack(context: Context, repeat: int) -> list[float]:
+    pack = context.tmp / "cli.pack"
+    if not pack.exists():
+        cli(context, 1, "export", "--pack", str(pack))
+    return cli(context, repeat, "show", "--pack", str(pack), "random")
+
+
+# Changing the library
+
+
+@case("store.save", "core", 100)
+def store_save(context: Context, repeat: int) -> list[float]:
+    from rich.markup import escape
+
+    def save() -> None:
+        banner = context.store.get(context.rng.choice(context.ids))
+        banner.markedUp = f"[bold]{escape(banner.content)}[/]"
+        context.store.save(banner)
+
+    return timed(save, repeat)
+
+
+@case("add_banners jsonl x1000", "core", 3)
+def add_jsonl(context: Context, repeat: int) -> list[float]:
+    from banner.app.app import add_banners
+    from banner.app.sources import iter_jsonl
+
+    paths = []
+    for index in range(repeat):
+        path = context.tmp / f"add-{index}.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for row in context.new_rows(1000):
+                f.write(json.dumps(row) + "\n")
+        paths.append(path)
+    paths_left = iter(paths)
+
+    def add() -> None:
+        asyncio.run(add_banners(
+            [], ascii=False, dry_run=False, font="random",
+            entries=iter_jsonl(str(next(paths_left))),
+        ))
+
+    return timed(add, repeat)
+
+
+@case("add_banners urls x50", "core", 3)
+def add_urls(context: Context, repeat: int) -> list[float]:
+    from banner.app.app import add_banners
+
+    def add() -> None:
+        batch = next(context.batches)
+        urls = [f"{context.base_url}/banner/{batch}-{i}.txt" for i in range(50)]
+        asyncio.run(add_banners(urls, ascii=False, dry_run=False, font="random"))
+
+    return timed(add, repeat)
+
+
+@case("store.delete", "core", 100)
+def store_delete(context: Context, repeat: int) -> list[float]:
+    def delete() -> None:
+        context.store.delete(context.ids.pop(context.rng.randrange(len(context.ids))))
+
+    return timed(delete, repeat)
+
+
+# Commands run from the shell, changing the library
+
+
+@case("banner add TEXT", "cli", 10)
+def cli_add(context: Context, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        timings += cli(context, 1, "add", f"benchmark {next(context.batches)}")
+    return timings
+
+
+@case("banner add --from-jsonl x1000", "cli", 3)
+def cli_add_jsonl(context: Context, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        path = context.tmp / "cli-add.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for row in context.new_rows(1000):
+                f.write(json.dumps(row) + "\n")
+        timings += cli(context, 1, "add", "--from-jsonl", str(path))
+    return timings
+
+
+@case("banner add URL x10", "cli", 3)
+def cli_add_urls(context: Context, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        batch = next(context.batches)
+        urls = [f"{context.base_url}/banner/cli-{batch}-{i}.txt" for i in range(10)]
+        timings += cli(context, 1, "add", *urls)
+    return timings
+
+
+@case("banner reset ID", "cli", 10)
+def cli_reset(context: Context, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        timings += cli(context, 1, "reset", str(context.rng.choice(context.ids)))
+    return timings
+
+
+@case("banner delete ID", "cli", 10)
+def cli_delete(context: Context, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        banner_id = context.ids.pop(context.rng.randrange(len(context.ids)))
+        timings += cli(context, 1, "delete", str(banner_id), stdin=b"y\n")
+    return timings
@@ -0,0 +1,157 @@
+"""Synthetic banner libraries.
+
+The same seed and size always give the same library, so runs on different
+commits measure the same thing. Banners are assembled from pools of lines
+generated up front, which keeps building a million of them quick, and
+every banner gets its number in its first line so no two are the same.
+
+The mix is meant to look like a real library: mostly ASCII art of a few
+lines, some plain text, framed text in box drawing characters, a few big
+logos, and some lines of emoji and CJK, which take two cells each. About
+two in five banners have Rich markup, from a single style to several
+nested ones, links and colours.
+"""
+
+import random
+from pathlib import Path
+from typing import Iterator
+
+from banner.models import Banner
+from banner.storage import SqliteStore
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+"""The library sizes the suite knows by name."""
+
+VERSION = 1
+"""Bump when the libraries generated for a seed change, so results from
+before and after are not compared as if they measured the same thing."""
+
+ART_CHARS = " _/|()-.'`#=*<>~o"
+WORDS = [
+    "hello", "world", "banner", "terminal", "python", "shell", "prompt",
+    "ascii", "welcome", "back", "system", "ready", "deploy", "server",
+    "good", "morning", "build", "passing", "release", "night",
+]
+WIDE_CHARS = "🚀✨🐍🔥🌈日本語漢字한국어"
+STYLES = [
+    "bold", "italic", "dim", "underline", "red", "bold cyan", "#ff8800",
+    "bold magenta on black", "rgb(10,200,30)", "reverse", "blink",
+    "link=https://example.com", "bold yellow on blue", "strike",
+]
+
+# How often each kind of banner turns up, and its range of widths and
+# heights.
+KINDS = {
+    "art": (45, (20, 100), (4, 12)),
+    "text": (25, (10, 80), (1, 3)),
+    "box": (15, (20, 60), (3, 6)),
+    "logo": (10, (80, 160), (15, 40)),
+    "wide": (5, (10, 40), (1, 4)),
+}
+
+MARKUP_SHARE = 0.4
+POOL_SIZE = 512
+
+
+class LineMaker:
+    """Makes the lines banners are assembled from, from a seeded generator."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+
+    def art(self, width: int) -> tuple[str, int]:
+        line = "".join(self.rng.choice(ART_CHARS) for _ in range(width))
+        return line, width
+
+    def text(self, width: int) -> tuple[str, int]:
+        words = []
+        length = 0
+        while length < width:
+            word = self.rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        line = " ".join(words)[:width]
+        return line, len(line)
+
+    def box(self, width: int) -> tuple[str, int]:
+        inner, _ = self.text(width - 4)
+        return f"│ {inner.ljust(width - 4)} │", width
+
+    def wide(self, width: int) -> tuple[str, int]:
+        chars = []
+        cells = 0
+        while cells + 2 <= width:
+            if self.rng.random() < 0.5:
+                chars.append(self.rng.choice(WIDE_CHARS))
+                cells += 2
+            else:
+                chars.append(self.rng.choice(" -"))
+                cells += 1
+        return "".join(chars), cells
+
+
+def make_pools(rng: random.Random) -> dict[str, list[tuple[str, int]]]:
+    """A pool of lines for each kind of banner, with their widths in cells."""
+    maker = LineMaker(rng)
+    pools = {}
+    for kind, (_, (low, high), _) in KINDS.items():
+        make_line = getattr(maker, "art" if kind == "logo" else kind)
+        pools[kind] = [make_line(rng.randint(low, high)) for _ in range(POOL_SIZE)]
+    return pools
+
+
+def mark_up(lines: list[str], rng: random.Random) -> str:
+    """Rich markup that shows exactly `lines`."""
+    marked_up = []
+    for line in lines:
+        escaped = line.replace("[", r"\[")
+        # A backslash before a closing tag would escape it.
+        if rng.random() < 0.6 and line and not line.endswith("\\"):
+            style = rng.choice(STYLES)
+            if rng.random() < 0.3:
+                inner = rng.choice(STYLES)
+                escaped = f"[{style}][{inner}]{escaped}[/{inner}][/{style}]"
+            else:
+                escaped = f"[{style}]{escaped}[/]"
+        marked_up.append(escaped)
+    return "\n".join(marked_up)
+
+
+def generate_banners(count: int, seed: int = 0) -> Iterator[dict]:
+    """Rows for `BannerStore.add_many`, with their sizes already worked out."""
+    rng = random.Random(f"{VERSION}:{seed}")
+    pools = make_pools(rng)
+    kinds = list(KINDS)
+    weights = [KINDS[kind][0] for kind in kinds]
+    for index in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        low, high = KINDS[kind][2]
+        picked = rng.choices(pools[kind], k=rng.randint(low, high))
+        label = f"#{index}"
+        lines = [label] + [line for line, _ in picked]
+        width = max([len(label)] + [cells for _, cells in picked])
+        if kind == "box":
+            rule = "─" * (width - 2)
+            lines = [label, f"╭{rule}╮"] + lines[1:] + [f"╰{rule}╯"]
+        content = "\n".join(lines)
+        marked_up = mark_up(lines, rng) if rng.random() < MARKUP_SHARE else None
+        yield {
+            "content": content,
+            "markedUp": marked_up,
+            "digest": Banner.content_digest(content),
+            "width": width,
+            "height": len(lines),
+            "line_count": len(lines),
+        }
+
+
+def build_library(path: Path, count: int, seed: int = 0, batch_size: int = 1000) -> None:
+    """Create a SQLite library of `count` generated banners at `path`."""
+    with SqliteStore(path) as store:
+        batch = []
+        for row in generate_banners(count, seed):
+            batch.append(row)
+            if len(batch) == batch_size:
+                store.add_many(batch)
+                batch = []
+        store.add_many(batch)
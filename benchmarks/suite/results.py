@@ -0,0 +1,140 @@
+"""Saving, loading and comparing the results of a run.
+
+A results file is JSON::
+
+    {
+      "format": 1,
+      "library": 1,                  # `library.VERSION`
+      "seed": 0,
+      "created": "2024-01-01T12:00:00",
+      "git": {"commit": "...", "dirty": false},
+      "python": "3.11.7", "sqlite": "3.40.1", "platform": "...",
+      "sizes": {
+        "1k": {
+          "banners": 1000,
+          "cases": {
+            "store.get": {"group": "core", "runs": 500, "median": 0.0001,
+                          "min": ..., "mean": ..., "p95": ...},
+            ...
+          }
+        }
+      }
+    }
+
+Times are in seconds. Two files can be compared when they were made from
+the same library version and seed.
+"""
+
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+FORMAT = 1
+
+
+def summarize(group: str, timings: list[float]) -> dict:
+    ordered = sorted(timings)
+    return {
+        "group": group,
+        "runs": len(ordered),
+        "median": statistics.median(ordered),
+        "min": ordered[0],
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def git_state(root: Path) -> dict:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return {
+            "commit": git("rev-parse", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        }
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def new_results(root: Path, library_version: int, seed: int) -> dict:
+    return {
+        "format": FORMAT,
+        "library": library_version,
+        "seed": seed,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": git_state(root),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "sizes": {},
+    }
+
+
+def save(results: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+def load(path: Path) -> dict:
+    results = json.loads(Path(path).read_text(encoding="utf-8"))
+    if results.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a results file this suite can read")
+    return results
+
+
+def compare(old: dict, new: dict, threshold: float) -> int:
+    """Print the median times of two runs side by side.
+
+    Returns:
+        The number of cases whose median grew by more than `threshold`
+        times.
+    """
+    if (old["library"], old["seed"]) != (new["library"], new["seed"]):
+        print(
+            "warning: the runs used different libraries "
+            f"(library {old['library']} seed {old['seed']} vs "
+            f"library {new['library']} seed {new['seed']})",
+            file=sys.stderr,
+        )
+    print(
+        f"old: {old['created']} {(old['git']['commit'] or '?')[:10]}\n"
+        f"new: {new['created']} {(new['git']['commit'] or '?')[:10]}"
+    )
+    regressions = 0
+    for size, new_size in new["sizes"].items():
+        old_cases = old["sizes"].get(size, {}).get("cases", {})
+        print(f"\n{size} ({new_size['banners']} banners)")
+        print(f"{'':<36}{'old':>12}{'new':>12}{'ratio':>9}")
+        for name, result in new_size["cases"].items():
+            old_result = old_cases.get(name)
+            if old_result is None:
+                print(f"{name:<36}{'-':>12}{format_time(result['median']):>12}")
+                continue
+            ratio = result["median"] / old_result["median"] if old_result["median"] else 1.0
+            flag = ""
+            if ratio > threshold:
+                regressions += 1
+                flag = "  slower"
+            elif ratio < 1 / threshold:
+                flag = "  faster"
+            print(
+                f"{name:<36}{format_time(old_result['median']):>12}"
+                f"{format_time(result['median']):>12}{ratio:8.2f}x{flag}"
+            )
+    return regressions
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.2f}ms"
+    return f"{seconds * 1_000_000:.1f}us"
@@ -0,0 +1,54 @@
+"""A local stand-in for the web servers banners are imported from.
+
+``GET /banner/<name>.txt`` answers, after a fixed delay, with a banner
+made from the name, so any number of distinct URLs can be imported and
+the same URL always gives the same banner. It runs in a thread of the
+benchmark process and never leaves the loopback interface.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+
+def banner_for(name: str) -> str:
+    rule = "=" * (len(name) + 8)
+    return f"{rule}\n==  {name}  ==\n{rule}\n"
+
+
+class BannerHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self) -> None:
+        time.sleep(self.latency)
+        if not (self.path.startswith("/banner/") and self.path.endswith(".txt")):
+            self.send_error(404)
+            return
+        body = banner_for(self.path[len("/banner/"):-len(".txt")]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@contextmanager
+def serve_banners(latency: float = 0.005) -> Iterator[str]:
+    """Serve banners in the background, yielding the URL to append paths to."""
+    handler = type("Handler", (BannerHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address[:2]
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()